@@ -0,0 +1,97 @@
+"""
+Helpers for the async read endpoints served under ``/api/async/``.
+
+DRF views are sync-only, so these are plain Django coroutine views. They
+authenticate with ``AsyncJWTAuthentication`` and reuse the DRF pieces that
+never touch the database (viewset filter backends, permissions,
+serializers), while every query is awaited through the async ORM. Under
+ASGI a request waiting on the database then no longer holds one of the
+server's fixed worker threads.
+"""
+from functools import wraps
+
+from django.http import HttpResponse
+from django.views.decorators.http import require_safe
+from rest_framework import exceptions
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from rest_framework.views import exception_handler
+
+from events.pagination import KeysetPagination
+from users.authentication import AsyncJWTAuthentication
+
+authenticator = AsyncJWTAuthentication()
+
+
+def render(data, status=200, headers=None):
+    return HttpResponse(
+        JSONRenderer().render(data), status=status, headers=headers, content_type='application/json'
+    )
+
+
+def async_api_view(query_budget=None):
+    """
+    Turns ``async def view(request, ...)`` returning plain data into a GET
+    endpoint that requires a JWT. The view receives a DRF ``Request`` with
+    ``user``/``auth`` set and may raise DRF exceptions, which are answered
+    the way DRF's exception handler would.
+    """
+
+    def decorator(view):
+        @require_safe
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            try:
+                result = await authenticator.aauthenticate(request)
+                if result is None:
+                    raise exceptions.NotAuthenticated()
+                drf_request = Request(request, authenticators=())
+                drf_request.user, drf_request.auth = result
+                return render(await view(drf_request, *args, **kwargs))
+            except exceptions.APIException as exc:
+                if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+                    exc.auth_header = authenticator.authenticate_header(request)
+                response = exception_handler(exc, {'request': request})
+                headers = {name: response[name] for name in ('WWW-Authenticate', 'Retry-After') if name in response}
+                return render(response.data, response.status_code, headers)
+
+        wrapper.query_budget = query_budget
+        return wrapper
+
+    return decorator
+
+
+async def paginate(request, queryset, serialize):
+    """
+    Page-number pagination with the same query parameters and response
+    shape as ``KeysetPagination``'s default mode (no ``?cursor=``).
+    """
+    paginator = KeysetPagination()
+    page_size = paginator.get_page_size(request)
+    param = paginator.page_query_param
+    try:
+        number = int(request.query_params.get(param, 1))
+        if number < 1:
+            raise ValueError
+    except ValueError:
+        raise exceptions.NotFound(paginator.invalid_page_message)
+
+    count = await queryset.acount()
+    offset = (number - 1) * page_size
+    if offset and offset >= count:
+        raise exceptions.NotFound(paginator.invalid_page_message)
+    rows = [row async for row in queryset[offset:offset + page_size]]
+
+    url = request.build_absolute_uri()
+    previous = None
+    if number == 2:
+        previous = remove_query_param(url, param)
+    elif number > 2:
+        previous = replace_query_param(url, param, number - 1)
+    return {
+        'count': count,
+        'next': replace_query_param(url, param, number + 1) if offset + page_size < count else None,
+        'previous': previous,
+        'results': serialize(rows),
+    }
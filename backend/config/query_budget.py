@@ -0,0 +1,114 @@
+"""
+Per-request query instrumentation.
+
+``QueryBudgetMiddleware`` counts the SQL queries and database time of every
+request, reports them in ``X-Query-Count`` / ``X-Query-Time-Ms`` and logs
+them to the ``config.queries`` logger. Views declare how many queries they
+may run with a ``query_budget`` attribute, either an int or a dict keyed by
+viewset action (``'default'`` as fallback), otherwise
+``settings.QUERY_BUDGET_DEFAULT`` applies; plain function views may set it as
+a function attribute. ``settings.QUERY_BUDGET_MODE``
+decides what exceeding it does: ``'warn'`` logs a warning, ``'raise'``
+raises ``QueryBudgetExceeded`` and ``'off'`` skips the check.
+"""
+import logging
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('config.queries')
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class QueryCounter:
+    """``execute_wrapper`` hook that counts queries and their duration."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - started
+
+    def track(self):
+        """Context manager installing the counter on every database connection."""
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(self))
+        return stack
+
+
+def get_query_budget(view_class, action=None):
+    budget = getattr(view_class, 'query_budget', None)
+    if isinstance(budget, dict):
+        budget = budget.get(action, budget.get('default'))
+    if budget is None:
+        budget = getattr(settings, 'QUERY_BUDGET_DEFAULT', None)
+    return budget
+
+
+class QueryBudgetMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        request.query_budget = None
+        counter = QueryCounter()
+        with counter.track():
+            response = self.get_response(request)
+        return self._report(request, response, counter)
+
+    async def __acall__(self, request):
+        # The async ORM runs queries on the request's thread-sensitive worker
+        # thread, whose connections differ from the event loop's; install
+        # the counter there.
+        request.query_budget = None
+        counter = QueryCounter()
+        tracking = await sync_to_async(counter.track)()
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(tracking.close)()
+        return self._report(request, response, counter)
+
+    def _report(self, request, response, counter):
+        response['X-Query-Count'] = str(counter.count)
+        response['X-Query-Time-Ms'] = f'{counter.duration * 1000:.1f}'
+        budget = request.query_budget
+        if budget is not None:
+            response['X-Query-Budget'] = str(budget)
+
+        summary = f'{request.method} {request.path}: {counter.count} queries in {counter.duration * 1000:.1f} ms'
+        mode = getattr(settings, 'QUERY_BUDGET_MODE', 'warn')
+        if budget is None or counter.count <= budget or mode == 'off':
+            logger.debug(summary)
+        elif mode == 'raise':
+            raise QueryBudgetExceeded(f'{summary}, budget {budget}')
+        else:
+            logger.warning('%s, budget %s', summary, budget)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # DRF views expose their class, and viewsets their method -> action map.
+        view_class = getattr(view_func, 'cls', view_func)
+        action = (getattr(view_func, 'actions', None) or {}).get(request.method.lower())
+        request.query_budget = get_query_budget(view_class, action)
+        return None
@@ -65,8 +65,9 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'config.query_budget.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'config.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -77,6 +78,11 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'config.urls'
 
+# Queries a request may run unless its view sets ``query_budget``; see
+# config/query_budget.py. Mode: 'warn' (log), 'raise' or 'off'.
+QUERY_BUDGET_DEFAULT = int(os.getenv('QUERY_BUDGET_DEFAULT', '20'))
+QUERY_BUDGET_MODE = os.getenv('QUERY_BUDGET_MODE', 'warn')
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -112,6 +118,18 @@ else:
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db_v2.sqlite3',
+            'OPTIONS': {
+                # Take the database write lock when a transaction starts so
+                # concurrent writers queue on the busy timeout instead of
+                # failing with "database is locked" when upgrading a read
+                # lock. SQLite has no row locks (select_for_update is a
+                # no-op), so this is also what keeps reservations race-free:
+                # every atomic() block in the app waits for the previous
+                # writer, whatever it touches. Use Postgres for write-heavy
+                # deployments.
+                'transaction_mode': 'IMMEDIATE',
+                'timeout': 20,
+            },
         }
     }
 
@@ -139,8 +157,15 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 # Let WhiteNoise serve files from STATICFILES_DIRS in production too.
 WHITENOISE_USE_FINDERS = True
 
+# Uploaded media (venue photos are stored content-addressed, see events.media).
+MEDIA_URL = '/media/'
+MEDIA_ROOT = os.getenv('MEDIA_ROOT', os.path.join(BASE_DIR, 'media'))
+
 # WhiteNoise: cache-busted static files (good for Vercel/prod).
 STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
     "staticfiles": {
         "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
     }
@@ -152,7 +177,7 @@ CORS_ALLOW_ALL_ORIGINS = True
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -166,6 +191,82 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 20,
 }
 
+# The default cache backs the venue catalog response cache (events.cache). Set
+# CACHE_BACKEND/CACHE_LOCATION to Redis or Memcached in production so all workers share it;
+# docker-compose.yml runs Redis. LocMem is only right for a single process (runserver).
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'toiapp-default'),
+    }
+}
+VENUE_CATALOG_CACHE_TIMEOUT = int(os.getenv('VENUE_CATALOG_CACHE_TIMEOUT', '300'))
+
+# Events older than this many days move to the archive tables together with
+# their bookings (manage.py archive_events, see events/archive.py).
+EVENT_ARCHIVE_AFTER_DAYS = int(os.getenv('EVENT_ARCHIVE_AFTER_DAYS', '365'))
+
+# ?updated_since= delta syncs (events/sync.py): how far back a finished pass
+# sets its cursor to cover transactions still open, and how long deletions
+# are remembered (manage.py prune_tombstones).
+DELTA_SYNC_MARGIN_SECONDS = int(os.getenv('DELTA_SYNC_MARGIN_SECONDS', '10'))
+DELTA_SYNC_RETENTION_DAYS = int(os.getenv('DELTA_SYNC_RETENTION_DAYS', '30'))
+
+# Venue full-text search: 'auto' picks tsvector on Postgres and FTS5 on SQLite
+# (see events.search); a dotted path selects a backend class explicitly.
+VENUE_SEARCH_BACKEND = os.getenv('VENUE_SEARCH_BACKEND', 'auto')
+VENUE_SEARCH_CONFIG = 'simple'
+
+# Authenticated users are cached per worker process (users/authentication.py)
+# for up to JWT_USER_CACHE_TTL seconds. With JWT_CLAIMS_ONLY_AUTH the user is
+# built from the access token's claims instead, without any lookup.
+JWT_USER_CACHE_SIZE = int(os.getenv('JWT_USER_CACHE_SIZE', '10000'))
+JWT_USER_CACHE_TTL = int(os.getenv('JWT_USER_CACHE_TTL', '60'))
+JWT_CLAIMS_ONLY_AUTH = env_bool('JWT_CLAIMS_ONLY_AUTH', False)
+
+# Refresh-token blacklist checks (users/blacklist.py): a Bloom filter of the
+# blacklisted tokens, rebuilt from the database every JWT_BLACKLIST_FILTER_TTL
+# seconds, backed by the default cache for tokens blacklisted in between.
+# Inert under LocMem (the default without CACHE_BACKEND): every check then reads
+# the database, as another worker's cache cannot be seen. Active with the
+# Redis cache of docker-compose.yml or any other shared CACHE_BACKEND.
+JWT_BLACKLIST_FILTER_TTL = int(os.getenv('JWT_BLACKLIST_FILTER_TTL', '300'))
+JWT_BLACKLIST_FILTER_ERROR_RATE = float(os.getenv('JWT_BLACKLIST_FILTER_ERROR_RATE', '0.01'))
+
+# Refreshes of the same token within this many seconds get the pair issued
+# by the first one instead of failing on the blacklist (users/refresh.py).
+JWT_REFRESH_GRACE_SECONDS = int(os.getenv('JWT_REFRESH_GRACE_SECONDS', '10'))
+
+# Login password checks run on a bounded pool (users/passwords.py): at most
+# PASSWORD_HASHING_WORKERS hashes at once (default: CPU count), with up to
+# PASSWORD_HASHING_QUEUE more waiting at most PASSWORD_HASHING_TIMEOUT seconds.
+PASSWORD_HASHING_WORKERS = int(os.getenv('PASSWORD_HASHING_WORKERS', '0')) or None
+PASSWORD_HASHING_QUEUE = int(os.getenv('PASSWORD_HASHING_QUEUE', '64'))
+PASSWORD_HASHING_TIMEOUT = int(os.getenv('PASSWORD_HASHING_TIMEOUT', '5'))
+
+# SMS sign-in codes (users/otp.py): users.otp.DatabaseOTPStore or
+# users.otp.CacheOTPStore. Codes expire after OTP_CODE_TTL_SECONDS and after
+# OTP_MAX_ATTEMPTS wrong guesses; a phone gets OTP_MAX_SENDS codes per window.
+OTP_STORE_BACKEND = os.getenv('OTP_STORE_BACKEND', 'users.otp.DatabaseOTPStore')
+OTP_CODE_TTL_SECONDS = int(os.getenv('OTP_CODE_TTL_SECONDS', '600'))
+OTP_MAX_ATTEMPTS = int(os.getenv('OTP_MAX_ATTEMPTS', '5'))
+OTP_MAX_SENDS = int(os.getenv('OTP_MAX_SENDS', '5'))
+OTP_SEND_WINDOW_SECONDS = int(os.getenv('OTP_SEND_WINDOW_SECONDS', '3600'))
+
+# Outbound SMS (users/sms.py) go through a per-process queue and a background
+# sender; SMS_PROVIDER is users.sms.TwilioProvider or users.sms.FakeProvider.
+SMS_PROVIDER = os.getenv('SMS_PROVIDER', 'users.sms.TwilioProvider')
+SMS_QUEUE_SIZE = int(os.getenv('SMS_QUEUE_SIZE', '1000'))
+SMS_BATCH_SIZE = int(os.getenv('SMS_BATCH_SIZE', '20'))
+SMS_SEND_TIMEOUT = int(os.getenv('SMS_SEND_TIMEOUT', '5'))
+SMS_MAX_RETRIES = int(os.getenv('SMS_MAX_RETRIES', '3'))
+SMS_RETRY_DELAY = float(os.getenv('SMS_RETRY_DELAY', '0.5'))
+SMS_BREAKER_THRESHOLD = int(os.getenv('SMS_BREAKER_THRESHOLD', '5'))
+SMS_BREAKER_COOLDOWN = int(os.getenv('SMS_BREAKER_COOLDOWN', '30'))
+TWILIO_ACCOUNT_SID = os.getenv('TWILIO_ACCOUNT_SID')
+TWILIO_AUTH_TOKEN = os.getenv('TWILIO_AUTH_TOKEN')
+TWILIO_PHONE_NUMBER = os.getenv('TWILIO_PHONE_NUMBER')
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=1),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
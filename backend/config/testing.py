@@ -0,0 +1,39 @@
+"""Test helpers shared by the apps' test suites."""
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from .query_budget import QueryCounter, get_query_budget
+
+
+class QueryBudgetAssertionsMixin:
+    """
+    Assertions for ``query_budget`` (see ``config.query_budget``), mixed into
+    an ``APITestCase``. Seed several related rows first so an N+1 query
+    shows up as a budget overrun.
+    """
+
+    def assertWithinQueryBudget(self, response):
+        """For responses that went through ``QueryBudgetMiddleware``."""
+        count, budget = int(response['X-Query-Count']), response.get('X-Query-Budget')
+        self.assertIsNotNone(budget, 'The view has no query budget.')
+        self.assertLessEqual(count, int(budget), f'{count} queries, budget {budget}.')
+
+    def assertViewSetWithinQueryBudget(self, viewset, user, pk=None, actions=('list', 'retrieve'), params=None):
+        """
+        Run the read actions of ``viewset`` as ``user`` and check each stays
+        within its budget. Works for viewsets that are not routed as well.
+        """
+        factory = APIRequestFactory()
+        for action in actions:
+            with self.subTest(viewset=viewset.__name__, action=action):
+                kwargs = {'pk': pk} if action == 'retrieve' else {}
+                request = factory.get('/', params or {})
+                force_authenticate(request, user=user)
+                view = viewset.as_view({'get': action})
+                counter = QueryCounter()
+                with counter.track():
+                    response = view(request, **kwargs)
+                    response.render()
+                self.assertEqual(response.status_code, 200, response.data)
+                budget = get_query_budget(viewset, action)
+                self.assertIsNotNone(budget, f'{viewset.__name__}.{action} has no query budget.')
+                self.assertLessEqual(counter.count, budget, f'{viewset.__name__}.{action}: {counter.count} queries.')
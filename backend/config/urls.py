@@ -6,9 +6,8 @@ from django.views.static import serve
 from drf_yasg import openapi
 from drf_yasg.views import get_schema_view
 from rest_framework import permissions
-from rest_framework_simplejwt.views import TokenRefreshView
 from toiapp.views import index
-from users.views import CustomTokenObtainPairView
+from users.views import CustomTokenObtainPairView, UserTokenRefreshView
 
 schema_view = get_schema_view(
     openapi.Info(
@@ -29,6 +28,8 @@ if assets_path.exists():
 
 if settings.DEBUG:
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
+    # Uploaded media (venue photos); in production the web server or storage backend serves MEDIA_URL.
+    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
 
 urlpatterns += [
     path('admin/', admin.site.urls),
@@ -36,8 +37,9 @@ urlpatterns += [
     path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
 
     path('api/token/', CustomTokenObtainPairView.as_view(), name='token_obtain_pair'),
-    path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('api/token/refresh/', UserTokenRefreshView.as_view(), name='token_refresh'),
     path('api/', include('users.urls')),
+    path('api/', include('events.urls')),
     path('api/', include('toiapp.urls')),
 ]
 
@@ -0,0 +1,92 @@
+"""
+Archival of past events and their finished bookings.
+
+Events dated before ``today - settings.EVENT_ARCHIVE_AFTER_DAYS`` move to
+``ArchivedEvent`` together with their bookings (``ArchivedBooking``), so
+overlap checks, lists and dashboards only scan recent and upcoming rows.
+Events that still have a pending booking stay live until it is decided.
+
+Work happens in batches of events, each copied and deleted in its own
+transaction: an interrupted run leaves every event either live or
+archived, and the next run picks up where it stopped. The daily rollup
+already counts archived rows (see ``events.rollup``), so it is untouched;
+the occupancy of the affected days is rebuilt, and the moved rows are
+logged as deleted for delta syncs of the live lists.
+"""
+from contextvars import ContextVar
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from . import occupancy, sync
+from .models import ArchivedBooking, ArchivedEvent, Booking, Event
+
+_archiving = ContextVar('events_archiving', default=False)
+
+
+def in_progress():
+    """True while a batch is being moved; delete signals skip their upkeep."""
+    return _archiving.get()
+
+
+def cutoff(today=None):
+    """Events dated before this day are due for archival."""
+    return (today or timezone.localdate()) - timedelta(days=getattr(settings, 'EVENT_ARCHIVE_AFTER_DAYS', 365))
+
+
+def due_events(before):
+    pending = Booking.objects.filter(event=OuterRef('pk'), status=Booking.STATUS_PENDING)
+    return Event.objects.filter(date__lt=before).filter(~Exists(pending))
+
+
+def _copy(instance, model, **extra):
+    values = {field.attname: getattr(instance, field.attname) for field in instance._meta.concrete_fields}
+    return model(**values, **extra)
+
+
+def archive_batch(before, batch_size=500):
+    """
+    Archive up to ``batch_size`` due events, oldest first, with their
+    bookings. Returns ``(events, bookings)`` moved; ``(0, 0)`` when done.
+    """
+    with transaction.atomic():
+        ids = list(due_events(before).order_by('date', 'pk').values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return 0, 0
+        # Re-check under the row locks in case a booking arrived meanwhile.
+        events = list(due_events(before).select_for_update().filter(pk__in=ids))
+        ids = [event.pk for event in events]
+        bookings = list(Booking.objects.select_for_update().filter(event_id__in=ids))
+
+        now = timezone.now()
+        ArchivedEvent.objects.bulk_create(_copy(event, ArchivedEvent, archived_at=now) for event in events)
+        ArchivedBooking.objects.bulk_create(_copy(booking, ArchivedBooking, archived_at=now) for booking in bookings)
+
+        token = _archiving.set(True)
+        try:
+            Booking.objects.filter(pk__in=[booking.pk for booking in bookings]).delete()
+            Event.objects.filter(pk__in=ids).delete()
+        finally:
+            _archiving.reset(token)
+        sync.record_deletions([*events, *bookings])
+        for venue_id, date in {(event.venue_id, event.date) for event in events}:
+            occupancy.rebuild_day(venue_id, date)
+    return len(events), len(bookings)
+
+
+def archive(before=None, batch_size=500, max_batches=None):
+    """
+    Run ``archive_batch`` until nothing is due or ``max_batches`` ran.
+    Yields the ``(events, bookings)`` count of every batch.
+    """
+    before = before or cutoff()
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        moved = archive_batch(before, batch_size)
+        if moved == (0, 0):
+            return
+        batches += 1
+        yield moved
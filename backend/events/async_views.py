@@ -0,0 +1,77 @@
+"""
+Async counterparts of the hot catalog reads, for the ASGI application (see
+``config.async_api``). Each one instantiates the sync viewset to reuse its
+queryset, filters, permissions and serializers, and only swaps the query
+execution for the async ORM. Catalog response caching and conditional GET
+stay with the sync endpoints.
+"""
+from asgiref.sync import sync_to_async
+from rest_framework.exceptions import NotFound, PermissionDenied
+
+from config.async_api import async_api_view, paginate
+
+from .filters import EventFilter
+from .search import get_search_backend
+from .serializers import VenueAvailabilityQuerySerializer
+from .services import available_venues
+from .views import EventViewSet, VenueViewSet
+
+
+def _viewset(viewset_class, request, action, **initkwargs):
+    view = viewset_class(**initkwargs)
+    view.request, view.action, view.format_kwarg = request, action, None
+    view.args, view.kwargs = (), {}
+    for permission in view.get_permissions():
+        if not permission.has_permission(request, view):
+            raise PermissionDenied(getattr(permission, 'message', None))
+    return view
+
+
+async def _venue_queryset(view):
+    # The search backend inspects the schema once, on first use.
+    await sync_to_async(get_search_backend)()
+    return view.filter_queryset(view.get_queryset())
+
+
+@async_api_view(query_budget=3)
+async def venue_list(request):
+    view = _viewset(VenueViewSet, request, 'list')
+    queryset = await _venue_queryset(view)
+    return await paginate(request, queryset, lambda rows: view.get_serializer(rows, many=True).data)
+
+
+@async_api_view(query_budget=2)
+async def venue_detail(request, pk):
+    view = _viewset(VenueViewSet, request, 'retrieve')
+    queryset = await _venue_queryset(view)
+    try:
+        venue = await queryset.aget(pk=pk)
+    except queryset.model.DoesNotExist:
+        raise NotFound()
+    for permission in view.get_permissions():
+        if not permission.has_object_permission(request, view, venue):
+            raise PermissionDenied(getattr(permission, 'message', None))
+    return view.get_serializer(venue).data
+
+
+@async_api_view(query_budget=3)
+async def venue_available(request):
+    """Venues free on ?date= between ?start= and ?end= for ?guests= people."""
+    view = _viewset(VenueViewSet, request, 'available')
+    params = VenueAvailabilityQuerySerializer(data=request.query_params)
+    params.is_valid(raise_exception=True)
+    queryset = available_venues(
+        await _venue_queryset(view),
+        params.validated_data['date'],
+        params.validated_data['start'],
+        params.validated_data['end'],
+        params.validated_data.get('guests'),
+    )
+    return await paginate(request, queryset, lambda rows: view.get_serializer(rows, many=True).data)
+
+
+@async_api_view(query_budget=3)
+async def event_list(request):
+    view = _viewset(EventViewSet, request, 'list', filterset_class=EventFilter)
+    queryset = view.filter_queryset(view.get_queryset())
+    return await paginate(request, queryset, lambda rows: view.get_serializer(rows, many=True).data)
@@ -0,0 +1,137 @@
+"""
+Shared response cache for the venue catalog.
+
+List and detail responses are stored in the default Django cache under keys
+built from the normalized query string and a version token. Saving or
+deleting a venue replaces the list token and that venue's token (again once
+the transaction commits), so stale entries become unreachable without
+enumerating keys. Works with any cache backend; use a shared one (Redis,
+Memcached, database) so every worker sees the same invalidations.
+"""
+import hashlib
+import uuid
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from rest_framework.response import Response
+
+PREFIX = 'venue_catalog'
+HITS_KEY = f'{PREFIX}:hits'
+MISSES_KEY = f'{PREFIX}:misses'
+
+
+def _timeout():
+    return getattr(settings, 'VENUE_CATALOG_CACHE_TIMEOUT', 300)
+
+
+def _token(key):
+    token = cache.get(key)
+    if token is None:
+        token = uuid.uuid4().hex
+        # add() keeps the first token if another worker raced us here.
+        if not cache.add(key, token, None):
+            token = cache.get(key) or token
+    return token
+
+
+def _list_token_key(label):
+    return f'{PREFIX}:{label}:list'
+
+
+def _object_token_key(label, pk):
+    return f'{PREFIX}:{label}:obj:{pk}'
+
+
+def invalidate(label, pk=None):
+    def bump():
+        keys = {_list_token_key(label): uuid.uuid4().hex}
+        if pk is not None:
+            keys[_object_token_key(label, pk)] = uuid.uuid4().hex
+        cache.set_many(keys, None)
+
+    bump()
+    # Bump again after commit: a concurrent reader may have cached the
+    # pre-commit rows under the new token in the meantime.
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(bump)
+
+
+def _count(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+
+
+def stats():
+    values = cache.get_many([HITS_KEY, MISSES_KEY])
+    hits, misses = values.get(HITS_KEY, 0), values.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {'hits': hits, 'misses': misses, 'hit_ratio': round(hits / total, 4) if total else None}
+
+
+def reset_stats():
+    cache.delete_many([HITS_KEY, MISSES_KEY])
+
+
+class CatalogCacheMixin:
+    """
+    Caches ``list`` and ``retrieve`` responses. Place it before
+    ``ConditionalGetMixin`` so a hit also answers conditional requests
+    from the stored validators without touching the database.
+    """
+
+    def get_cache_variant(self, request):
+        """Extra key part for viewsets whose output depends on the user."""
+        return ''
+
+    def _cache_key(self, request, token, action, pk=None):
+        params = sorted((key, value) for key in request.query_params for value in request.query_params.getlist(key))
+        raw = '|'.join((request.get_host(), action, str(pk), self.get_cache_variant(request), urlencode(params)))
+        digest = hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()
+        return f'{PREFIX}:{self.queryset.model._meta.label}:{token}:{digest}'
+
+    def _cached(self, request, key, handler, *args, **kwargs):
+        entry = cache.get(key)
+        if entry is not None:
+            _count(HITS_KEY)
+            self._etag, self._last_modified = entry['etag'], entry['last_modified']
+            if self._etag:
+                not_modified = get_conditional_response(
+                    request, etag=self._etag, last_modified=self._last_modified
+                )
+                if not_modified is not None:
+                    return not_modified
+            response = Response(entry['data'])
+            response['X-Cache'] = 'HIT'
+            return response
+
+        _count(MISSES_KEY)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(
+                key,
+                {
+                    'data': response.data,
+                    'etag': getattr(self, '_etag', None),
+                    'last_modified': getattr(self, '_last_modified', None),
+                },
+                _timeout(),
+            )
+        response['X-Cache'] = 'MISS'
+        return response
+
+    def list(self, request, *args, **kwargs):
+        label = self.queryset.model._meta.label
+        key = self._cache_key(request, _token(_list_token_key(label)), 'list')
+        return self._cached(request, key, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        label = self.queryset.model._meta.label
+        pk = kwargs.get(self.lookup_url_kwarg or self.lookup_field)
+        key = self._cache_key(request, _token(_object_token_key(label, pk)), 'retrieve', pk)
+        return self._cached(request, key, super().retrieve, *args, **kwargs)
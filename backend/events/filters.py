@@ -0,0 +1,37 @@
+import django_filters
+from django.db.models import FloatField, Value
+from rest_framework.filters import BaseFilterBackend
+
+from . import geo
+from .models import Event
+from .serializers import VenueNearQuerySerializer
+
+
+class VenueNearFilter(BaseFilterBackend):
+    """
+    ``?near=lat,lon&radius_km=`` keeps venues within the radius, nearest
+    first unless ``?ordering=`` is given. ``distance_km`` is null otherwise.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        if 'near' not in request.query_params:
+            return queryset.annotate(distance_km=Value(None, output_field=FloatField()))
+        params = VenueNearQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        latitude, longitude = params.validated_data['near']
+        queryset = geo.within(queryset, latitude, longitude, params.validated_data['radius_km'])
+        return queryset.order_by('distance_km', 'pk')
+
+
+class EventFilter(django_filters.FilterSet):
+    """
+    The event list filters with ``venue`` taken as a plain id. The default
+    model-choice filter looks the venue up while validating, which the async
+    views cannot do.
+    """
+
+    venue = django_filters.NumberFilter(field_name='venue_id')
+
+    class Meta:
+        model = Event
+        fields = ('date', 'status', 'venue')
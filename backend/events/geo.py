@@ -0,0 +1,89 @@
+"""
+Proximity search for venues without PostGIS.
+
+Venues carry ``latitude``/``longitude`` plus an indexed ``geo_cell``: the
+id of the fixed lat/lon grid square (``CELL_DEGREES`` wide) they fall in.
+A ``?near=`` query first narrows candidates to the grid cells covering the
+search circle's bounding box (an indexed ``IN`` lookup), then to the box
+itself, and only then computes the exact haversine distance in SQL.
+"""
+import math
+
+from django.db.models import FloatField, Q, Value
+from django.db.models.functions import ASin, Cos, Least, Power, Radians, Sin, Sqrt
+
+EARTH_RADIUS_KM = 6371.0088
+CELL_DEGREES = 0.25
+CELL_COLUMNS = int(360 / CELL_DEGREES)
+# Beyond this many cells the IN list costs more than it saves; the
+# bounding box alone is used instead.
+MAX_CELLS = 100
+
+
+def cell_for(latitude, longitude):
+    if latitude is None or longitude is None:
+        return None
+    row = min(int((latitude + 90) // CELL_DEGREES), int(180 / CELL_DEGREES) - 1)
+    column = int((longitude + 180) // CELL_DEGREES) % CELL_COLUMNS
+    return row * CELL_COLUMNS + column
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """
+    ``(min_lat, max_lat, [(min_lon, max_lon), ...])`` enclosing the circle.
+    Longitude ranges are split at the antimeridian.
+    """
+    angular = radius_km / EARTH_RADIUS_KM
+    min_lat = latitude - math.degrees(angular)
+    max_lat = latitude + math.degrees(angular)
+    if min_lat <= -90 or max_lat >= 90 or angular >= math.pi / 2:
+        return max(min_lat, -90.0), min(max_lat, 90.0), [(-180.0, 180.0)]
+
+    delta = math.degrees(math.asin(min(1.0, math.sin(angular) / math.cos(math.radians(latitude)))))
+    min_lon, max_lon = longitude - delta, longitude + delta
+    if min_lon < -180:
+        return min_lat, max_lat, [(min_lon + 360, 180.0), (-180.0, max_lon)]
+    if max_lon > 180:
+        return min_lat, max_lat, [(min_lon, 180.0), (-180.0, max_lon - 360)]
+    return min_lat, max_lat, [(min_lon, max_lon)]
+
+
+def cells_for_box(min_lat, max_lat, lon_ranges):
+    """Grid cells covering the box, or None when there are more than ``MAX_CELLS``."""
+    rows = range(cell_for(min_lat, 0) // CELL_COLUMNS, cell_for(max_lat, 0) // CELL_COLUMNS + 1)
+    columns = []
+    for min_lon, max_lon in lon_ranges:
+        first = cell_for(0, min_lon) % CELL_COLUMNS
+        last = cell_for(0, max_lon) % CELL_COLUMNS
+        columns.extend(range(first, last + 1))
+    if len(rows) * len(columns) > MAX_CELLS:
+        return None
+    return [row * CELL_COLUMNS + column for row in rows for column in columns]
+
+
+def distance_expression(latitude, longitude):
+    """Haversine distance in km from the given point, as an SQL expression."""
+    lat = Radians('latitude')
+    origin = math.radians(latitude)
+    value = Power(Sin((lat - Value(origin)) / 2), 2) + Value(math.cos(origin)) * Cos(lat) * Power(
+        Sin((Radians('longitude') - Value(math.radians(longitude))) / 2), 2
+    )
+    return Value(2 * EARTH_RADIUS_KM) * ASin(Least(Sqrt(value), Value(1.0)), output_field=FloatField())
+
+
+def within(queryset, latitude, longitude, radius_km):
+    """Venues within ``radius_km`` of the point, annotated with ``distance_km``."""
+    min_lat, max_lat, lon_ranges = bounding_box(latitude, longitude, radius_km)
+    box = Q(latitude__range=(min_lat, max_lat))
+    lon_match = Q()
+    for min_lon, max_lon in lon_ranges:
+        lon_match |= Q(longitude__range=(min_lon, max_lon))
+    cells = cells_for_box(min_lat, max_lat, lon_ranges)
+    if cells is not None:
+        box &= Q(geo_cell__in=cells)
+    return (
+        queryset.filter(box & lon_match)
+        .annotate(distance_km=distance_expression(latitude, longitude))
+        .filter(distance_km__lte=radius_km)
+    )
+
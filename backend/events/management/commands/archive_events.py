@@ -0,0 +1,37 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.utils import timezone
+
+from events import archive
+
+
+class Command(BaseCommand):
+    help = "Moves past events and their finished bookings to the archive tables in resumable batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, help="Archive events older than this many days (default: EVENT_ARCHIVE_AFTER_DAYS).")
+        parser.add_argument("--batch-size", type=int, default=500, help="Events per transaction.")
+        parser.add_argument("--max-batches", type=int, help="Stop after this many batches; rerun to continue.")
+        parser.add_argument("--dry-run", action="store_true", help="Only report what is due.")
+
+    def handle(self, *args, **options):
+        if options["days"] is not None:
+            if options["days"] < 1:
+                raise CommandError("--days must be at least 1.")
+            before = timezone.localdate() - timedelta(days=options["days"])
+        else:
+            before = archive.cutoff()
+
+        if options["dry_run"]:
+            due = archive.due_events(before).aggregate(events=Count("pk", distinct=True), bookings=Count("bookings"))
+            self.stdout.write(f"Due before {before}: {due['events']} events, {due['bookings']} bookings.")
+            return
+
+        events = bookings = 0
+        for moved_events, moved_bookings in archive.archive(before, options["batch_size"], options["max_batches"]):
+            events += moved_events
+            bookings += moved_bookings
+            self.stdout.write(f"Archived {events} events, {bookings} bookings so far.")
+        self.stdout.write(self.style.SUCCESS(f"Archived {events} events and {bookings} bookings dated before {before}."))
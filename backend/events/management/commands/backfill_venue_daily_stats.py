@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from events import rollup
+from events.models import ArchivedBooking, ArchivedEvent, Booking, Event, Venue, VenueDailyStats
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the daily venue statistics rollup from bookings and events, a chunk of venues at a time."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--venue", type=int, required=False, help="Only rebuild this venue id.")
+        parser.add_argument("--batch-size", type=int, default=200, help="Venue-days per transaction.")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        venues = Venue.objects.order_by("pk").values_list("pk", flat=True)
+        if options.get("venue"):
+            venues = venues.filter(pk=options["venue"])
+
+        days = 0
+        last_pk = 0
+        while True:
+            chunk = list(venues.filter(pk__gt=last_pk)[:batch_size])
+            if not chunk:
+                break
+            last_pk = chunk[-1]
+            pairs = set(Event.objects.filter(venue__in=chunk).values_list("venue_id", "date").distinct())
+            pairs |= set(Booking.objects.filter(venue__in=chunk).values_list("venue_id", "event__date").distinct())
+            pairs |= set(ArchivedEvent.objects.filter(venue__in=chunk).values_list("venue_id", "date").distinct())
+            pairs |= set(
+                ArchivedBooking.objects.filter(venue__in=chunk).values_list("venue_id", "event__date").distinct()
+            )
+            # Existing rows are included so days that no longer have activity are removed.
+            pairs |= set(VenueDailyStats.objects.filter(venue__in=chunk).values_list("venue_id", "date"))
+            ordered = sorted(pairs)
+            for start in range(0, len(ordered), batch_size):
+                with transaction.atomic():
+                    rollup.refresh(ordered[start:start + batch_size])
+            days += len(ordered)
+            self.stdout.write(f"Venues up to id {last_pk}: {days} venue-days so far.")
+
+        self.stdout.write(self.style.SUCCESS(f"Backfilled {days} venue-days."))
@@ -0,0 +1,194 @@
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.backends.signals import connection_created
+
+LATENCY_ENV = "BENCHMARK_DB_LATENCY_MS"
+
+# Sync endpoint served by the WSGI setup, and its async counterpart on ASGI.
+ENDPOINTS = {
+    "venues": ("/api/venues/", "/api/async/venues/"),
+    "venue": ("/api/venues/{venue}/", "/api/async/venues/{venue}/"),
+    "available": (
+        "/api/venues/available/?date=2031-01-01&start=10:00&end=12:00",
+        "/api/async/venues/available/?date=2031-01-01&start=10:00&end=12:00",
+    ),
+    "events": ("/api/events/", "/api/async/events/"),
+    "profile": ("/api/profile/", "/api/async/profile/"),
+}
+
+
+def _add_latency(sender, connection, **kwargs):
+    delay = float(os.environ[LATENCY_ENV]) / 1000
+
+    def wrapper(execute, sql, params, many, context):
+        time.sleep(delay)
+        return execute(sql, params, many, context)
+
+    connection.execute_wrappers.append(wrapper)
+
+
+def _install_latency():
+    if float(os.environ.get(LATENCY_ENV) or 0):
+        connection_created.connect(_add_latency)
+
+
+def wsgi_application():
+    """Server factory: ``config.wsgi`` plus the simulated database latency."""
+    from config.wsgi import application
+
+    _install_latency()
+    return application
+
+
+def asgi_application():
+    """Server factory: ``config.asgi`` plus the simulated database latency."""
+    from config.asgi import application
+
+    _install_latency()
+    return application
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-tests the read endpoints on the WSGI setup (gunicorn, sync views) and the ASGI setup "
+        "(uvicorn, async views) side by side at rising numbers of concurrent connections."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--endpoint", choices=sorted(ENDPOINTS), default="venues")
+        parser.add_argument("--concurrency", default="8,32,128,256", help="Comma-separated connection counts.")
+        parser.add_argument("--duration", type=float, default=5.0, help="Seconds per concurrency level.")
+        parser.add_argument(
+            "--db-latency-ms",
+            type=float,
+            default=0.0,
+            help="Delay added to every query in the started servers, standing in for a networked database.",
+        )
+        parser.add_argument("--workers", type=int, default=2, help="Worker processes per server.")
+        parser.add_argument("--threads", type=int, default=4, help="Threads per gunicorn worker.")
+        parser.add_argument("--wsgi-url", help="Benchmark a running WSGI server instead of starting one.")
+        parser.add_argument("--asgi-url", help="Benchmark a running ASGI server instead of starting one.")
+        parser.add_argument("--port", type=int, default=8101, help="First port for the started servers.")
+
+    def handle(self, *args, **options):
+        try:
+            import aiohttp  # noqa: F401
+        except ImportError:
+            raise CommandError("aiohttp is required for the load generator: pip install -r requirements-bench.txt")
+        from django.contrib.auth import get_user_model
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        from events.models import Venue
+
+        venue = Venue.objects.filter(is_active=True).order_by("pk").first()
+        if venue is None:
+            raise CommandError("No active venues; run seed_real_venues first.")
+        User = get_user_model()
+        user, _ = User.objects.get_or_create(
+            email="server-benchmark@example.com",
+            defaults={"username": "server-benchmark", "role": "admin"},
+        )
+        token = str(AccessToken.for_user(user))
+        levels = [int(level) for level in options["concurrency"].split(",") if level.strip()]
+        sync_path, async_path = (path.format(venue=venue.pk) for path in ENDPOINTS[options["endpoint"]])
+
+        env = {**os.environ, LATENCY_ENV: str(options["db_latency_ms"]), "DJANGO_SETTINGS_MODULE": settings.SETTINGS_MODULE}
+        servers = []
+        try:
+            wsgi_url = options["wsgi_url"]
+            if not wsgi_url:
+                port = options["port"]
+                servers.append(self._start([
+                    "gunicorn", f"{__name__}:wsgi_application()", "--bind", f"127.0.0.1:{port}",
+                    "--workers", str(options["workers"]), "--threads", str(options["threads"]),
+                ], env, port))
+                wsgi_url = f"http://127.0.0.1:{port}"
+            asgi_url = options["asgi_url"]
+            if not asgi_url:
+                port = options["port"] + 1
+                servers.append(self._start([
+                    "uvicorn", f"{__name__}:asgi_application", "--factory", "--host", "127.0.0.1",
+                    "--port", str(port), "--workers", str(options["workers"]), "--log-level", "warning",
+                ], env, port))
+                asgi_url = f"http://127.0.0.1:{port}"
+
+            self.stdout.write(
+                f"{options['endpoint']}: WSGI {sync_path} vs ASGI {async_path}, "
+                f"{options['duration']:.0f}s per level, db latency {options['db_latency_ms']:.0f} ms"
+            )
+            self.stdout.write(f"{'server':<6} {'conns':>6} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+            for level in levels:
+                for name, url in (("wsgi", wsgi_url + sync_path), ("asgi", asgi_url + async_path)):
+                    result = asyncio.run(self._load(url, token, level, options["duration"]))
+                    self.stdout.write(
+                        f"{name:<6} {level:>6} {result['rate']:>9.1f} {result['p50']:>8.1f} "
+                        f"{result['p95']:>8.1f} {result['p99']:>8.1f} {result['errors']:>7}"
+                    )
+        finally:
+            for server in servers:
+                server.terminate()
+                server.wait(timeout=10)
+        self.stdout.write(self.style.SUCCESS("Done."))
+
+    def _start(self, command, env, port):
+        process = subprocess.Popen(
+            [sys.executable, "-m", *command], env=env, cwd=settings.BASE_DIR,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise CommandError(f"{command[0]} exited with code {process.returncode}.")
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+                return process
+            except OSError:
+                time.sleep(0.2)
+        process.terminate()
+        raise CommandError(f"{command[0]} did not start listening on port {port}.")
+
+    async def _load(self, url, token, connections, duration):
+        import aiohttp
+
+        latencies, errors = [], 0
+        headers = {"Authorization": f"Bearer {token}"}
+        connector = aiohttp.TCPConnector(limit=connections)
+        timeout = aiohttp.ClientTimeout(total=60)
+        async with aiohttp.ClientSession(connector=connector, headers=headers, timeout=timeout) as session:
+            deadline = time.perf_counter() + duration
+
+            async def client():
+                nonlocal errors
+                while time.perf_counter() < deadline:
+                    started = time.perf_counter()
+                    try:
+                        async with session.get(url) as response:
+                            await response.read()
+                            ok = response.status == 200
+                    except (aiohttp.ClientError, asyncio.TimeoutError):
+                        ok = False
+                    if ok:
+                        latencies.append((time.perf_counter() - started) * 1000)
+                    else:
+                        errors += 1
+
+            started = time.perf_counter()
+            await asyncio.gather(*(client() for _ in range(connections)))
+            elapsed = time.perf_counter() - started
+
+        percentiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [0.0] * 99
+        return {
+            "rate": len(latencies) / elapsed,
+            "p50": percentiles[49],
+            "p95": percentiles[94],
+            "p99": percentiles[98],
+            "errors": errors,
+        }
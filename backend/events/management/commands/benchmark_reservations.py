@@ -0,0 +1,119 @@
+import random
+import threading
+import time
+from datetime import date, timedelta
+from datetime import time as dtime
+from itertools import combinations
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, IntegrityError, connection
+
+from events.models import Event, Venue, VenueOccupancy
+from events.services import reserve_slot, validate_no_time_overlap
+
+
+class Command(BaseCommand):
+    help = "Hammers event reservation from many threads and reports throughput and double bookings."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--attempts", type=int, default=50, help="Reservation attempts per thread.")
+        parser.add_argument("--venues", type=int, default=4)
+        parser.add_argument("--days", type=int, default=2)
+        parser.add_argument(
+            "--unsafe",
+            action="store_true",
+            help="Check then insert without reserve_slot, as the API did before, to show the race.",
+        )
+        parser.add_argument("--keep", action="store_true", help="Keep the benchmark venues and events.")
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        organizer, _ = User.objects.get_or_create(
+            email="reservation-benchmark@example.com",
+            defaults={"username": "reservation-benchmark", "role": "organizer"},
+        )
+        venues = [
+            Venue.objects.create(name=f"Benchmark venue {index}", address="-", capacity=100, price_per_hour=1000)
+            for index in range(options["venues"])
+        ]
+        first_day = date.today() + timedelta(days=365)
+        days = [first_day + timedelta(days=offset) for offset in range(options["days"])]
+        counts = {"reserved": 0, "conflicts": 0, "errors": 0}
+        lock = threading.Lock()
+
+        def worker(seed):
+            rng = random.Random(seed)
+            local = dict.fromkeys(counts, 0)
+            try:
+                for _ in range(options["attempts"]):
+                    venue, day = rng.choice(venues), rng.choice(days)
+                    start = rng.randint(8, 20)
+                    start_time, end_time = dtime(start), dtime(min(start + rng.randint(1, 3), 23))
+
+                    def save():
+                        return Event.objects.create(
+                            title="Benchmark",
+                            date=day,
+                            start_time=start_time,
+                            end_time=end_time,
+                            organizer=organizer,
+                            venue=venue,
+                        )
+
+                    try:
+                        if options["unsafe"]:
+                            validate_no_time_overlap(venue, day, start_time, end_time)
+                            save()
+                        else:
+                            reserve_slot(venue, day, start_time, end_time, save)
+                        local["reserved"] += 1
+                    except (ValueError, IntegrityError):
+                        local["conflicts"] += 1
+                    except DatabaseError:
+                        local["errors"] += 1
+            finally:
+                connection.close()
+                with lock:
+                    for key, value in local.items():
+                        counts[key] += value
+
+        threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(options["threads"])]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        attempts = options["threads"] * options["attempts"]
+        double_bookings = self._double_bookings(venues)
+        self.stdout.write(
+            f"{connection.vendor}, {'unsafe' if options['unsafe'] else 'reserve_slot'}: "
+            f"{attempts} attempts from {options['threads']} threads in {elapsed:.2f}s "
+            f"({attempts / elapsed:.0f}/s)"
+        )
+        self.stdout.write(
+            f"reserved={counts['reserved']} conflicts={counts['conflicts']} errors={counts['errors']} "
+            f"double_bookings={double_bookings}"
+        )
+
+        if not options["keep"]:
+            Event.objects.filter(venue__in=venues).delete()
+            VenueOccupancy.objects.filter(venue__in=venues).delete()
+            Venue.objects.filter(pk__in=[venue.pk for venue in venues]).delete()
+            organizer.delete()
+
+        style = self.style.SUCCESS if double_bookings == 0 else self.style.ERROR
+        self.stdout.write(style(f"{double_bookings} overlapping event pairs."))
+
+    def _double_bookings(self, venues):
+        found = 0
+        events = Event.objects.filter(venue__in=venues).values_list("venue_id", "date", "start_time", "end_time")
+        slots = {}
+        for venue_id, day, start, end in events:
+            slots.setdefault((venue_id, day), []).append((start, end))
+        for intervals in slots.values():
+            found += sum(1 for a, b in combinations(intervals, 2) if a[0] < b[1] and b[0] < a[1])
+        return found
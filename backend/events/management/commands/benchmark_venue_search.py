@@ -0,0 +1,71 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from events.models import Venue
+from events.search import LikeSearchBackend, get_search_backend
+
+WORDS = (
+    "hall", "garden", "terrace", "banquet", "wedding", "palace", "ethno", "yurt", "lake",
+    "mountain", "center", "grand", "royal", "bishkek", "osh", "karakol", "issyk", "chuy",
+    "modern", "classic", "premium", "family", "restaurant", "hotel", "villa", "park",
+)
+QUERIES = ("wedding hall", "issyk lake", "royal", "premium restaurant bishkek", "yurt")
+
+
+class Command(BaseCommand):
+    help = "Benchmarks the configured venue search backend against LIKE filtering on synthetic venues."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--venues", type=int, default=100_000, help="Synthetic venues to create.")
+        parser.add_argument("--repeat", type=int, default=5, help="Runs per query.")
+        parser.add_argument("--keep", action="store_true", help="Keep the synthetic venues.")
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        rng = random.Random(42)
+        with transaction.atomic():
+            self.stdout.write(f"Creating {options['venues']} venues...")
+            Venue.objects.bulk_create(
+                (
+                    Venue(
+                        name=" ".join(rng.choices(WORDS, k=2)).title(),
+                        address=f"{rng.randint(1, 300)} {' '.join(rng.choices(WORDS, k=2))} street",
+                        description=" ".join(rng.choices(WORDS, k=30)),
+                        capacity=rng.randint(20, 800),
+                        price_per_hour=rng.randint(1000, 30000),
+                    )
+                    for _ in range(options["venues"])
+                ),
+                batch_size=2000,
+            )
+            # bulk_create bypasses the save signals that maintain the index.
+            backend.rebuild()
+
+            rows = [("query", "like ms", f"{type(backend).__name__} ms", "matches")]
+            for query in QUERIES:
+                like_ms, like_count = self._time(LikeSearchBackend(), query, options["repeat"])
+                fts_ms, fts_count = self._time(backend, query, options["repeat"])
+                rows.append((query, f"{like_ms:.1f}", f"{fts_ms:.1f}", f"{like_count}/{fts_count}"))
+            for row in rows:
+                self.stdout.write("{:<30} {:>10} {:>24} {:>14}".format(*row))
+
+            if not options["keep"]:
+                transaction.set_rollback(True)
+        if not options["keep"]:
+            backend.rebuild()
+
+    def _time(self, backend, query, repeat):
+        qs = Venue.objects.filter(is_active=True)
+        best = float("inf")
+        count = 0
+        for _ in range(repeat):
+            started = time.perf_counter()
+            # Same shape as a list page: count plus the first 20 rows.
+            searched = backend.search(qs, query)
+            count = searched.count()
+            list(searched[:20])
+            best = min(best, (time.perf_counter() - started) * 1000)
+        return best, count
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from events import occupancy
+
+
+class Command(BaseCommand):
+    help = "Reports venue-days whose occupancy index differs from the events table."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--venue", type=int, required=False, help="Only check this venue id.")
+
+    def handle(self, *args, **options):
+        problems = 0
+        for venue_id, date, stored, expected in occupancy.find_inconsistencies(options.get("venue")):
+            problems += 1
+            self.stderr.write(f"venue {venue_id} on {date}: index {stored} != events {expected}")
+        if problems:
+            raise CommandError(f"{problems} inconsistent venue-days; run rebuild_venue_occupancy.")
+        self.stdout.write(self.style.SUCCESS("Occupancy index is consistent."))
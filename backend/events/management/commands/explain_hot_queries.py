@@ -0,0 +1,88 @@
+from datetime import date, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from events.models import Booking, Event, Venue
+from events.services import available_venues
+from toiapp.models import Booking as LegacyBooking
+from toiapp.models import PhoneVerification as LegacyPhoneVerification
+from users.models import PhoneVerification
+
+
+class Command(BaseCommand):
+    help = "Prints EXPLAIN plans for the hot API queries and flags full table scans."
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        day = date.today()
+        start, end = time(10, 0), time(12, 0)
+        now = timezone.now()
+        since = now - timedelta(minutes=10)
+
+        queries = [
+            (
+                "event overlap (validate_no_time_overlap)",
+                Event.objects.filter(venue_id=1, date=day, start_time__lt=end, end_time__gt=start),
+            ),
+            (
+                "organizer event list (EventViewSet)",
+                Event.objects.filter(organizer_id=1).order_by("-date", "-start_time")[:20],
+            ),
+            (
+                "active venue list (VenueViewSet)",
+                Venue.objects.filter(is_active=True).order_by("-created_at")[:20],
+            ),
+            (
+                "venue availability anti-join",
+                available_venues(Venue.objects.all(), day, start, end, 50)[:20],
+            ),
+            (
+                "user bookings (BookingViewSet)",
+                Booking.objects.filter(user_id=1).order_by("-created_at")[:20],
+            ),
+            (
+                "legacy booking overlap (toiapp BookingViewSet)",
+                LegacyBooking.objects.filter(
+                    venue_id=1, status__in=["pending", "confirmed"], start_time__lt=now, end_time__gt=since
+                ),
+            ),
+            (
+                "phone verification (VerifyCodeAPIView)",
+                PhoneVerification.objects.filter(
+                    phone="+996700000000", code="000000", is_verified=False, created_at__gte=since
+                ).order_by("-created_at")[:1],
+            ),
+            (
+                "legacy phone verification (toiapp VerifyCodeView)",
+                LegacyPhoneVerification.objects.filter(
+                    phone="+996700000000", code="000000", is_verified=False, created_at__gte=since
+                ).order_by("-created_at")[:1],
+            ),
+            ("user by phone", User.objects.filter(phone="+996700000000")[:1]),
+        ]
+
+        scans = 0
+        for title, queryset in queries:
+            plan = queryset.explain()
+            scan = self._has_table_scan(plan)
+            scans += scan
+            style = self.style.WARNING if scan else self.style.SUCCESS
+            self.stdout.write(style(f"== {title}{' [table scan]' if scan else ''}"))
+            self.stdout.write(plan)
+            self.stdout.write("")
+        summary = f"{len(queries) - scans}/{len(queries)} hot queries use an index."
+        self.stdout.write((self.style.WARNING if scans else self.style.SUCCESS)(summary))
+
+    def _has_table_scan(self, plan):
+        if connection.vendor == "postgresql":
+            return "Seq Scan" in plan
+        if connection.vendor == "sqlite":
+            # "SCAN <table>" without an index; "SCAN ... USING INDEX" is fine.
+            return any(
+                "SCAN " in line and "USING" not in line and "VIRTUAL TABLE" not in line
+                for line in plan.splitlines()
+            )
+        return False
@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand
+
+from events import media
+from events.models import Venue
+from toiapp.models import Venue as LegacyVenue
+
+
+class Command(BaseCommand):
+    help = "Moves inline data-URL venue photos into the content-addressed media store."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=50,
+            help="Venues loaded per batch (each row may hold several megabytes of photos).",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report what would be converted without writing anything.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options["batch_size"])
+        dry_run = options["dry_run"]
+        for model in (Venue, LegacyVenue):
+            converted, photos = self._migrate(model, batch_size, dry_run)
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{model._meta.label}: converted {photos} photos in {converted} venues."
+                )
+            )
+
+    def _migrate(self, model, batch_size, dry_run):
+        converted = 0
+        photos = 0
+        last_id = 0
+        while True:
+            # Keyset batches keep memory bounded and never rescan converted rows.
+            batch = list(
+                model.objects.filter(id__gt=last_id).order_by("id").only("id", "photos")[:batch_size]
+            )
+            if not batch:
+                break
+            last_id = batch[-1].id
+
+            changed = []
+            for venue in batch:
+                inline = sum(1 for value in venue.photos or [] if media.is_data_url(value))
+                if not inline:
+                    continue
+                photos += inline
+                if not dry_run:
+                    try:
+                        venue.photos = media.normalize_photos(venue.photos)
+                    except ValueError as exc:
+                        self.stderr.write(self.style.WARNING(f"{model._meta.label} #{venue.id}: {exc}"))
+                        continue
+                changed.append(venue)
+
+            if changed and not dry_run:
+                model.objects.bulk_update(changed, ["photos"])
+            converted += len(changed)
+        return converted, photos
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from events import sync
+
+
+class Command(BaseCommand):
+    help = "Deletes delta-sync tombstones older than DELTA_SYNC_RETENTION_DAYS."
+
+    def handle(self, *args, **options):
+        deleted = sync.prune()
+        self.stdout.write(self.style.SUCCESS(f"Pruned {deleted} tombstones."))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from events import occupancy
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the per-venue, per-day occupancy index from the events table."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--venue", type=int, required=False, help="Only rebuild this venue id.")
+
+    def handle(self, *args, **options):
+        # Collect first: rewriting rows while the comparison cursors are open is unsafe on SQLite.
+        stale = [(venue_id, date) for venue_id, date, _, _ in occupancy.find_inconsistencies(options.get("venue"))]
+        for venue_id, date in stale:
+            occupancy.rebuild_day(venue_id, date)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {len(stale)} venue-days."))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from events.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the venue full-text search index for the configured backend."
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        backend.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt venue search index ({type(backend).__name__})."))
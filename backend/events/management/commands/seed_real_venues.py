@@ -11,6 +11,8 @@ REAL_VENUES = [
         "capacity": 300,
         "description": "International hotel with event halls suitable for weddings and corporate events.",
         "price_per_hour": "12000.00",
+        "latitude": 42.8746,
+        "longitude": 74.5886,
     },
     {
         "name": "Novotel Bishkek City Center",
@@ -18,6 +20,8 @@ REAL_VENUES = [
         "capacity": 220,
         "description": "City-center venue with modern banquet and conference spaces.",
         "price_per_hour": "9000.00",
+        "latitude": 42.8712,
+        "longitude": 74.6046,
     },
     {
         "name": "Hyatt Regency Bishkek",
@@ -25,6 +29,8 @@ REAL_VENUES = [
         "capacity": 250,
         "description": "Premium hotel venue for large celebrations and business events.",
         "price_per_hour": "15000.00",
+        "latitude": 42.8764,
+        "longitude": 74.6119,
     },
     {
         "name": "Orion Hotel Bishkek",
@@ -32,6 +38,8 @@ REAL_VENUES = [
         "capacity": 180,
         "description": "Elegant venue with service infrastructure for private events.",
         "price_per_hour": "10000.00",
+        "latitude": 42.8700,
+        "longitude": 74.6083,
     },
     {
         "name": "Supara Ethno Complex",
@@ -39,6 +47,8 @@ REAL_VENUES = [
         "capacity": 400,
         "description": "Traditional ethno-complex for large outdoor and cultural events.",
         "price_per_hour": "18000.00",
+        "latitude": 42.6786,
+        "longitude": 74.5962,
     },
 ]
 
@@ -78,14 +88,25 @@ class Command(BaseCommand):
                     "whatsapp": "+996700000000",
                     "photos": [],
                     "amenities": ["parking"],
+                    "latitude": item["latitude"],
+                    "longitude": item["longitude"],
                     "is_active": True,
                 },
             )
             if created:
                 created_count += 1
-            elif owner and venue.owner_id != owner.id:
+                continue
+
+            update_fields = []
+            if owner and venue.owner_id != owner.id:
                 venue.owner = owner
-                venue.save(update_fields=["owner"])
+                update_fields.append("owner")
+            if venue.latitude is None or venue.longitude is None:
+                venue.latitude = item["latitude"]
+                venue.longitude = item["longitude"]
+                update_fields += ["latitude", "longitude"]
+            if update_fields:
+                venue.save(update_fields=update_fields)
                 updated_count += 1
 
         self.stdout.write(
@@ -0,0 +1,103 @@
+"""
+Content-addressed storage for venue photos.
+
+Photo bytes are written once to the default storage under their SHA-256
+digest, so identical uploads share a single file. Venue rows keep only the
+short reference (``<digest>.<ext>``) and serializers turn it back into a URL.
+"""
+import base64
+import binascii
+import hashlib
+import re
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+PHOTO_DIR = 'venue_photos'
+MAX_PHOTOS = 10
+MAX_PHOTO_BYTES = 10 * 1024 * 1024
+
+IMAGE_EXTENSIONS = {
+    'image/jpeg': 'jpg',
+    'image/jpg': 'jpg',
+    'image/png': 'png',
+    'image/gif': 'gif',
+    'image/webp': 'webp',
+    'image/heic': 'heic',
+    'image/heif': 'heif',
+}
+
+_DATA_URL_RE = re.compile(r'^data:(?P<mime>[\w.+-]+/[\w.+-]+);base64,(?P<data>.*)$', re.DOTALL)
+_REF_RE = re.compile(r'^[0-9a-f]{64}\.[a-z0-9]{2,5}$')
+
+
+def is_data_url(value) -> bool:
+    return isinstance(value, str) and value.startswith('data:')
+
+
+def is_photo_ref(value) -> bool:
+    return isinstance(value, str) and bool(_REF_RE.match(value))
+
+
+def photo_path(ref: str) -> str:
+    # Fan out by digest prefix so no single directory grows unbounded.
+    return f'{PHOTO_DIR}/{ref[:2]}/{ref}'
+
+
+def store_photo(content: bytes, extension: str) -> str:
+    """Store raw image bytes and return their reference; existing blobs are reused."""
+    if not content:
+        raise ValueError('Photo is empty.')
+    if len(content) > MAX_PHOTO_BYTES:
+        raise ValueError('Photo is too large.')
+    ref = f'{hashlib.sha256(content).hexdigest()}.{extension}'
+    path = photo_path(ref)
+    if not default_storage.exists(path):
+        default_storage.save(path, ContentFile(content))
+    return ref
+
+
+def store_data_url(value: str) -> str:
+    match = _DATA_URL_RE.match(value)
+    if not match:
+        raise ValueError('Photo must be a base64 data URL.')
+    extension = IMAGE_EXTENSIONS.get(match.group('mime').lower())
+    if extension is None:
+        raise ValueError('Unsupported photo type.')
+    try:
+        content = base64.b64decode(match.group('data'), validate=True)
+    except (binascii.Error, ValueError):
+        raise ValueError('Photo data is not valid base64.')
+    return store_photo(content, extension)
+
+
+def normalize_photos(values) -> list:
+    """
+    Convert incoming photo values into what is stored on the venue row.
+
+    Data URLs are moved into the store, known references and external
+    http(s) URLs are kept as-is.
+    """
+    photos = []
+    for value in values or []:
+        if is_data_url(value):
+            ref = store_data_url(value)
+        elif is_photo_ref(value) or (isinstance(value, str) and value.startswith(('http://', 'https://'))):
+            ref = value
+        elif isinstance(value, str) and value.startswith(f'{settings.MEDIA_URL}{PHOTO_DIR}/'):
+            # A URL previously returned by the API is echoed back on update.
+            ref = value.rsplit('/', 1)[-1]
+            if not is_photo_ref(ref):
+                raise ValueError('Unknown photo reference.')
+        else:
+            raise ValueError('Unsupported photo value.')
+        if ref not in photos:
+            photos.append(ref)
+    return photos
+
+
+def photo_url(value: str) -> str:
+    if is_photo_ref(value):
+        return default_storage.url(photo_path(value))
+    return value
@@ -0,0 +1,58 @@
+from django.db import migrations
+
+POSTGRES_FORWARD = [
+    """
+    ALTER TABLE events_venue ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(address, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(description, '')), 'C')
+    ) STORED
+    """,
+    'CREATE INDEX events_venue_search_gin ON events_venue USING gin (search_vector)',
+]
+POSTGRES_REVERSE = [
+    'DROP INDEX IF EXISTS events_venue_search_gin',
+    'ALTER TABLE events_venue DROP COLUMN IF EXISTS search_vector',
+]
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS events_venue_fts
+    USING fts5(name, address, description, tokenize = 'unicode61 remove_diacritics 2')
+    """,
+    """
+    INSERT INTO events_venue_fts (rowid, name, address, description)
+    SELECT id, name, address, description FROM events_venue
+    """,
+]
+SQLITE_REVERSE = [
+    'DROP TABLE IF EXISTS events_venue_fts',
+]
+
+
+def _run(statements_by_vendor):
+    def run(apps, schema_editor):
+        connection = schema_editor.connection
+        if connection.vendor == 'sqlite':
+            # Builds without the FTS5 module fall back to LIKE search.
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+                if not cursor.fetchone()[0]:
+                    return
+        for statement in statements_by_vendor.get(connection.vendor, ()):
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0005_event_budget'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            _run({'postgresql': POSTGRES_FORWARD, 'sqlite': SQLITE_FORWARD}),
+            _run({'postgresql': POSTGRES_REVERSE, 'sqlite': SQLITE_REVERSE}),
+        ),
+    ]
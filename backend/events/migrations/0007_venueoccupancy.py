@@ -0,0 +1,27 @@
+# Generated by Django 5.2.10 on 2026-10-18 13:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0006_venue_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VenueOccupancy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('intervals', models.JSONField(blank=True, default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('venue', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occupancy', to='events.venue')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('venue', 'date'), name='events_occupancy_venue_date_uniq')],
+            },
+        ),
+    ]
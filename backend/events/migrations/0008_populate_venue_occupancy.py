@@ -0,0 +1,37 @@
+from itertools import groupby
+
+from django.db import migrations
+
+
+def _seconds(value):
+    return value.hour * 3600 + value.minute * 60 + value.second
+
+
+def populate(apps, schema_editor):
+    Event = apps.get_model('events', 'Event')
+    VenueOccupancy = apps.get_model('events', 'VenueOccupancy')
+    rows = (
+        Event.objects.filter(venue__isnull=False)
+        .order_by('venue_id', 'date', 'start_time', 'id')
+        .values_list('venue_id', 'date', 'start_time', 'end_time', 'id')
+        .iterator(chunk_size=2000)
+    )
+    batch = []
+    for (venue_id, date), group in groupby(rows, key=lambda row: (row[0], row[1])):
+        intervals = [[_seconds(start), _seconds(end), event_id] for _, _, start, end, event_id in group]
+        batch.append(VenueOccupancy(venue_id=venue_id, date=date, intervals=intervals))
+        if len(batch) >= 500:
+            VenueOccupancy.objects.bulk_create(batch)
+            batch = []
+    VenueOccupancy.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0007_venueoccupancy'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.10 on 2026-10-18 13:25
+
+from django.conf import settings
+from django.db import migrations, models
+
+from config.migration_operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('events', '0008_populate_venue_occupancy'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='booking',
+            index=models.Index(fields=['user', '-created_at'], name='events_booking_user_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='booking',
+            index=models.Index(condition=models.Q(('status__in', ['pending', 'approved'])), fields=['venue', 'event'], name='events_booking_active_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='event',
+            index=models.Index(fields=['venue', 'date', 'start_time', 'end_time'], name='events_event_venue_slot_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='event',
+            index=models.Index(fields=['organizer', '-date', '-start_time'], name='events_event_organizer_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='venue',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-created_at'], name='events_venue_active_idx'),
+        ),
+    ]
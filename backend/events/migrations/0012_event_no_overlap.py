@@ -0,0 +1,39 @@
+from django.db import migrations
+
+# Rejects two events of one venue whose [date + start, date + end) ranges
+# overlap, so concurrent reservations cannot both commit. Other backends
+# rely on the venue-day lock in events.services.reserve_slot instead.
+POSTGRES_FORWARD = [
+    'CREATE EXTENSION IF NOT EXISTS btree_gist',
+    """
+    ALTER TABLE events_event ADD CONSTRAINT events_event_no_overlap
+    EXCLUDE USING gist (
+        venue_id WITH =,
+        tsrange(date + start_time, date + end_time, '[)') WITH &&
+    )
+    WHERE (venue_id IS NOT NULL AND end_time > start_time)
+    """,
+]
+POSTGRES_REVERSE = [
+    'ALTER TABLE events_event DROP CONSTRAINT IF EXISTS events_event_no_overlap',
+]
+
+
+def _run(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0011_venue_coordinates'),
+    ]
+
+    operations = [
+        migrations.RunPython(_run(POSTGRES_FORWARD), _run(POSTGRES_REVERSE)),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.10 on 2026-10-18 13:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0012_event_no_overlap'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VenueDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('pending_bookings', models.PositiveIntegerField(default=0)),
+                ('approved_bookings', models.PositiveIntegerField(default=0)),
+                ('cancelled_bookings', models.PositiveIntegerField(default=0)),
+                ('rejected_bookings', models.PositiveIntegerField(default=0)),
+                ('booked_seconds', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('events', models.PositiveIntegerField(default=0)),
+                ('event_seconds', models.PositiveIntegerField(default=0)),
+                ('guests', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('venue', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='events.venue')),
+            ],
+            options={
+                'ordering': ['venue', 'date'],
+                'constraints': [models.UniqueConstraint(fields=('venue', 'date'), name='events_daily_stats_venue_date_uniq')],
+            },
+        ),
+    ]
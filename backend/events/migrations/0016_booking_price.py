@@ -0,0 +1,33 @@
+# Generated by Django 5.2.10 on 2026-10-18 14:41
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def populate(apps, schema_editor):
+    # Existing bookings keep today's rate, as the rollup already assumed.
+    Venue = apps.get_model('events', 'Venue')
+    price = Subquery(Venue.objects.filter(pk=OuterRef('venue_id')).values('price_per_hour')[:1])
+    for name in ('Booking', 'ArchivedBooking'):
+        apps.get_model('events', name).objects.filter(price_per_hour__isnull=True).update(price_per_hour=price)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0015_delta_sync'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedbooking',
+            name='price_per_hour',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='booking',
+            name='price_per_hour',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=10, null=True),
+        ),
+        migrations.RunPython(populate, migrations.RunPython.noop),
+    ]
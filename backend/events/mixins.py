@@ -0,0 +1,191 @@
+import hashlib
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Count, Max, Subquery
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from .models import Tombstone
+from .sync import AUDIENCE
+
+
+def _split_param(value):
+    return [item.strip() for item in (value or '').split(',') if item.strip()]
+
+
+class SparseFieldsetSerializerMixin:
+    """
+    Lets callers restrict the serialized fields:
+    ``Serializer(instance, fields=['id', 'name'])`` or ``exclude=[...]``.
+    """
+
+    def __init__(self, *args, fields=None, exclude=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        unknown = set(fields or ()) | set(exclude or ())
+        unknown -= set(self.fields)
+        if unknown:
+            raise serializers.ValidationError({'fields': [f'Unknown field(s): {", ".join(sorted(unknown))}.']})
+        if fields:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+        for name in exclude or ():
+            self.fields.pop(name, None)
+
+
+def restrict_queryset_to_fields(queryset, serializer_fields):
+    """
+    Map serializer fields onto ``only()``/``select_related()`` so unused columns
+    are never read. Falls back to the untouched queryset when a field is not
+    backed by a plain model column or a forward relation.
+    """
+    model = queryset.model
+    only = {model._meta.pk.name}
+    related = set()
+    for field in serializer_fields.values():
+        if field.source == '*':
+            return queryset
+        attrs = field.source_attrs
+        if len(attrs) == 1 and attrs[0] in queryset.query.annotations:
+            continue
+        try:
+            model_field = model._meta.get_field(attrs[0])
+        except FieldDoesNotExist:
+            return queryset
+        if not model_field.concrete:
+            return queryset
+        if len(attrs) == 1:
+            only.add(attrs[0])
+            continue
+        if not model_field.is_relation or len(attrs) != 2:
+            return queryset
+        related.add(attrs[0])
+        only.add('__'.join(attrs))
+    return queryset.select_related(None).select_related(*sorted(related)).only(*sorted(only))
+
+
+class SparseFieldsetMixin:
+    """
+    ViewSet mixin for read requests:
+
+    - ``?fields=a,b`` / ``?exclude=c`` prune the serializer fields;
+    - ``?view=compact`` on list actions uses ``compact_serializer_class``;
+    - the queryset only loads the columns the remaining fields need.
+    """
+
+    compact_serializer_class = None
+    compact_actions = ('list',)
+
+    def _is_read(self):
+        return self.request is not None and self.request.method in SAFE_METHODS
+
+    def get_serializer_class(self):
+        if (
+            self.compact_serializer_class is not None
+            and getattr(self, 'action', None) in self.compact_actions
+            and self._is_read()
+            and self.request.query_params.get('view') == 'compact'
+        ):
+            return self.compact_serializer_class
+        return super().get_serializer_class()
+
+    def get_fieldset_kwargs(self):
+        if not self._is_read():
+            return {}
+        params = self.request.query_params
+        return {
+            'fields': _split_param(params.get('fields')) or None,
+            'exclude': _split_param(params.get('exclude')) or None,
+        }
+
+    def get_serializer(self, *args, **kwargs):
+        for key, value in self.get_fieldset_kwargs().items():
+            kwargs.setdefault(key, value)
+        return super().get_serializer(*args, **kwargs)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if not self._is_read():
+            return queryset
+        fields = self.get_serializer_class()(**self.get_fieldset_kwargs()).fields
+        return restrict_queryset_to_fields(queryset, fields)
+
+
+class ConditionalGetMixin:
+    """
+    ETag / Last-Modified support for ``list`` and ``retrieve``.
+
+    The validator is built from ``max(updated_at)`` and the row count of the
+    filtered queryset (or the object's ``updated_at``), together with the
+    user and the full query string, so ``If-None-Match`` /
+    ``If-Modified-Since`` can be answered with 304 before serializing.
+    Lists of models with a deletion log (``events.sync``) also fold in the
+    latest deletion, so a delete changes both validators even when an
+    insert keeps the count. Other lists send no ``Last-Modified``, which
+    could not move on a delete. The aggregate is one query, and its count
+    is reused by the page-number paginator instead of a second ``COUNT``.
+    Related fields in the output (``venue_name``, ``organizer_email``...)
+    are covered by ``events.signals.touch_dependent_rows``, which bumps the
+    rows showing them when they change.
+    """
+
+    conditional_timestamp_field = 'updated_at'
+
+    def _conditional_response(self, request, last_modified, *parts):
+        user = getattr(request, 'user', None)
+        validator = '|'.join(
+            str(part)
+            for part in (self.queryset.model._meta.label, getattr(user, 'pk', None), request.get_full_path(), *parts)
+        )
+        self._etag = quote_etag(hashlib.md5(validator.encode(), usedforsecurity=False).hexdigest())
+        self._last_modified = int(last_modified.timestamp()) if last_modified else None
+        return get_conditional_response(request, etag=self._etag, last_modified=self._last_modified)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        etag = getattr(self, '_etag', None)
+        if etag and response.status_code in (200, 304):
+            response['ETag'] = etag
+            if self._last_modified is not None:
+                response['Last-Modified'] = http_date(self._last_modified)
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def get_conditional_deletions(self):
+        """Deletion times of this list's model, newest first; None when deletions are not logged."""
+        model = self.queryset.model
+        if model not in AUDIENCE:
+            return None
+        return Tombstone.objects.filter(model=model._meta.label).order_by('-deleted_at').values('deleted_at')
+
+    def list(self, request, *args, **kwargs):
+        # Keyset pages stay constant-time: the validator would need the full
+        # count they are designed to avoid.
+        if getattr(self.paginator, 'cursor_query_param', None) in request.query_params:
+            return super().list(request, *args, **kwargs)
+        stamps = {'last': Max(self.conditional_timestamp_field), 'count': Count('pk')}
+        deletions = self.get_conditional_deletions()
+        if deletions is not None:
+            stamps['deleted'] = Max(Subquery(deletions[:1]))
+        stamp = self.filter_queryset(self.get_queryset()).aggregate(**stamps)
+        self.list_count = stamp['count']
+        last_modified = None
+        if deletions is not None:
+            last_modified = max(filter(None, (stamp['last'], stamp['deleted'])), default=None)
+        not_modified = self._conditional_response(
+            request, last_modified, stamp['last'], stamp['count'], stamp.get('deleted')
+        )
+        if not_modified is not None:
+            return not_modified
+        return super().list(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        last = getattr(instance, self.conditional_timestamp_field)
+        not_modified = self._conditional_response(request, last, instance.pk, last)
+        if not_modified is not None:
+            return not_modified
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data)
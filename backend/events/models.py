@@ -1,5 +1,8 @@
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
+
+from . import geo
 
 
 class Venue(models.Model):
@@ -19,15 +22,32 @@ class Venue(models.Model):
     whatsapp = models.CharField(max_length=20, blank=True, default='')
     amenities = models.JSONField(default=list, blank=True)
     photos = models.JSONField(default=list, blank=True)
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    # Grid square of the coordinates, see events.geo; maintained in save().
+    geo_cell = models.PositiveIntegerField(null=True, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at'], name='events_venue_active_idx', condition=models.Q(is_active=True)),
+            models.Index(fields=['geo_cell'], name='events_venue_geo_cell_idx'),
+            models.Index(fields=['updated_at', 'id'], name='events_venue_updated_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        self.geo_cell = geo.cell_for(self.latitude, self.longitude)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'latitude', 'longitude'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'geo_cell'}
+        super().save(*args, **kwargs)
+
 
 class Event(models.Model):
     STATUS_DRAFT = 'draft'
@@ -48,9 +68,15 @@ class Event(models.Model):
     budget = models.BigIntegerField(default=0)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_DRAFT)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-date', '-start_time']
+        indexes = [
+            models.Index(fields=['venue', 'date', 'start_time', 'end_time'], name='events_event_venue_slot_idx'),
+            models.Index(fields=['organizer', '-date', '-start_time'], name='events_event_organizer_idx'),
+            models.Index(fields=['organizer', 'updated_at', 'id'], name='events_event_updated_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -72,10 +98,156 @@ class Booking(models.Model):
     event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='bookings')
     venue = models.ForeignKey(Venue, on_delete=models.CASCADE, related_name='bookings')
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    # The venue's rate when the booking was made; revenue is computed from it.
+    price_per_hour = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='events_booking_user_idx'),
+            models.Index(
+                fields=['venue', 'event'],
+                name='events_booking_active_idx',
+                condition=models.Q(status__in=['pending', 'approved']),
+            ),
+            models.Index(fields=['user', 'updated_at', 'id'], name='events_booking_updated_idx'),
+        ]
 
     def __str__(self):
         return f'{self.user.email} -> {self.venue.name}'
+
+    def save(self, *args, **kwargs):
+        if self.price_per_hour is None and self.venue_id is not None:
+            self.price_per_hour = self.venue.price_per_hour
+        super().save(*args, **kwargs)
+
+
+class VenueOccupancy(models.Model):
+    """
+    Busy intervals of a venue on one day, derived from its events and kept
+    up to date by ``events.occupancy``. ``intervals`` is a list of
+    ``[start_second, end_second, event_id]`` sorted by start.
+    """
+
+    venue = models.ForeignKey(Venue, on_delete=models.CASCADE, related_name='occupancy')
+    date = models.DateField()
+    intervals = models.JSONField(default=list, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=('venue', 'date'), name='events_occupancy_venue_date_uniq'),
+        ]
+
+    def __str__(self):
+        return f'{self.venue_id} @ {self.date}'
+
+
+class VenueDailyStats(models.Model):
+    """
+    Per-venue, per-day rollup of bookings and events for dashboards and
+    reports, maintained by ``events.rollup``. Bookings count on the day of
+    their event; hours and revenue only include approved bookings, revenue
+    at each booking's ``price_per_hour``.
+    """
+
+    venue = models.ForeignKey(Venue, on_delete=models.CASCADE, related_name='daily_stats')
+    date = models.DateField()
+    pending_bookings = models.PositiveIntegerField(default=0)
+    approved_bookings = models.PositiveIntegerField(default=0)
+    cancelled_bookings = models.PositiveIntegerField(default=0)
+    rejected_bookings = models.PositiveIntegerField(default=0)
+    booked_seconds = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    events = models.PositiveIntegerField(default=0)
+    event_seconds = models.PositiveIntegerField(default=0)
+    guests = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['venue', 'date']
+        constraints = [
+            models.UniqueConstraint(fields=('venue', 'date'), name='events_daily_stats_venue_date_uniq'),
+        ]
+
+    def __str__(self):
+        return f'{self.venue_id} @ {self.date}'
+
+
+class Tombstone(models.Model):
+    """
+    Deletion log read by ``?updated_since=`` delta syncs (``events.sync``):
+    one row per deleted venue, event or booking.
+    """
+
+    model = models.CharField(max_length=50)
+    object_id = models.BigIntegerField()
+    # The only user whose list contained the row; null when visible to all.
+    audience = models.BigIntegerField(null=True, blank=True)
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['deleted_at', 'id']
+        indexes = [
+            models.Index(fields=['model', 'deleted_at'], name='events_tombstone_model_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.model} {self.object_id}'
+
+
+class ArchivedEvent(models.Model):
+    """
+    An ``Event`` moved out of the live table by ``events.archive`` once it is
+    past the archive horizon. Keeps the original id and timestamps.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=200)
+    description = models.TextField(blank=True)
+    date = models.DateField()
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+    organizer = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='archived_events')
+    venue = models.ForeignKey(Venue, on_delete=models.SET_NULL, related_name='archived_events', null=True, blank=True)
+    guest_count = models.PositiveIntegerField(default=0)
+    budget = models.BigIntegerField(default=0)
+    status = models.CharField(max_length=20, choices=Event.STATUS_CHOICES, default=Event.STATUS_DRAFT)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['-date', '-start_time']
+        indexes = [
+            models.Index(fields=['organizer', '-date', '-start_time'], name='events_arch_event_org_idx'),
+            models.Index(fields=['venue', 'date'], name='events_arch_event_venue_idx'),
+        ]
+
+    def __str__(self):
+        return self.title
+
+
+class ArchivedBooking(models.Model):
+    """A finished ``Booking`` archived together with its event."""
+
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='archived_bookings')
+    event = models.ForeignKey(ArchivedEvent, on_delete=models.CASCADE, related_name='bookings')
+    venue = models.ForeignKey(Venue, on_delete=models.CASCADE, related_name='archived_bookings')
+    status = models.CharField(max_length=20, choices=Booking.STATUS_CHOICES)
+    price_per_hour = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='events_arch_booking_user_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.user_id} -> {self.venue_id}'
@@ -0,0 +1,184 @@
+"""
+Per-venue, per-day occupancy index.
+
+Each ``VenueOccupancy`` row holds the sorted busy intervals of one venue on
+one day. Rows are recomputed from the ``Event`` table whenever an event is
+saved, moved or deleted, so reads (overlap checks, free slots, calendars)
+are a single keyed lookup plus a pass over one day's intervals in memory
+instead of a range scan.
+"""
+from bisect import bisect_left
+from datetime import time
+from itertools import groupby
+
+from django.db import transaction
+from django.db.models import Q
+
+from .models import Event, VenueOccupancy
+
+DAY_SECONDS = 24 * 60 * 60
+
+
+def to_seconds(value: time) -> int:
+    return value.hour * 3600 + value.minute * 60 + value.second
+
+
+def from_seconds(value: int) -> time:
+    if value >= DAY_SECONDS:
+        return time(23, 59, 59)
+    return time(value // 3600, value % 3600 // 60, value % 60)
+
+
+def compute_intervals(venue_id, date):
+    rows = (
+        Event.objects.filter(venue_id=venue_id, date=date)
+        .order_by('start_time', 'id')
+        .values_list('start_time', 'end_time', 'id')
+    )
+    return [[to_seconds(start), to_seconds(end), event_id] for start, end, event_id in rows]
+
+
+def rebuild_day(venue_id, date):
+    """
+    Recompute one venue-day from its events. The row is created first if
+    missing, so even the first writers of a day serialize on its lock.
+    """
+    if venue_id is None or date is None:
+        return
+    with transaction.atomic():
+        row = lock_day(venue_id, date)
+        intervals = compute_intervals(venue_id, date)
+        if not intervals:
+            row.delete()
+        elif row.intervals != intervals:
+            row.intervals = intervals
+            row.save(update_fields=['intervals', 'updated_at'])
+
+
+def lock_day(venue_id, date):
+    """
+    Lock one venue-day until the surrounding transaction ends, creating its
+    row if needed; ``get_or_create`` falls back to the row a concurrent
+    writer inserted first. Writers to other venues or days are not
+    blocked, except on SQLite, which has no row locks and serializes all
+    writers. An empty row created here is filled by ``rebuild_day`` once
+    the event is saved, or rolled back with the transaction.
+    """
+    row, _ = VenueOccupancy.objects.get_or_create(venue_id=venue_id, date=date, defaults={'intervals': []})
+    return VenueOccupancy.objects.select_for_update().get(pk=row.pk)
+
+
+def lock_days(pairs):
+    """
+    ``lock_day`` for many ``(venue_id, date)`` pairs in two queries: one
+    INSERT of the missing rows and one locking SELECT, in a fixed order so
+    concurrent callers cannot deadlock. Returns ``{(venue_id, date): row}``.
+    """
+    if not pairs:
+        return {}
+    VenueOccupancy.objects.bulk_create(
+        [VenueOccupancy(venue_id=venue_id, date=date, intervals=[]) for venue_id, date in pairs],
+        ignore_conflicts=True,
+    )
+    match = Q()
+    for venue_id, date in pairs:
+        match |= Q(venue_id=venue_id, date=date)
+    rows = VenueOccupancy.objects.select_for_update().filter(match).order_by('venue_id', 'date')
+    return {(row.venue_id, row.date): row for row in rows}
+
+
+def get_intervals(venue_id, date):
+    return (
+        VenueOccupancy.objects.filter(venue_id=venue_id, date=date)
+        .values_list('intervals', flat=True)
+        .first()
+    ) or []
+
+
+def find_conflict(intervals, start_time, end_time, exclude_event_id=None):
+    """
+    Return the event id overlapping ``[start_time, end_time)`` or None.
+
+    Intervals are sorted by start, so only those before the insertion point
+    of ``end_time`` (found by binary search) can overlap. Stored intervals
+    may overlap each other (rows from before the checks, admin and seed
+    writes), so a long early event can cover the slot: all of them are
+    scanned, latest first, which is linear in the day's events.
+    """
+    start, end = to_seconds(start_time), to_seconds(end_time)
+    for index in range(bisect_left(intervals, [end]) - 1, -1, -1):
+        busy_start, busy_end, event_id = intervals[index]
+        if busy_end > start and event_id != exclude_event_id:
+            return event_id
+    return None
+
+
+def free_slots(intervals, day_start=0, day_end=DAY_SECONDS):
+    slots = []
+    cursor = day_start
+    for busy_start, busy_end, _ in intervals:
+        if busy_start > cursor:
+            slots.append((cursor, min(busy_start, day_end)))
+        cursor = max(cursor, busy_end)
+        if cursor >= day_end:
+            break
+    if cursor < day_end:
+        slots.append((cursor, day_end))
+    return slots
+
+
+def day_calendar(date, intervals):
+    return {
+        'date': date,
+        'busy': [
+            {'start': from_seconds(start), 'end': from_seconds(end), 'event': event_id}
+            for start, end, event_id in intervals
+        ],
+        'free': [
+            {'start': from_seconds(start), 'end': from_seconds(end)}
+            for start, end in free_slots(intervals)
+        ],
+    }
+
+
+def find_inconsistencies(venue_id=None):
+    """
+    Yield ``(venue_id, date, stored, expected)`` for every venue-day whose
+    row differs from its events. Both sides are streamed in (venue, date)
+    order and merged, so memory stays bounded.
+    """
+    events = Event.objects.filter(venue__isnull=False)
+    rows = VenueOccupancy.objects.all()
+    if venue_id is not None:
+        events = events.filter(venue_id=venue_id)
+        rows = rows.filter(venue_id=venue_id)
+    event_rows = (
+        events.order_by('venue_id', 'date', 'start_time', 'id')
+        .values_list('venue_id', 'date', 'start_time', 'end_time', 'id')
+        .iterator(chunk_size=2000)
+    )
+    expected = (
+        (key, [[to_seconds(start), to_seconds(end), event_id] for _, _, start, end, event_id in group])
+        for key, group in groupby(event_rows, key=lambda row: (row[0], row[1]))
+    )
+    stored = (
+        ((row_venue, date), intervals)
+        for row_venue, date, intervals in rows.order_by('venue_id', 'date')
+        .values_list('venue_id', 'date', 'intervals')
+        .iterator(chunk_size=2000)
+    )
+
+    wanted = next(expected, None)
+    have = next(stored, None)
+    while wanted is not None or have is not None:
+        if have is None or (wanted is not None and wanted[0] < have[0]):
+            yield (*wanted[0], [], wanted[1])
+            wanted = next(expected, None)
+        elif wanted is None or have[0] < wanted[0]:
+            yield (*have[0], have[1], [])
+            have = next(stored, None)
+        else:
+            if have[1] != wanted[1]:
+                yield (*have[0], have[1], wanted[1])
+            wanted = next(expected, None)
+            have = next(stored, None)
@@ -0,0 +1,124 @@
+import base64
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import FieldDoesNotExist
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.paginator import Paginator
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(PageNumberPagination):
+    """
+    Page-number pagination by default; passing ``?cursor=`` (empty for the
+    first page) switches to keyset pagination on the queryset ordering
+    (``Meta.ordering`` unless ``?ordering=`` overrides it) with the primary
+    key as tiebreaker. Keyset pages skip ``COUNT(*)`` unless ``?count=1``;
+    page-number pages reuse the view's ``list_count`` when it has one.
+    """
+
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    invalid_cursor_message = 'Invalid cursor.'
+    unsupported_ordering_message = 'Cursor pagination is not available for this ordering.'
+    known_count = None
+
+    def django_paginator_class(self, object_list, per_page):
+        paginator = Paginator(object_list, per_page)
+        if self.known_count is not None:
+            paginator.count = self.known_count
+        return paginator
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = self.cursor_query_param in request.query_params
+        if not self.keyset:
+            self.known_count = getattr(view, 'list_count', None)
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self._keyset_ordering(queryset)
+        self.count = None
+        if request.query_params.get(self.count_query_param) in ('1', 'true'):
+            self.count = queryset.count()
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            queryset = queryset.filter(self._after(self._decode(cursor)))
+        rows = list(queryset.order_by(*(prefix + name for name, prefix, _ in self.ordering))[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        return self.page
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        payload = OrderedDict()
+        if self.count is not None:
+            payload['count'] = self.count
+        payload['next'] = self.get_next_link()
+        payload['results'] = data
+        return Response(payload)
+
+    def get_next_link(self):
+        if not self.keyset:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self._encode(self.page[-1]))
+
+    def _keyset_ordering(self, queryset):
+        model = queryset.model
+        names = list(queryset.query.order_by or model._meta.ordering or ())
+        ordering = []
+        pk_prefix = None
+        for name in names:
+            if not isinstance(name, str):
+                raise ValidationError({self.cursor_query_param: self.unsupported_ordering_message})
+            prefix = '-' if name.startswith('-') else ''
+            try:
+                field = model._meta.get_field(name.lstrip('-'))
+            except FieldDoesNotExist:
+                raise ValidationError({self.cursor_query_param: self.unsupported_ordering_message})
+            if field.null or field.is_relation:
+                raise ValidationError({self.cursor_query_param: self.unsupported_ordering_message})
+            if field.primary_key:
+                pk_prefix = prefix
+                break
+            ordering.append((field.name, prefix, field))
+        # The primary key makes the sort order total so no row is skipped or repeated.
+        if pk_prefix is None:
+            pk_prefix = ordering[-1][1] if ordering else ''
+        pk = model._meta.pk
+        ordering.append((pk.name, pk_prefix, pk))
+        return ordering
+
+    def _after(self, values):
+        condition = Q()
+        equal = Q()
+        for (name, prefix, _), value in zip(self.ordering, values):
+            lookup = 'lt' if prefix else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def _encode(self, instance):
+        values = [field.value_to_string(instance) for _, _, field in self.ordering]
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip('=')
+
+    def _decode(self, cursor):
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            values = json.loads(raw)
+            if not isinstance(values, list) or len(values) != len(self.ordering):
+                raise ValueError
+            return [field.to_python(value) for (_, _, field), value in zip(self.ordering, values)]
+        except (ValueError, TypeError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
@@ -44,6 +44,20 @@ class OnlyOrganizerCanModifyEvent(BasePermission):
         return obj.organizer_id == request.user.id
 
 
+class OwnerOrAdminPermission(BasePermission):
+    """
+    Owner or admin role. Views restrict owners to their own venues
+    (batch booking transitions, owner summary).
+    """
+
+    def has_permission(self, request, view):
+        return bool(
+            request.user
+            and request.user.is_authenticated
+            and request.user.role in ('owner', 'admin')
+        )
+
+
 class BookingPermission(BasePermission):
     """
     - Любой авторизованный пользователь может читать и создавать свои брони.
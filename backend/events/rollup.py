@@ -0,0 +1,125 @@
+"""
+Daily venue statistics rollup.
+
+``VenueDailyStats`` holds one row per venue and day. Writes refresh only
+the venue-days they touch: the bookings and events of those days are
+aggregated in two grouped queries and the rows upserted in one, so the cost
+of a write does not depend on how much history exists. Rows whose day has
+no bookings or events left are deleted. Past days also count the rows
+``events.archive`` moved to the archive tables. Revenue uses the rate each
+booking was made at, so a later price change leaves past figures alone.
+"""
+from itertools import chain
+
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, IntegerField, Q, Sum, Value
+from django.db.models.functions import Coalesce, ExtractHour, ExtractMinute, ExtractSecond
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ArchivedBooking, ArchivedEvent, Booking, Event, VenueDailyStats
+
+COUNTER_FIELDS = (
+    'pending_bookings',
+    'approved_bookings',
+    'cancelled_bookings',
+    'rejected_bookings',
+    'booked_seconds',
+    'revenue',
+    'events',
+    'event_seconds',
+    'guests',
+)
+
+
+def _seconds(field):
+    return ExtractHour(field) * 3600 + ExtractMinute(field) * 60 + ExtractSecond(field)
+
+
+def duration_seconds(prefix=''):
+    """Event length in seconds; ``prefix`` reaches the event through a relation."""
+    return ExpressionWrapper(
+        _seconds(f'{prefix}end_time') - _seconds(f'{prefix}start_time'), output_field=IntegerField()
+    )
+
+
+def _match(pairs, date_field):
+    match = Q()
+    for venue_id, date in pairs:
+        match |= Q(venue_id=venue_id, **{date_field: date})
+    return match
+
+
+def _totals(booking_model, event_model, pairs):
+    approved = Q(status=Booking.STATUS_APPROVED)
+    status_counts = {
+        f'{status}_bookings': Count('pk', filter=Q(status=status)) for status, _ in Booking.STATUS_CHOICES
+    }
+    bookings = (
+        booking_model.objects.filter(_match(pairs, 'event__date'))
+        .values('venue_id', 'event__date')
+        .annotate(
+            **status_counts,
+            booked_seconds=Coalesce(Sum(duration_seconds('event__'), filter=approved), 0),
+            revenue=Coalesce(
+                Sum(F('price_per_hour') * duration_seconds('event__') / Value(3600.0), filter=approved),
+                Value(0.0),
+                output_field=DecimalField(max_digits=14, decimal_places=2),
+            ),
+        )
+        .order_by()
+    )
+    events = (
+        event_model.objects.filter(_match(pairs, 'date'))
+        .values('venue_id', 'date')
+        .annotate(events=Count('pk'), event_seconds=Sum(duration_seconds()), guests=Sum('guest_count'))
+        .order_by()
+    )
+    for row in bookings:
+        yield (row.pop('venue_id'), row.pop('event__date')), row
+    for row in events:
+        yield (row.pop('venue_id'), row.pop('date')), row
+
+
+def refresh(pairs):
+    """Recompute the rollup rows of the given ``(venue_id, date)`` pairs."""
+    pairs = {pair for pair in pairs if None not in pair}
+    if not pairs:
+        return
+    totals = {pair: {} for pair in pairs}
+    grouped = _totals(Booking, Event, pairs)
+    # Only days already over are ever archived.
+    past = {pair for pair in pairs if pair[1] < timezone.localdate()}
+    if past:
+        grouped = chain(grouped, _totals(ArchivedBooking, ArchivedEvent, past))
+    for pair, row in grouped:
+        values = totals[pair]
+        for name, value in row.items():
+            values[name] = values.get(name, 0) + (value or 0)
+
+    now = timezone.now()
+    rows, empty = [], []
+    for (venue_id, date), values in totals.items():
+        values = {name: values.get(name) or 0 for name in COUNTER_FIELDS}
+        values['revenue'] = round(values['revenue'], 2)
+        if any(values.values()):
+            rows.append(VenueDailyStats(venue_id=venue_id, date=date, updated_at=now, **values))
+        else:
+            empty.append((venue_id, date))
+    if rows:
+        VenueDailyStats.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['venue', 'date'],
+            update_fields=[*COUNTER_FIELDS, 'updated_at'],
+        )
+    if empty:
+        VenueDailyStats.objects.filter(_match(empty, 'date')).delete()
+
+
+def refresh_on_commit(pairs):
+    """
+    ``refresh`` once the transaction commits. Used from model signals: a
+    cascade may still be deleting the venue, and its rollup rows with it.
+    """
+    pairs = set(pairs)
+    transaction.on_commit(lambda: refresh(pairs))
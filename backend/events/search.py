@@ -0,0 +1,151 @@
+"""
+Pluggable full-text search for venues.
+
+``settings.VENUE_SEARCH_BACKEND`` selects the implementation: ``'auto'``
+(default) picks one from the database vendor, or a dotted path to a backend
+class can be given. Every backend returns the queryset filtered to matching
+venues, annotated with ``search_rank`` (higher is better) and ordered by it.
+"""
+import re
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+from rest_framework.filters import SearchFilter
+
+SQLITE_FTS_TABLE = 'events_venue_fts'
+SEARCH_FIELDS = ('name', 'address', 'description')
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+class LikeSearchBackend:
+    """The previous behaviour: OR of ``icontains`` scans, no ranking."""
+
+    def search(self, queryset, query):
+        for term in _TOKEN_RE.findall(query):
+            match = Q()
+            for field in SEARCH_FIELDS:
+                match |= Q(**{f'{field}__icontains': term})
+            queryset = queryset.filter(match)
+        return queryset.annotate(search_rank=RawSQL('0', [], output_field=FloatField()))
+
+    def index(self, venue):
+        pass
+
+    def remove(self, venue_id):
+        pass
+
+    def rebuild(self):
+        pass
+
+
+class PostgresSearchBackend(LikeSearchBackend):
+    """
+    Uses the generated ``search_vector`` tsvector column (GIN indexed, see
+    migration 0006). Postgres keeps it current on every write, so there is
+    nothing to maintain from Python.
+    """
+
+    def search(self, queryset, query):
+        if not _TOKEN_RE.search(query):
+            return queryset.none()
+        config = getattr(settings, 'VENUE_SEARCH_CONFIG', 'simple')
+        table = queryset.model._meta.db_table
+        tsquery = 'websearch_to_tsquery(%s::regconfig, %s)'
+        return (
+            queryset.filter(
+                RawSQL(f'"{table}"."search_vector" @@ {tsquery}', [config, query], output_field=BooleanField())
+            )
+            .annotate(
+                search_rank=RawSQL(
+                    f'ts_rank_cd("{table}"."search_vector", {tsquery})',
+                    [config, query],
+                    output_field=FloatField(),
+                )
+            )
+            .order_by('-search_rank', '-created_at')
+        )
+
+
+class SQLiteFTSSearchBackend(LikeSearchBackend):
+    """
+    FTS5 shadow table keyed by venue id. It is kept in sync from the
+    ``post_save``/``post_delete`` signals; ``rebuild()`` repopulates it.
+    """
+
+    def search(self, queryset, query):
+        terms = _TOKEN_RE.findall(query)
+        if not terms:
+            return queryset.none()
+        # Quote every term so user input never reaches FTS5 query syntax;
+        # the trailing * gives prefix matching for search-as-you-type.
+        match = ' '.join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+        table = queryset.model._meta.db_table
+        # Join the FTS table so MATCH drives the scan and bm25 runs once per hit.
+        return queryset.extra(
+            tables=[SQLITE_FTS_TABLE],
+            where=[f'{SQLITE_FTS_TABLE}.rowid = "{table}"."id"', f'{SQLITE_FTS_TABLE} MATCH %s'],
+            params=[match],
+            select={'search_rank': f'-bm25({SQLITE_FTS_TABLE}, 3.0, 2.0, 1.0)'},
+        ).order_by('-search_rank', '-created_at')
+
+    def index(self, venue):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {SQLITE_FTS_TABLE} WHERE rowid = %s', [venue.pk])
+            cursor.execute(
+                f'INSERT INTO {SQLITE_FTS_TABLE} (rowid, name, address, description) VALUES (%s, %s, %s, %s)',
+                [venue.pk, venue.name, venue.address, venue.description],
+            )
+
+    def remove(self, venue_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {SQLITE_FTS_TABLE} WHERE rowid = %s', [venue_id])
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {SQLITE_FTS_TABLE}')
+            cursor.execute(
+                f'INSERT INTO {SQLITE_FTS_TABLE} (rowid, name, address, description) '
+                'SELECT id, name, address, description FROM events_venue'
+            )
+
+
+_backend = None
+
+
+def _auto_backend():
+    if connection.vendor == 'postgresql':
+        return PostgresSearchBackend()
+    if connection.vendor == 'sqlite' and SQLITE_FTS_TABLE in connection.introspection.table_names():
+        return SQLiteFTSSearchBackend()
+    return LikeSearchBackend()
+
+
+def get_search_backend():
+    global _backend
+    if _backend is None:
+        path = getattr(settings, 'VENUE_SEARCH_BACKEND', 'auto')
+        _backend = _auto_backend() if path == 'auto' else import_string(path)()
+    return _backend
+
+
+@receiver(setting_changed)
+def _reset_backend(setting, **kwargs):
+    global _backend
+    if setting == 'VENUE_SEARCH_BACKEND':
+        _backend = None
+
+
+class VenueSearchFilter(SearchFilter):
+    """``?search=`` routed through the configured search backend."""
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+        return get_search_backend().search(queryset, ' '.join(terms))
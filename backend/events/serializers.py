@@ -1,20 +1,134 @@
 from rest_framework import serializers
 
-from .models import Booking, Event, Venue
+from . import media
+from .mixins import SparseFieldsetSerializerMixin
+from .models import ArchivedBooking, ArchivedEvent, Booking, Event, Venue
 from .services import validate_capacity, validate_no_time_overlap
 
 
-class VenueSerializer(serializers.ModelSerializer):
+class PhotoListField(serializers.ListField):
+    """
+    Accepts data URLs, stored references or external URLs and keeps only
+    media references on the model; renders them back as URLs.
+    """
+
+    child = serializers.CharField()
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('max_length', media.MAX_PHOTOS)
+        kwargs.setdefault('required', False)
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        values = super().to_internal_value(data)
+        try:
+            return media.normalize_photos(values)
+        except ValueError as exc:
+            raise serializers.ValidationError(str(exc))
+
+    def to_representation(self, value):
+        return [media.photo_url(item) for item in value or []]
+
+
+class ThumbnailField(serializers.Field):
+    """URL of the first venue photo, or null."""
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('source', 'photos')
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return media.photo_url(value[0]) if value else None
+
+
+class VenueSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     owner_name = serializers.CharField(source='owner.username', read_only=True)
+    photos = PhotoListField()
+    latitude = serializers.FloatField(min_value=-90, max_value=90, required=False, allow_null=True)
+    longitude = serializers.FloatField(min_value=-180, max_value=180, required=False, allow_null=True)
+    distance_km = serializers.FloatField(read_only=True)
 
     class Meta:
         model = Venue
-        fields = '__all__'
+        exclude = ('geo_cell',)
         read_only_fields = ('id', 'created_at', 'owner')
 
+    def validate(self, attrs):
+        latitude = attrs.get('latitude', getattr(self.instance, 'latitude', None))
+        longitude = attrs.get('longitude', getattr(self.instance, 'longitude', None))
+        if (latitude is None) != (longitude is None):
+            raise serializers.ValidationError({'non_field_errors': ['Latitude and longitude must be set together.']})
+        return attrs
+
+
+class VenueCompactSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
+    thumbnail = ThumbnailField()
+    distance_km = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = Venue
+        fields = ('id', 'name', 'address', 'capacity', 'price_per_hour', 'thumbnail', 'latitude', 'longitude', 'distance_km')
+        read_only_fields = fields
+
+
+class VenueAvailabilityQuerySerializer(serializers.Serializer):
+    date = serializers.DateField()
+    start = serializers.TimeField()
+    end = serializers.TimeField()
+    guests = serializers.IntegerField(min_value=1, required=False)
+
+    def validate(self, attrs):
+        if attrs['end'] <= attrs['start']:
+            raise serializers.ValidationError({'end': 'End time must be after start time.'})
+        return attrs
+
+
+class VenueNearQuerySerializer(serializers.Serializer):
+    near = serializers.CharField()
+    radius_km = serializers.FloatField(min_value=0.1, max_value=500, default=10)
+
+    def validate_near(self, value):
+        try:
+            latitude, longitude = (float(part) for part in value.split(','))
+        except ValueError:
+            raise serializers.ValidationError('Expected "lat,lon".')
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            raise serializers.ValidationError('Coordinates out of range.')
+        return latitude, longitude
+
+
+class VenueCalendarQuerySerializer(serializers.Serializer):
+    start = serializers.DateField()
+    days = serializers.IntegerField(min_value=1, max_value=62, default=7)
+
+
+class PrefetchedVenueField(serializers.PrimaryKeyRelatedField):
+    """Venue primary key, looked up in ``context['venues']`` (pk -> Venue) when the caller prefetched them."""
 
-class EventSerializer(serializers.ModelSerializer):
+    def to_internal_value(self, data):
+        venues = self.context.get('venues')
+        if venues is None:
+            return super().to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        if pk not in venues:
+            self.fail('does_not_exist', pk_value=data)
+        return venues[pk]
+
+
+class OwnerSummaryQuerySerializer(serializers.Serializer):
+    start = serializers.DateField(required=False)
+    days = serializers.IntegerField(min_value=1, max_value=366, default=30)
+
+
+class EventSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     organizer_email = serializers.CharField(source='organizer.email', read_only=True)
+    venue = PrefetchedVenueField(queryset=Venue.objects.all(), allow_null=True, required=False)
     venue_name = serializers.CharField(source='venue.name', read_only=True, allow_null=True)
 
     class Meta:
@@ -29,7 +143,8 @@ class EventSerializer(serializers.ModelSerializer):
         end_time = attrs.get('end_time') or getattr(self.instance, 'end_time', None)
         if start_time and end_time and end_time <= start_time:
             raise serializers.ValidationError({'end_time': 'End time must be after start time.'})
-        if venue and date and start_time and end_time:
+        # Bulk creation checks overlaps for all items at once, see services.bulk_create_events.
+        if venue and date and start_time and end_time and self.context.get('check_overlap', True):
             try:
                 validate_no_time_overlap(venue, date, start_time, end_time, exclude_event_id=getattr(self.instance, 'id', None))
             except ValueError as exc:
@@ -37,6 +152,15 @@ class EventSerializer(serializers.ModelSerializer):
         return attrs
 
 
+class EventCompactSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
+    venue_name = serializers.CharField(source='venue.name', read_only=True, allow_null=True)
+
+    class Meta:
+        model = Event
+        fields = ('id', 'title', 'date', 'start_time', 'end_time', 'status', 'guest_count', 'venue', 'venue_name')
+        read_only_fields = fields
+
+
 class BookingSerializer(serializers.ModelSerializer):
     user_email = serializers.CharField(source='user.email', read_only=True)
     user_phone = serializers.CharField(source='user.phone', read_only=True)
@@ -63,3 +187,29 @@ class BookingSerializer(serializers.ModelSerializer):
             except ValueError as exc:
                 raise serializers.ValidationError({'non_field_errors': [str(exc)]})
         return attrs
+
+
+class ArchivedEventSerializer(serializers.ModelSerializer):
+    organizer_email = serializers.CharField(source='organizer.email', read_only=True)
+    venue_name = serializers.CharField(source='venue.name', read_only=True, allow_null=True)
+
+    class Meta:
+        model = ArchivedEvent
+        fields = '__all__'
+
+
+class ArchivedBookingSerializer(serializers.ModelSerializer):
+    user_email = serializers.CharField(source='user.email', read_only=True)
+    event_title = serializers.CharField(source='event.title', read_only=True)
+    event_date = serializers.DateField(source='event.date', read_only=True)
+    event_start_time = serializers.TimeField(source='event.start_time', read_only=True)
+    venue_name = serializers.CharField(source='venue.name', read_only=True)
+
+    class Meta:
+        model = ArchivedBooking
+        fields = '__all__'
+
+
+class BookingBatchSerializer(serializers.Serializer):
+    action = serializers.ChoiceField(choices=('approve', 'reject', 'cancel'))
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=500)
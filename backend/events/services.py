@@ -1,16 +1,235 @@
-from .models import Event
+from bisect import insort
+from datetime import timedelta
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import DecimalField, Exists, OuterRef, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from . import occupancy, rollup
+from .models import Booking, Event, Venue, VenueOccupancy
+
+# Postgres EXCLUDE constraint on (venue, [date + start, date + end)), see migration 0012.
+EVENT_OVERLAP_CONSTRAINT = 'events_event_no_overlap'
+OVERLAP_MESSAGE = 'Venue is already booked for this time range.'
 
 
 def validate_no_time_overlap(venue, date, start_time, end_time, exclude_event_id=None):
-    qs = Event.objects.filter(venue=venue, date=date)
-    if exclude_event_id:
-        qs = qs.exclude(id=exclude_event_id)
+    intervals = occupancy.get_intervals(getattr(venue, 'pk', venue), date)
+    if occupancy.find_conflict(intervals, start_time, end_time, exclude_event_id=exclude_event_id) is not None:
+        raise ValueError(OVERLAP_MESSAGE)
+
+
+def reserve_slot(venue, date, start_time, end_time, save, exclude_event_id=None):
+    """
+    Call ``save()`` only if the venue is still free, atomically with respect
+    to concurrent writers; raises ValueError on a conflict.
+
+    On Postgres the exclusion constraint rejects the losing insert, so
+    writers never wait on each other. Elsewhere the venue-day row is locked
+    and the overlap check repeated under the lock. With row locks (MySQL)
+    that serializes writers of that venue-day only. SQLite ignores
+    ``select_for_update``: there the ``BEGIN IMMEDIATE`` transactions set
+    up in settings serialize all writers of the database.
+    """
+    if venue is None or date is None:
+        return save()
+    try:
+        with transaction.atomic():
+            if connection.vendor != 'postgresql':
+                occupancy.lock_day(getattr(venue, 'pk', venue), date)
+                validate_no_time_overlap(venue, date, start_time, end_time, exclude_event_id=exclude_event_id)
+            return save()
+    except IntegrityError as exc:
+        if EVENT_OVERLAP_CONSTRAINT in str(exc):
+            raise ValueError(OVERLAP_MESSAGE) from exc
+        raise
+
+
+def bulk_create_events(items, **extra):
+    """
+    Create events from a list of validated data dicts, all or nothing.
+
+    The touched venue-days are locked and read in one query, every item is
+    checked in memory against them and against the items before it, then
+    the events are inserted with one ``bulk_create`` and the occupancy rows
+    updated with one ``bulk_update``. Returns ``(events, conflicts)`` where
+    ``conflicts`` maps item index to message; nothing is written if it is
+    not empty.
+    """
+    pairs = sorted({(item['venue'].pk, item['date']) for item in items if item.get('venue') is not None})
+    try:
+        with transaction.atomic():
+            rows = occupancy.lock_days(pairs)
+            days = {key: list(row.intervals) for key, row in rows.items()}
+            conflicts = {}
+            for index, item in enumerate(items):
+                if item.get('venue') is None:
+                    continue
+                intervals = days[(item['venue'].pk, item['date'])]
+                if occupancy.find_conflict(intervals, item['start_time'], item['end_time']) is not None:
+                    conflicts[index] = OVERLAP_MESSAGE
+                    continue
+                # Negative placeholder ids stand in for the events until they are inserted.
+                start, end = occupancy.to_seconds(item['start_time']), occupancy.to_seconds(item['end_time'])
+                insort(intervals, [start, end, -index - 1])
+            if conflicts:
+                transaction.set_rollback(True)
+                return [], conflicts
+
+            events = Event.objects.bulk_create([Event(**item, **extra) for item in items])
+            # bulk_create skips the save signals that maintain the rollup and the index.
+            rollup.refresh(pairs)
+            if any(event.pk is None for event in events):
+                # Backends that cannot return ids from a bulk insert.
+                for venue_id, date in pairs:
+                    occupancy.rebuild_day(venue_id, date)
+                return events, {}
+            now = timezone.now()
+            for key, row in rows.items():
+                row.intervals = sorted(
+                    [start, end, events[-event_id - 1].pk if event_id < 0 else event_id]
+                    for start, end, event_id in days[key]
+                )
+                row.updated_at = now
+            VenueOccupancy.objects.bulk_update(rows.values(), ['intervals', 'updated_at'])
+            return events, {}
+    except IntegrityError as exc:
+        if EVENT_OVERLAP_CONSTRAINT in str(exc):
+            # Only reachable if the occupancy rows were stale.
+            return [], {index: OVERLAP_MESSAGE for index in range(len(items))}
+        raise
 
-    overlap_exists = qs.filter(start_time__lt=end_time, end_time__gt=start_time).exists()
-    if overlap_exists:
-        raise ValueError('Venue is already booked for this time range.')
+
+# action -> (statuses it applies to, resulting status)
+BOOKING_TRANSITIONS = {
+    'approve': ((Booking.STATUS_PENDING,), Booking.STATUS_APPROVED),
+    'reject': ((Booking.STATUS_PENDING,), Booking.STATUS_REJECTED),
+    'cancel': ((Booking.STATUS_PENDING, Booking.STATUS_APPROVED), Booking.STATUS_CANCELLED),
+}
+
+
+def transition_bookings(booking_ids, action, owner=None):
+    """
+    Apply a status ``action`` to many bookings with one UPDATE.
+
+    ``owner`` restricts the batch to bookings of that user's venues. When
+    approving, the venues are locked and each booking is checked against
+    the already approved bookings and the ones approved before it in the
+    batch. Returns one ``{'id', 'status'}`` or ``{'id', 'error'}`` dict per
+    distinct id, in request order.
+    """
+    allowed, target = BOOKING_TRANSITIONS[action]
+    booking_ids = list(dict.fromkeys(booking_ids))
+    with transaction.atomic():
+        bookings = Booking.objects.filter(pk__in=booking_ids)
+        if owner is not None:
+            bookings = bookings.filter(venue__owner=owner)
+        rows = {
+            row[0]: row
+            for row in bookings.select_for_update(of=('self',)).values_list(
+                'id', 'status', 'venue_id', 'event__date', 'event__start_time', 'event__end_time'
+            )
+        }
+        results = {}
+        for pk in booking_ids:
+            if pk not in rows:
+                results[pk] = {'id': pk, 'error': 'not_found'}
+            elif rows[pk][1] not in allowed:
+                results[pk] = {'id': pk, 'error': 'invalid_transition', 'status': rows[pk][1]}
+        candidates = [rows[pk] for pk in booking_ids if pk not in results]
+
+        if target == Booking.STATUS_APPROVED and candidates:
+            venue_ids = sorted({row[2] for row in candidates})
+            list(Venue.objects.select_for_update().filter(pk__in=venue_ids).order_by('pk').values_list('pk'))
+            busy = {}
+            approved = (
+                Booking.objects.filter(
+                    status=Booking.STATUS_APPROVED,
+                    venue_id__in=venue_ids,
+                    event__date__in={row[3] for row in candidates},
+                )
+                .values_list('venue_id', 'event__date', 'event__start_time', 'event__end_time')
+            )
+            for venue_id, date, start, end in approved:
+                busy.setdefault((venue_id, date), []).append((start, end))
+            accepted = []
+            for pk, _, venue_id, date, start, end in candidates:
+                intervals = busy.setdefault((venue_id, date), [])
+                if any(start < busy_end and busy_start < end for busy_start, busy_end in intervals):
+                    results[pk] = {'id': pk, 'error': 'conflict'}
+                    continue
+                intervals.append((start, end))
+                accepted.append(pk)
+        else:
+            accepted = [row[0] for row in candidates]
+
+        if accepted:
+            Booking.objects.filter(pk__in=accepted).update(status=target, updated_at=timezone.now())
+            rollup.refresh({(rows[pk][2], rows[pk][3]) for pk in accepted})
+        for pk in accepted:
+            results[pk] = {'id': pk, 'status': target}
+    return [results[pk] for pk in booking_ids]
 
 
 def validate_capacity(venue, requested_capacity):
     if requested_capacity and requested_capacity > venue.capacity:
         raise ValueError('Venue capacity is lower than requested capacity.')
+
+
+def available_venues(queryset, date, start_time, end_time, guests=None):
+    """
+    Narrow a venue queryset to venues free for the whole time range: a single
+    query with NOT EXISTS anti-joins against overlapping events and active bookings.
+    """
+    overlapping_events = Event.objects.filter(
+        venue=OuterRef('pk'),
+        date=date,
+        start_time__lt=end_time,
+        end_time__gt=start_time,
+    )
+    overlapping_bookings = Booking.objects.filter(
+        venue=OuterRef('pk'),
+        status__in=(Booking.STATUS_PENDING, Booking.STATUS_APPROVED),
+        event__date=date,
+        event__start_time__lt=end_time,
+        event__end_time__gt=start_time,
+    )
+    queryset = queryset.filter(is_active=True)
+    if guests:
+        queryset = queryset.filter(capacity__gte=guests)
+    return queryset.filter(~Exists(overlapping_events), ~Exists(overlapping_bookings))
+
+
+def owner_summary(venues, start, days, today):
+    """
+    Per-venue dashboard figures read from the daily rollup in one grouped
+    query, so the cost follows venues x days rather than the number of
+    bookings: bookings by status, revenue of approved bookings, upcoming
+    events and the share of the ``[start, start + days)`` window covered
+    by events.
+    """
+    end = start + timedelta(days=days)
+    booking_counts = {
+        f'{status}_bookings': Coalesce(Sum(f'daily_stats__{status}_bookings'), 0)
+        for status, _ in Booking.STATUS_CHOICES
+    }
+    rows = list(
+        venues.order_by('pk')
+        .annotate(
+            **booking_counts,
+            total_revenue=Coalesce(Sum('daily_stats__revenue'), Value(0), output_field=DecimalField()),
+            upcoming_events=Coalesce(Sum('daily_stats__events', filter=Q(daily_stats__date__gte=today)), 0),
+            busy_seconds=Coalesce(
+                Sum('daily_stats__event_seconds', filter=Q(daily_stats__date__gte=start, daily_stats__date__lt=end)),
+                0,
+            ),
+        )
+        .values('id', 'name', 'total_revenue', 'upcoming_events', 'busy_seconds', *booking_counts)
+    )
+    window_seconds = days * occupancy.DAY_SECONDS
+    for row in rows:
+        row['bookings'] = {status: row.pop(f'{status}_bookings') for status, _ in Booking.STATUS_CHOICES}
+        row['revenue'] = round(row.pop('total_revenue'), 2)
+        row['occupancy_percent'] = round(100 * row.pop('busy_seconds') / window_seconds, 2)
+    return rows
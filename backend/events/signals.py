@@ -0,0 +1,145 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from toiapp.models import Venue as LegacyVenue
+
+from . import archive, cache, occupancy, rollup, sync
+from .models import Booking, Event, Venue
+from .search import get_search_backend
+
+User = get_user_model()
+
+# Fields shown on other rows' API output (``venue_name``, ``owner_name``,
+# ``organizer_email``, ``event_title``...) -> foreign keys of those rows.
+# Tracking them costs one SELECT before each update of a venue, user or
+# event, skipped when ``update_fields`` leaves them out (e.g. ``last_login``),
+# plus one UPDATE per dependent table when one of them changed.
+DENORMALIZED = {
+    Venue: (('name',), ((Event, 'venue'), (Booking, 'venue'))),
+    User: (('username', 'email', 'phone'), ((Venue, 'owner'), (Event, 'organizer'), (Booking, 'user'))),
+    Event: (('title', 'date', 'start_time', 'guest_count'), ((Booking, 'event'),)),
+}
+
+
+@receiver(post_save, sender=Venue)
+def index_venue(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    get_search_backend().index(instance)
+
+
+@receiver(post_delete, sender=Venue)
+def unindex_venue(sender, instance, **kwargs):
+    get_search_backend().remove(instance.pk)
+
+
+@receiver(pre_save, sender=Event)
+def remember_event_slot(sender, instance, raw=False, **kwargs):
+    # Needed to clear the old venue-day when an event is moved.
+    instance._occupancy_previous = None
+    if instance.pk and not raw:
+        instance._occupancy_previous = (
+            Event.objects.filter(pk=instance.pk).values_list('venue_id', 'date').first()
+        )
+
+
+@receiver(post_save, sender=Event)
+def update_event_occupancy(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    current = (instance.venue_id, instance.date)
+    previous = getattr(instance, '_occupancy_previous', None)
+    if previous and previous != current:
+        occupancy.rebuild_day(*previous)
+    occupancy.rebuild_day(*current)
+    rollup.refresh_on_commit({current, previous or current})
+
+
+@receiver(post_delete, sender=Event)
+def clear_event_occupancy(sender, instance, **kwargs):
+    if archive.in_progress():
+        return
+    occupancy.rebuild_day(instance.venue_id, instance.date)
+    rollup.refresh_on_commit({(instance.venue_id, instance.date)})
+
+
+@receiver(pre_save, sender=Booking)
+def remember_booking_day(sender, instance, raw=False, **kwargs):
+    # A booking moved to another event or venue leaves its old day's rollup.
+    instance._rollup_previous = None
+    if instance.pk and not raw:
+        instance._rollup_previous = (
+            Booking.objects.filter(pk=instance.pk).values_list('venue_id', 'event__date').first()
+        )
+
+
+@receiver(post_save, sender=Booking)
+def update_booking_rollup(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    current = (instance.venue_id, instance.event.date)
+    rollup.refresh_on_commit({current, getattr(instance, '_rollup_previous', None) or current})
+
+
+@receiver(post_delete, sender=Booking)
+def clear_booking_rollup(sender, instance, **kwargs):
+    if archive.in_progress():
+        return
+    rollup.refresh_on_commit({(instance.venue_id, instance.event.date)})
+
+
+@receiver(post_save, sender=Venue)
+@receiver(post_save, sender=LegacyVenue)
+@receiver(post_delete, sender=Venue)
+@receiver(post_delete, sender=LegacyVenue)
+def invalidate_venue_catalog(sender, instance, **kwargs):
+    cache.invalidate(sender._meta.label, instance.pk)
+
+
+@receiver(post_delete, sender=Venue)
+@receiver(post_delete, sender=Event)
+@receiver(post_delete, sender=Booking)
+def log_deletion(sender, instance, **kwargs):
+    # Archival logs its rows in bulk.
+    if archive.in_progress():
+        return
+    sync.record_deletion(instance)
+
+
+@receiver(pre_delete, sender=Venue)
+def touch_venue_events(sender, instance, **kwargs):
+    # SET_NULL clears the venue with a plain UPDATE; bump updated_at so
+    # delta syncs pick the events up.
+    Event.objects.filter(venue=instance).update(updated_at=timezone.now())
+
+
+@receiver(pre_save, sender=Venue)
+@receiver(pre_save, sender=User)
+@receiver(pre_save, sender=Event)
+def remember_shown_fields(sender, instance, raw=False, update_fields=None, **kwargs):
+    fields, _ = DENORMALIZED[sender]
+    instance._shown_previous = None
+    if instance.pk and not raw and (update_fields is None or set(fields) & set(update_fields)):
+        instance._shown_previous = sender.objects.filter(pk=instance.pk).values_list(*fields).first()
+
+
+@receiver(post_save, sender=Venue)
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=Event)
+def touch_dependent_rows(sender, instance, raw=False, **kwargs):
+    # The list ETag and delta syncs only look at each row's own updated_at;
+    # bump the rows whose output shows the changed fields.
+    previous = getattr(instance, '_shown_previous', None)
+    fields, dependents = DENORMALIZED[sender]
+    if raw or previous is None or previous == tuple(getattr(instance, field) for field in fields):
+        return
+    now = timezone.now()
+    for model, foreign_key in dependents:
+        rows = model.objects.filter(**{foreign_key: instance})
+        if model is Venue:
+            # A plain UPDATE skips invalidate_venue_catalog.
+            for pk in rows.values_list('pk', flat=True):
+                cache.invalidate(Venue._meta.label, pk)
+        rows.update(updated_at=now)
@@ -0,0 +1,152 @@
+"""
+Delta sync for the venue, event and booking lists.
+
+``GET /api/<list>/?updated_since=<cursor>`` returns the rows of the list
+changed after the cursor, the ids removed since (``deleted``) and the
+``cursor`` for the next call; an empty cursor starts from scratch. Changes
+come oldest first, ``sync_page_size`` at a time, and ``has_more`` asks the
+client to call again right away. Filters, search and ordering do not
+apply: a delta always covers the whole list the user can see.
+
+Deletions are read from the ``Tombstone`` log, kept for
+``settings.DELTA_SYNC_RETENTION_DAYS``; an older cursor gets 410 and the
+client refetches the list. ``updated_at`` is set when a row is written,
+not when its transaction commits, so a finished pass hands out a cursor
+``settings.DELTA_SYNC_MARGIN_SECONDS`` before the request started. Rows
+written just before then come again on the next call; clients apply
+changes as upserts.
+"""
+import base64
+import json
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db.models import BooleanField, ExpressionWrapper, Q
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.response import Response
+
+from .models import Booking, Event, Tombstone, Venue
+
+PARAM = 'updated_since'
+
+# Attribute holding the id of the only user whose list shows the row.
+AUDIENCE = {Venue: None, Event: 'organizer_id', Booking: 'user_id'}
+
+
+class CursorExpired(APIException):
+    status_code = status.HTTP_410_GONE
+    default_detail = 'The sync cursor is too old; refetch the full list.'
+    default_code = 'cursor_expired'
+
+
+def _margin():
+    return timedelta(seconds=getattr(settings, 'DELTA_SYNC_MARGIN_SECONDS', 10))
+
+
+def _retention():
+    return timedelta(days=getattr(settings, 'DELTA_SYNC_RETENTION_DAYS', 30))
+
+
+def encode_cursor(changed_after, last_id, deleted_after):
+    values = [changed_after.isoformat(), last_id, deleted_after.isoformat()]
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        changed_after, last_id, deleted_after = json.loads(raw)
+        changed_after, deleted_after = datetime.fromisoformat(changed_after), datetime.fromisoformat(deleted_after)
+        if not isinstance(last_id, int) or timezone.is_naive(changed_after) or timezone.is_naive(deleted_after):
+            raise ValueError
+    except (ValueError, TypeError):
+        raise ValidationError({PARAM: ['Invalid cursor.']})
+    return changed_after, last_id, deleted_after
+
+
+def _tombstone(instance, deleted_at):
+    audience = AUDIENCE[type(instance)]
+    return Tombstone(
+        model=instance._meta.label,
+        object_id=instance.pk,
+        audience=getattr(instance, audience) if audience else None,
+        deleted_at=deleted_at,
+    )
+
+
+def record_deletion(instance):
+    _tombstone(instance, timezone.now()).save()
+
+
+def record_deletions(instances):
+    """Bulk version of ``record_deletion`` for rows removed without signals."""
+    now = timezone.now()
+    Tombstone.objects.bulk_create(_tombstone(instance, now) for instance in instances)
+
+
+def prune(now=None):
+    """Drop tombstones past the retention period; returns how many."""
+    deleted, _ = Tombstone.objects.filter(deleted_at__lt=(now or timezone.now()) - _retention()).delete()
+    return deleted
+
+
+class DeltaSyncMixin:
+    """
+    Answers ``list`` requests carrying ``?updated_since=`` with a delta.
+    Place it first so caching and conditional GET stay out of the way.
+    """
+
+    sync_page_size = 500
+    # Rows in the sync queryset that are reported as deleted, e.g. inactive venues.
+    sync_hidden = None
+
+    def get_sync_queryset(self):
+        return self.get_queryset()
+
+    def get_tombstones(self):
+        tombstones = Tombstone.objects.filter(model=self.queryset.model._meta.label)
+        user = self.request.user
+        if getattr(user, 'role', None) != 'admin':
+            tombstones = tombstones.filter(Q(audience__isnull=True) | Q(audience=user.pk))
+        return tombstones
+
+    def list(self, request, *args, **kwargs):
+        if PARAM not in request.query_params:
+            return super().list(request, *args, **kwargs)
+        return Response(self.sync(request.query_params[PARAM]))
+
+    def sync(self, cursor):
+        started = timezone.now()
+        queryset = self.get_sync_queryset()
+        if cursor:
+            changed_after, last_id, deleted_after = decode_cursor(cursor)
+            if deleted_after < started - _retention():
+                raise CursorExpired()
+            queryset = queryset.filter(Q(updated_at__gt=changed_after) | Q(updated_at=changed_after, pk__gt=last_id))
+        else:
+            # Nothing deleted before the first sync concerns the client.
+            deleted_after = started - _margin()
+        if self.sync_hidden is not None:
+            queryset = queryset.annotate(sync_hidden=ExpressionWrapper(self.sync_hidden, output_field=BooleanField()))
+
+        rows = list(queryset.order_by('updated_at', 'pk')[:self.sync_page_size + 1])
+        has_more = len(rows) > self.sync_page_size
+        rows = rows[:self.sync_page_size]
+        deleted = [row.pk for row in rows if getattr(row, 'sync_hidden', False)]
+        visible = [row for row in rows if not getattr(row, 'sync_hidden', False)]
+
+        if has_more:
+            next_cursor = encode_cursor(rows[-1].updated_at, rows[-1].pk, deleted_after)
+        else:
+            if cursor:
+                deleted += self.get_tombstones().filter(deleted_at__gt=deleted_after).values_list('object_id', flat=True)
+            since = started - _margin()
+            next_cursor = encode_cursor(since, 0, since)
+        return {
+            'results': self.get_serializer(visible, many=True).data,
+            'deleted': deleted,
+            'cursor': next_cursor,
+            'has_more': has_more,
+        }
@@ -1,11 +1,39 @@
-from datetime import date, time
+import base64
+import shutil
+import tempfile
+from datetime import date, datetime, time, timedelta
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+from unittest import mock
 
 from django.contrib.auth import get_user_model
+from django.core.cache import cache as django_cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import Max
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
 
-from .models import Event, Venue
-from .services import validate_no_time_overlap
+from config.query_budget import QueryBudgetExceeded
+from config.testing import QueryBudgetAssertionsMixin
+from toiapp.models import Booking as LegacyBooking
+from toiapp.models import Event as LegacyEvent
+from toiapp.models import Register
+from toiapp.models import Venue as LegacyVenue
+from toiapp.views import BookingViewSet as LegacyBookingViewSet
+from toiapp.views import EventViewSet as LegacyEventViewSet
+from toiapp.views import VenueViewSet as LegacyVenueViewSet
+
+from . import geo, media, occupancy, sync
+from .models import ArchivedBooking, ArchivedEvent, Booking, Event, Tombstone, Venue, VenueDailyStats, VenueOccupancy
+from .services import reserve_slot, transition_bookings, validate_no_time_overlap
+from .views import BookingViewSet, EventViewSet, VenueViewSet
 
 User = get_user_model()
 
@@ -89,3 +117,1029 @@ class EventsApiTests(APITestCase):
         )
         with self.assertRaises(ValueError):
             validate_no_time_overlap(self.venue, date(2026, 1, 1), time(11, 0), time(13, 0))
+
+
+PNG_DATA_URL = 'data:image/png;base64,' + base64.b64encode(b'\x89PNG\r\n\x1a\nfake-image').decode()
+
+
+class VenuePhotoTests(APITestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.owner = User.objects.create_user(
+            email='owner@test.local',
+            username='owner',
+            password='StrongPass123!',
+            role='owner',
+        )
+        self.client.force_authenticate(self.owner)
+
+    def test_data_url_photos_are_stored_once_and_returned_as_urls(self):
+        payload = {
+            'name': 'Photo Hall',
+            'address': 'Center',
+            'capacity': 100,
+            'price_per_hour': '1000.00',
+            'photos': [PNG_DATA_URL, 'https://example.com/a.jpg'],
+        }
+        first = self.client.post('/api/venues/', payload, format='json')
+        second = self.client.post('/api/venues/', payload, format='json')
+        self.assertEqual(first.status_code, 201, first.data)
+        self.assertEqual(second.status_code, 201, second.data)
+
+        venue = Venue.objects.get(id=first.data['id'])
+        self.assertTrue(media.is_photo_ref(venue.photos[0]))
+        self.assertEqual(venue.photos[1], 'https://example.com/a.jpg')
+        self.assertEqual(Venue.objects.get(id=second.data['id']).photos, venue.photos)
+        self.assertEqual(len(list(Path(self.media_root).rglob('*.png'))), 1)
+        self.assertTrue(first.data['photos'][0].startswith('/media/venue_photos/'))
+
+    def test_invalid_photo_is_rejected(self):
+        payload = {
+            'name': 'Bad Hall',
+            'address': 'Center',
+            'capacity': 100,
+            'price_per_hour': '1000.00',
+            'photos': ['data:text/html;base64,PGI+'],
+        }
+        res = self.client.post('/api/venues/', payload, format='json')
+        self.assertEqual(res.status_code, 400)
+
+    def test_migrate_command_converts_inline_photos(self):
+        venue = Venue.objects.create(
+            name='Old Hall',
+            address='Address',
+            capacity=50,
+            price_per_hour=500,
+            photos=[PNG_DATA_URL],
+        )
+        call_command('migrate_venue_photos', batch_size=1, stdout=StringIO())
+        venue.refresh_from_db()
+        self.assertEqual(len(venue.photos), 1)
+        self.assertTrue(media.is_photo_ref(venue.photos[0]))
+
+
+class SparseFieldsetTests(APITestCase):
+    def setUp(self):
+        self.organizer = User.objects.create_user(
+            email='org@test.local',
+            username='org',
+            password='StrongPass123!',
+            role='organizer',
+        )
+        self.venue = Venue.objects.create(
+            name='Hall',
+            address='Address 1',
+            capacity=150,
+            description='long description',
+            price_per_hour=1000,
+            amenities=['parking'],
+        )
+        self.client.force_authenticate(self.organizer)
+
+    def test_fields_param_limits_payload_and_columns(self):
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get('/api/venues/', {'fields': 'id,name,price_per_hour'})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(set(res.data['results'][0]), {'id', 'name', 'price_per_hour'})
+        select = [q['sql'] for q in ctx.captured_queries if 'FROM "events_venue"' in q['sql'] and 'COUNT' not in q['sql']]
+        self.assertNotIn('"description"', select[-1])
+
+    def test_exclude_param_and_unknown_field(self):
+        res = self.client.get('/api/venues/', {'exclude': 'description,amenities'})
+        self.assertEqual(res.status_code, 200)
+        self.assertNotIn('description', res.data['results'][0])
+        self.assertIn('address', res.data['results'][0])
+
+        res = self.client.get('/api/venues/', {'fields': 'nope'})
+        self.assertEqual(res.status_code, 400)
+
+    def test_compact_list_views(self):
+        res = self.client.get('/api/venues/', {'view': 'compact'})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(
+            set(res.data['results'][0]),
+            {'id', 'name', 'address', 'capacity', 'price_per_hour', 'thumbnail', 'latitude', 'longitude', 'distance_km'},
+        )
+
+        Event.objects.create(
+            title='A',
+            date=date(2026, 1, 1),
+            start_time=time(10, 0),
+            end_time=time(12, 0),
+            organizer=self.organizer,
+            venue=self.venue,
+        )
+        res = self.client.get('/api/events/', {'view': 'compact'})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data['results'][0]['venue_name'], 'Hall')
+        self.assertNotIn('description', res.data['results'][0])
+
+
+class VenueSearchTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='org@test.local',
+            username='org',
+            password='StrongPass123!',
+            role='organizer',
+        )
+        self.client.force_authenticate(self.user)
+        self.hall = Venue.objects.create(
+            name='Ala-Too Wedding Hall',
+            address='Bishkek',
+            capacity=200,
+            description='Banquet hall',
+            price_per_hour=1000,
+        )
+        self.garden = Venue.objects.create(
+            name='Garden',
+            address='Osh',
+            capacity=100,
+            description='Open air wedding garden with a small hall',
+            price_per_hour=800,
+        )
+
+    def _search(self, query):
+        res = self.client.get('/api/venues/', {'search': query})
+        self.assertEqual(res.status_code, 200)
+        return [item['id'] for item in res.data['results']]
+
+    def test_search_ranks_name_matches_first(self):
+        self.assertEqual(self._search('wedding hall'), [self.hall.id, self.garden.id])
+        self.assertEqual(self._search('osh'), [self.garden.id])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.garden.name = 'Sunset Terrace'
+        self.garden.save()
+        self.assertEqual(self._search('terrace'), [self.garden.id])
+        self.garden.delete()
+        self.assertEqual(self._search('terrace'), [])
+
+    @override_settings(VENUE_SEARCH_BACKEND='events.search.LikeSearchBackend')
+    def test_like_backend_can_be_selected(self):
+        self.assertEqual(set(self._search('wedding')), {self.hall.id, self.garden.id})
+
+
+class KeysetPaginationTests(APITestCase):
+    def setUp(self):
+        self.organizer = User.objects.create_user(
+            email='org@test.local',
+            username='org',
+            password='StrongPass123!',
+            role='organizer',
+        )
+        self.client.force_authenticate(self.organizer)
+        self.venue = Venue.objects.create(name='Hall', address='A', capacity=100, price_per_hour=1000)
+        # Several events share a date and start time to exercise the id tiebreaker.
+        self.events = [
+            Event.objects.create(
+                title=f'E{i}',
+                date=date(2026, 1, 1 + i % 2),
+                start_time=time(10, 0),
+                end_time=time(11, 0),
+                organizer=self.organizer,
+            )
+            for i in range(5)
+        ]
+
+    def _walk(self, url, params):
+        seen = []
+        res = self.client.get(url, params)
+        while True:
+            self.assertEqual(res.status_code, 200, res.data)
+            seen.extend(item['id'] for item in res.data['results'])
+            if not res.data['next']:
+                return seen, res
+            res = self.client.get(res.data['next'])
+
+    def test_cursor_pages_follow_meta_ordering_without_count(self):
+        with CaptureQueriesContext(connection) as ctx:
+            seen, last = self._walk('/api/events/', {'cursor': '', 'page_size': 2})
+        expected = list(Event.objects.order_by('-date', '-start_time', '-id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+        self.assertNotIn('count', last.data)
+        self.assertFalse(any('COUNT(' in q['sql'] for q in ctx.captured_queries))
+
+    def test_cursor_with_count_and_invalid_cursor(self):
+        res = self.client.get('/api/events/', {'cursor': '', 'count': '1'})
+        self.assertEqual(res.data['count'], 5)
+        res = self.client.get('/api/events/', {'cursor': 'garbage'})
+        self.assertEqual(res.status_code, 404)
+
+    def test_page_number_mode_is_unchanged(self):
+        res = self.client.get('/api/events/')
+        self.assertEqual(res.data['count'], 5)
+        self.assertIn('previous', res.data)
+
+
+class VenueAvailabilityTests(APITestCase):
+    def setUp(self):
+        self.organizer = User.objects.create_user(
+            email='org@test.local',
+            username='org',
+            password='StrongPass123!',
+            role='organizer',
+        )
+        self.client.force_authenticate(self.organizer)
+        self.busy = Venue.objects.create(name='Busy', address='A', capacity=300, price_per_hour=3000)
+        self.free = Venue.objects.create(name='Free', address='B', capacity=200, price_per_hour=1000)
+        self.cheap = Venue.objects.create(name='Cheap', address='C', capacity=200, price_per_hour=500)
+        self.small = Venue.objects.create(name='Small', address='D', capacity=20, price_per_hour=100)
+        Event.objects.create(
+            title='Wedding',
+            date=date(2026, 6, 1),
+            start_time=time(17, 0),
+            end_time=time(23, 0),
+            organizer=self.organizer,
+            venue=self.busy,
+        )
+        Event.objects.create(
+            title='Lunch',
+            date=date(2026, 6, 1),
+            start_time=time(12, 0),
+            end_time=time(14, 0),
+            organizer=self.organizer,
+            venue=self.free,
+        )
+
+    def test_available_venues_single_query_sorted_by_price(self):
+        params = {'date': '2026-06-01', 'start': '18:00', 'end': '22:00', 'guests': 100, 'ordering': 'price_per_hour'}
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get('/api/venues/available/', params)
+        self.assertEqual(res.status_code, 200, res.data)
+        self.assertEqual([item['id'] for item in res.data['results']], [self.cheap.id, self.free.id])
+        venue_queries = [q for q in ctx.captured_queries if 'FROM "events_venue"' in q['sql']]
+        self.assertEqual(len(venue_queries), 2)  # page + count
+
+    def test_invalid_range_is_rejected(self):
+        res = self.client.get('/api/venues/available/', {'date': '2026-06-01', 'start': '18:00', 'end': '17:00'})
+        self.assertEqual(res.status_code, 400)
+
+
+class VenueOccupancyTests(APITestCase):
+    def setUp(self):
+        self.organizer = User.objects.create_user(
+            email='org@test.local',
+            username='org',
+            password='StrongPass123!',
+            role='organizer',
+        )
+        self.client.force_authenticate(self.organizer)
+        self.venue = Venue.objects.create(name='Hall', address='A', capacity=100, price_per_hour=1000)
+        self.other = Venue.objects.create(name='Other', address='B', capacity=100, price_per_hour=1000)
+        self.event = Event.objects.create(
+            title='Wedding',
+            date=date(2026, 6, 1),
+            start_time=time(17, 0),
+            end_time=time(22, 0),
+            organizer=self.organizer,
+            venue=self.venue,
+        )
+
+    def test_index_follows_event_moves_and_deletes(self):
+        self.assertEqual(occupancy.get_intervals(self.venue.id, date(2026, 6, 1)), [[61200, 79200, self.event.id]])
+
+        self.event.venue = self.other
+        self.event.save()
+        self.assertFalse(VenueOccupancy.objects.filter(venue=self.venue).exists())
+        self.assertEqual(len(occupancy.get_intervals(self.other.id, date(2026, 6, 1))), 1)
+
+        self.event.delete()
+        self.assertFalse(VenueOccupancy.objects.exists())
+        # The row taken as a lock is not left behind for an empty day.
+        occupancy.rebuild_day(self.venue.id, date(2026, 6, 2))
+        self.assertFalse(VenueOccupancy.objects.exists())
+
+    def test_overlap_check_reads_index(self):
+        with self.assertRaises(ValueError):
+            validate_no_time_overlap(self.venue, date(2026, 6, 1), time(21, 0), time(23, 0))
+        validate_no_time_overlap(self.venue, date(2026, 6, 1), time(22, 0), time(23, 0))
+        validate_no_time_overlap(
+            self.venue, date(2026, 6, 1), time(18, 0), time(23, 0), exclude_event_id=self.event.id
+        )
+
+    def test_overlap_check_with_overlapping_stored_intervals(self):
+        # Legacy rows: event 1 covers 00:00-05:33 and overlaps event 2.
+        intervals = [[0, 20000, 1], [3600, 7200, 2]]
+        self.assertEqual(occupancy.find_conflict(intervals, time(2, 50), time(3, 5)), 1)
+        self.assertEqual(occupancy.find_conflict(intervals, time(1, 30), time(1, 45), exclude_event_id=1), 2)
+        self.assertIsNone(occupancy.find_conflict(intervals, time(2, 50), time(3, 5), exclude_event_id=1))
+        self.assertIsNone(occupancy.find_conflict(intervals, time(6, 0), time(7, 0)))
+
+    def test_calendar_lists_busy_and_free_slots(self):
+        res = self.client.get(f'/api/venues/{self.venue.id}/calendar/', {'start': '2026-06-01', 'days': 2})
+        self.assertEqual(res.status_code, 200, res.data)
+        first, second = res.data['days']
+        self.assertEqual(first['busy'], [{'start': time(17, 0), 'end': time(22, 0), 'event': self.event.id}])
+        self.assertEqual(first['free'][0], {'start': time(0, 0), 'end': time(17, 0)})
+        self.assertEqual(second['busy'], [])
+
+    def test_consistency_check_and_rebuild(self):
+        VenueOccupancy.objects.all().delete()
+        with self.assertRaises(CommandError):
+            call_command('check_venue_occupancy', stdout=StringIO(), stderr=StringIO())
+        call_command('rebuild_venue_occupancy', stdout=StringIO())
+        call_command('check_venue_occupancy', stdout=StringIO())
+
+
+class ReservationTests(APITestCase):
+    def setUp(self):
+        self.organizer = User.objects.create_user(
+            email='org@test.local',
+            username='org',
+            password='StrongPass123!',
+            role='organizer',
+        )
+        self.client.force_authenticate(self.organizer)
+        self.venue = Venue.objects.create(name='Hall', address='A', capacity=100, price_per_hour=1000)
+        Event.objects.create(
+            title='Wedding',
+            date=date(2026, 6, 1),
+            start_time=time(17, 0),
+            end_time=time(22, 0),
+            organizer=self.organizer,
+            venue=self.venue,
+        )
+
+    def test_conflict_found_under_the_lock_is_rejected(self):
+        # As if a competing request committed after this one was validated.
+        with mock.patch('events.serializers.validate_no_time_overlap'):
+            res = self.client.post(
+                '/api/events/',
+                {'title': 'Late', 'date': '2026-06-01', 'start_time': '21:00', 'end_time': '23:00', 'venue': self.venue.id},
+                format='json',
+            )
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(Event.objects.count(), 1)
+
+    def test_failed_reservation_leaves_no_lock_row(self):
+        save = mock.Mock()
+        with self.assertRaises(ValueError):
+            reserve_slot(self.venue, date(2026, 6, 1), time(18, 0), time(19, 0), save)
+        save.assert_not_called()
+
+        with self.assertRaises(RuntimeError):
+            reserve_slot(self.venue, date(2026, 6, 2), time(18, 0), time(19, 0), mock.Mock(side_effect=RuntimeError))
+        self.assertFalse(VenueOccupancy.objects.filter(date=date(2026, 6, 2)).exists())
+
+
+class BulkEventTests(APITestCase):
+    def setUp(self):
+        self.organizer = User.objects.create_user(
+            email='org@test.local',
+            username='org',
+            password='StrongPass123!',
+            role='organizer',
+        )
+        self.client.force_authenticate(self.organizer)
+        self.venue = Venue.objects.create(name='Hall', address='A', capacity=100, price_per_hour=1000)
+        self.other = Venue.objects.create(name='Other', address='B', capacity=100, price_per_hour=1000)
+        Event.objects.create(
+            title='Existing',
+            date=date(2026, 6, 1),
+            start_time=time(17, 0),
+            end_time=time(22, 0),
+            organizer=self.organizer,
+            venue=self.venue,
+        )
+
+    def _items(self, days, venue=None):
+        return [
+            {
+                'title': f'Day {day}',
+                'date': f'2026-07-{day:02d}',
+                'start_time': '10:00',
+                'end_time': '14:00',
+                'venue': (venue or self.venue).id,
+            }
+            for day in days
+        ]
+
+    def test_bulk_create_uses_constant_queries_and_keeps_index(self):
+        with CaptureQueriesContext(connection) as small:
+            res = self.client.post('/api/events/bulk/', self._items([1, 2]), format='json')
+        self.assertEqual(res.status_code, 201)
+        with CaptureQueriesContext(connection) as large:
+            res = self.client.post('/api/events/bulk/', self._items(range(3, 13), self.other), format='json')
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(len(res.data), 10)
+        self.assertEqual(res.data[0]['organizer_email'], 'org@test.local')
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+        self.assertEqual(Event.objects.count(), 13)
+        self.assertEqual(list(occupancy.find_inconsistencies()), [])
+
+    def test_conflicts_are_reported_per_item_and_nothing_is_created(self):
+        items = self._items([1, 1])
+        items.append({'title': 'Clash', 'date': '2026-06-01', 'start_time': '21:00', 'end_time': '23:00', 'venue': self.venue.id})
+        res = self.client.post('/api/events/bulk/', items, format='json')
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(res.data['errors'][0], {})
+        self.assertIn('non_field_errors', res.data['errors'][1])
+        self.assertIn('non_field_errors', res.data['errors'][2])
+        self.assertEqual(Event.objects.count(), 1)
+        self.assertFalse(VenueOccupancy.objects.filter(date=date(2026, 7, 1)).exists())
+
+    def test_invalid_items_and_payloads(self):
+        items = self._items([1])
+        items.append({'title': 'Nowhere', 'date': '2026-07-02', 'start_time': '10:00', 'end_time': '11:00', 'venue': 9999})
+        res = self.client.post('/api/events/bulk/', items, format='json')
+        self.assertEqual(res.status_code, 400)
+        self.assertIn('venue', res.data['errors'][1])
+        self.assertEqual(self.client.post('/api/events/bulk/', {'title': 'x'}, format='json').status_code, 400)
+        self.assertEqual(self.client.post('/api/events/bulk/', self._items(range(1, 102)), format='json').status_code, 400)
+
+
+class BookingBatchTests(APITestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(email='owner@test.local', username='owner', password='StrongPass123!', role='owner')
+        self.admin = User.objects.create_user(email='admin@test.local', username='admin', password='StrongPass123!', role='admin')
+        self.guest = User.objects.create_user(email='guest@test.local', username='guest', password='StrongPass123!', role='user')
+        self.venue = Venue.objects.create(name='Hall', address='A', capacity=100, price_per_hour=1000, owner=self.owner)
+        self.other = Venue.objects.create(name='Other', address='B', capacity=100, price_per_hour=1000)
+        event = Event.objects.create(
+            title='Wedding',
+            date=date(2026, 6, 1),
+            start_time=time(17, 0),
+            end_time=time(22, 0),
+            organizer=self.admin,
+            venue=self.venue,
+        )
+        other_event = Event.objects.create(
+            title='Party',
+            date=date(2026, 6, 1),
+            start_time=time(17, 0),
+            end_time=time(22, 0),
+            organizer=self.admin,
+            venue=self.other,
+        )
+        self.first = Booking.objects.create(user=self.guest, event=event, venue=self.venue)
+        self.second = Booking.objects.create(user=self.guest, event=event, venue=self.venue)
+        self.elsewhere = Booking.objects.create(user=self.guest, event=other_event, venue=self.other)
+
+    def test_approving_overlapping_bookings_approves_only_the_first(self):
+        self.client.force_authenticate(self.admin)
+        ids = [self.first.id, self.second.id, self.elsewhere.id, 9999]
+        res = self.client.post('/api/bookings/batch/', {'action': 'approve', 'ids': ids}, format='json')
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(
+            res.data['results'],
+            [
+                {'id': self.first.id, 'status': 'approved'},
+                {'id': self.second.id, 'error': 'conflict'},
+                {'id': self.elsewhere.id, 'status': 'approved'},
+                {'id': 9999, 'error': 'not_found'},
+            ],
+        )
+        self.assertEqual(Booking.objects.get(pk=self.second.id).status, 'pending')
+
+        res = self.client.post('/api/bookings/batch/', {'action': 'reject', 'ids': [self.first.id]}, format='json')
+        self.assertEqual(res.data['results'], [{'id': self.first.id, 'error': 'invalid_transition', 'status': 'approved'}])
+
+    def test_owner_only_reaches_own_venues_and_users_are_refused(self):
+        self.client.force_authenticate(self.owner)
+        res = self.client.post(
+            '/api/bookings/batch/', {'action': 'cancel', 'ids': [self.first.id, self.elsewhere.id]}, format='json'
+        )
+        self.assertEqual(
+            res.data['results'],
+            [{'id': self.first.id, 'status': 'cancelled'}, {'id': self.elsewhere.id, 'error': 'not_found'}],
+        )
+
+        self.client.force_authenticate(self.guest)
+        res = self.client.post('/api/bookings/batch/', {'action': 'cancel', 'ids': [self.second.id]}, format='json')
+        self.assertEqual(res.status_code, 403)
+        self.client.force_authenticate(self.admin)
+        res = self.client.post('/api/bookings/batch/', {'action': 'archive', 'ids': []}, format='json')
+        self.assertEqual(res.status_code, 400)
+
+
+class OwnerSummaryTests(APITestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(email='owner@test.local', username='owner', password='StrongPass123!', role='owner')
+        self.guest = User.objects.create_user(email='guest@test.local', username='guest', password='StrongPass123!', role='user')
+        self.venue = Venue.objects.create(name='Hall', address='A', capacity=100, price_per_hour=1000, owner=self.owner)
+        Venue.objects.create(name='Foreign', address='B', capacity=100, price_per_hour=1000)
+        self.empty = Venue.objects.create(name='Empty', address='C', capacity=10, price_per_hour=500, owner=self.owner)
+
+    def _event(self, day, start, end):
+        return Event.objects.create(
+            title='E', date=day, start_time=start, end_time=end, organizer=self.owner, venue=self.venue
+        )
+
+    def test_summary_figures_in_constant_queries(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            past = self._event(date(2026, 1, 10), time(10, 0), time(13, 30))
+            upcoming = self._event(date(2026, 2, 2), time(12, 0), time(18, 0))
+            Booking.objects.create(user=self.guest, event=past, venue=self.venue, status='approved')
+            Booking.objects.create(user=self.guest, event=upcoming, venue=self.venue, status='approved')
+            Booking.objects.create(user=self.guest, event=upcoming, venue=self.venue, status='rejected')
+        self.client.force_authenticate(self.owner)
+
+        with mock.patch('django.utils.timezone.localdate', return_value=date(2026, 2, 1)):
+            with CaptureQueriesContext(connection) as ctx:
+                res = self.client.get('/api/owner/summary/', {'start': '2026-02-01', 'days': 10})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(len(ctx.captured_queries), 1)
+        hall, empty = res.data['venues']
+        self.assertEqual(hall['bookings'], {'pending': 0, 'approved': 2, 'cancelled': 0, 'rejected': 1})
+        self.assertEqual(hall['revenue'], Decimal('9500.00'))
+        self.assertEqual(hall['upcoming_events'], 1)
+        self.assertEqual(hall['occupancy_percent'], 2.5)
+        self.assertEqual((empty['revenue'], empty['upcoming_events'], empty['occupancy_percent']), (0, 0, 0))
+
+    def test_only_owners_and_admins(self):
+        self.client.force_authenticate(self.guest)
+        self.assertEqual(self.client.get('/api/owner/summary/').status_code, 403)
+
+
+class VenueDailyStatsTests(APITestCase):
+    def setUp(self):
+        self.organizer = User.objects.create_user(email='org@test.local', username='org', password='StrongPass123!', role='organizer')
+        self.venue = Venue.objects.create(name='Hall', address='A', capacity=100, price_per_hour=1000)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.event = Event.objects.create(
+                title='Wedding',
+                date=date(2026, 6, 1),
+                start_time=time(17, 0),
+                end_time=time(19, 0),
+                organizer=self.organizer,
+                venue=self.venue,
+                guest_count=80,
+            )
+            self.booking = Booking.objects.create(user=self.organizer, event=self.event, venue=self.venue)
+
+    def _stats(self, day=date(2026, 6, 1)):
+        return VenueDailyStats.objects.filter(venue=self.venue, date=day).first()
+
+    def test_rollup_follows_writes(self):
+        stats = self._stats()
+        self.assertEqual((stats.pending_bookings, stats.events, stats.guests, stats.event_seconds), (1, 1, 80, 7200))
+        self.assertEqual(stats.revenue, 0)
+
+        transition_bookings([self.booking.id], 'approve')
+        stats = self._stats()
+        self.assertEqual((stats.pending_bookings, stats.approved_bookings, stats.booked_seconds), (0, 1, 7200))
+        self.assertEqual(stats.revenue, Decimal('2000.00'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.event.date = date(2026, 6, 2)
+            self.event.save()
+        self.assertIsNone(self._stats())
+        self.assertEqual(self._stats(date(2026, 6, 2)).approved_bookings, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.event.delete()
+        self.assertFalse(VenueDailyStats.objects.exists())
+
+    def test_revenue_keeps_the_booked_price(self):
+        transition_bookings([self.booking.id], 'approve')
+        self.venue.price_per_hour = 1500
+        self.venue.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            Booking.objects.create(user=self.organizer, event=self.event, venue=self.venue, status='approved')
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.price_per_hour, Decimal('1000.00'))
+        self.assertEqual(self._stats().revenue, Decimal('5000.00'))
+
+    def test_backfill_rebuilds_rows(self):
+        VenueDailyStats.objects.all().delete()
+        VenueDailyStats.objects.create(venue=self.venue, date=date(2020, 1, 1), events=5)
+        call_command('backfill_venue_daily_stats', '--batch-size', '1', stdout=StringIO())
+        self.assertEqual(list(VenueDailyStats.objects.values_list('date', 'pending_bookings')), [(date(2026, 6, 1), 1)])
+
+
+class ArchiveTests(APITestCase):
+    def setUp(self):
+        self.organizer = User.objects.create_user(email='org@test.local', username='org', password='StrongPass123!', role='organizer')
+        self.guest = User.objects.create_user(email='guest@test.local', username='guest', password='StrongPass123!', role='user')
+        self.venue = Venue.objects.create(name='Hall', address='A', capacity=100, price_per_hour=1000)
+        self.old_day = date.today() - timedelta(days=400)
+
+        def event(title, day, start):
+            return Event.objects.create(
+                title=title, date=day, start_time=time(start), end_time=time(start + 2),
+                organizer=self.organizer, venue=self.venue, guest_count=50,
+            )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.done = event('Done', self.old_day, 10)
+            self.empty = event('Empty', self.old_day - timedelta(days=1), 10)
+            self.undecided = event('Undecided', self.old_day, 14)
+            self.recent = event('Recent', date.today() - timedelta(days=10), 10)
+            Booking.objects.create(user=self.guest, event=self.done, venue=self.venue, status=Booking.STATUS_APPROVED)
+            Booking.objects.create(user=self.organizer, event=self.done, venue=self.venue, status=Booking.STATUS_REJECTED)
+            Booking.objects.create(user=self.guest, event=self.undecided, venue=self.venue)
+
+    def _stats(self):
+        return list(VenueDailyStats.objects.order_by('date').values_list(
+            'date', 'events', 'approved_bookings', 'rejected_bookings', 'pending_bookings', 'revenue'
+        ))
+
+    def test_archives_in_resumable_batches(self):
+        stats = self._stats()
+        out = StringIO()
+        call_command('archive_events', '--dry-run', stdout=out)
+        self.assertIn('2 events, 2 bookings', out.getvalue())
+
+        call_command('archive_events', '--batch-size', '1', '--max-batches', '1', stdout=StringIO())
+        self.assertEqual(list(ArchivedEvent.objects.values_list('id', flat=True)), [self.empty.id])
+        call_command('archive_events', stdout=StringIO())
+
+        self.assertCountEqual(Event.objects.values_list('id', flat=True), [self.undecided.id, self.recent.id])
+        archived = ArchivedEvent.objects.get(pk=self.done.pk)
+        self.assertEqual((archived.title, archived.created_at), (self.done.title, self.done.created_at))
+        self.assertEqual(ArchivedBooking.objects.filter(event=archived).count(), 2)
+        self.assertEqual(Booking.objects.get().event_id, self.undecided.id)
+        self.assertEqual(Tombstone.objects.filter(model='events.Event').count(), 2)
+        # The day keeps the undecided event in its occupancy, and the rollup
+        # still counts what was archived, also when it is recomputed.
+        self.assertEqual(
+            [interval[2] for interval in VenueOccupancy.objects.get(venue=self.venue, date=self.old_day).intervals],
+            [self.undecided.id],
+        )
+        self.assertFalse(VenueOccupancy.objects.filter(date=self.empty.date).exists())
+        self.assertEqual(self._stats(), stats)
+        call_command('backfill_venue_daily_stats', stdout=StringIO())
+        self.assertEqual(self._stats(), stats)
+
+    def test_archive_api_is_read_only_and_scoped(self):
+        call_command('archive_events', stdout=StringIO())
+        self.client.force_authenticate(self.organizer)
+        res = self.client.get('/api/archive/events/')
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual([row['title'] for row in res.data['results']], ['Done', 'Empty'])
+        self.assertEqual(self.client.get(f'/api/archive/events/{self.done.id}/').data['venue_name'], 'Hall')
+        self.assertEqual(self.client.delete(f'/api/archive/events/{self.done.id}/').status_code, 405)
+
+        self.client.force_authenticate(self.guest)
+        self.assertEqual(self.client.get('/api/archive/events/').data['count'], 0)
+        res = self.client.get('/api/archive/bookings/')
+        self.assertEqual([(row['event_title'], row['status']) for row in res.data['results']], [('Done', 'approved')])
+
+
+@override_settings(DELTA_SYNC_MARGIN_SECONDS=0)
+class DeltaSyncTests(APITestCase):
+    def setUp(self):
+        django_cache.clear()
+        self.organizer = User.objects.create_user(email='org@test.local', username='org', password='StrongPass123!', role='organizer')
+        self.other = User.objects.create_user(email='other@test.local', username='other', password='StrongPass123!', role='organizer')
+        self.venue = Venue.objects.create(name='Hall', address='A', capacity=100, price_per_hour=1000)
+        self.events = [self._event(self.organizer, 10 + index * 2) for index in range(3)]
+        self.foreign = self._event(self.other, 18)
+        self.client.force_authenticate(self.organizer)
+
+    def _event(self, organizer, start):
+        return Event.objects.create(
+            title=f'Event {start}', date=date(2031, 1, 1), start_time=time(start), end_time=time(start + 1),
+            organizer=organizer, venue=self.venue,
+        )
+
+    def _sync(self, path, cursor=''):
+        res = self.client.get(path, {'updated_since': cursor})
+        self.assertEqual(res.status_code, 200, res.data)
+        return res.data
+
+    def test_returns_changes_and_tombstones_since_cursor(self):
+        first = self._sync('/api/events/')
+        self.assertEqual(sorted(row['id'] for row in first['results']), sorted(event.id for event in self.events))
+        self.assertEqual((first['deleted'], first['has_more']), ([], False))
+        self.assertEqual(self._sync('/api/events/', first['cursor'])['results'], [])
+
+        changed, removed, removed_id = self.events[0], self.events[1], self.events[1].id
+        changed.title = 'Renamed'
+        changed.save()
+        removed.delete()
+        self.foreign.delete()
+        added = self._event(self.organizer, 20)
+        delta = self._sync('/api/events/', first['cursor'])
+        self.assertEqual([row['id'] for row in delta['results']], [changed.id, added.id])
+        self.assertEqual(delta['results'][0]['title'], 'Renamed')
+        self.assertEqual(delta['deleted'], [removed_id])
+        self.assertEqual(self._sync('/api/events/', delta['cursor'])['deleted'], [])
+
+    def test_pages_and_venue_deactivation(self):
+        with mock.patch.object(EventViewSet, 'sync_page_size', 2):
+            page = self._sync('/api/events/')
+            self.assertTrue(page['has_more'])
+            rest = self._sync('/api/events/', page['cursor'])
+        self.assertFalse(rest['has_more'])
+        self.assertEqual(len(page['results']) + len(rest['results']), 3)
+
+        cursor = self._sync('/api/venues/')['cursor']
+        self.venue.is_active = False
+        self.venue.save()
+        delta = self._sync('/api/venues/', cursor)
+        self.assertEqual((delta['results'], delta['deleted']), ([], [self.venue.id]))
+
+    def test_related_renames_are_synced(self):
+        cursor = self._sync('/api/events/')['cursor']
+        self.organizer.last_login = timezone.now()
+        self.organizer.save(update_fields=['last_login'])
+        self.assertEqual(self._sync('/api/events/', cursor)['results'], [])
+
+        self.venue.name = 'Renamed hall'
+        self.venue.save()
+        delta = self._sync('/api/events/', cursor)
+        self.assertEqual(len(delta['results']), 3)
+        self.assertEqual({row['venue_name'] for row in delta['results']}, {'Renamed hall'})
+
+    def test_invalid_and_expired_cursors(self):
+        self.assertEqual(self.client.get('/api/bookings/', {'updated_since': 'junk'}).status_code, 400)
+        old = timezone.now() - timedelta(days=31)
+        res = self.client.get('/api/bookings/', {'updated_since': sync.encode_cursor(old, 0, old)})
+        self.assertEqual(res.status_code, 410)
+
+        Tombstone.objects.create(model='events.Event', object_id=1, deleted_at=old)
+        call_command('prune_tombstones', stdout=StringIO())
+        self.assertFalse(Tombstone.objects.filter(object_id=1).exists())
+
+
+class QueryBudgetTests(QueryBudgetAssertionsMixin, APITestCase):
+    def setUp(self):
+        django_cache.clear()
+        self.admin = User.objects.create_user(email='admin@test.local', username='admin', password='StrongPass123!', role='admin')
+        register = Register.objects.create(username='legacy', email='legacy@test.local', phone='+996700000000', password='x')
+        for index in range(3):
+            owner = User.objects.create_user(
+                email=f'owner{index}@test.local', username=f'owner{index}', password='StrongPass123!', role='owner'
+            )
+            venue = Venue.objects.create(name=f'Hall {index}', address='A', capacity=100, price_per_hour=1000, owner=owner)
+            event = Event.objects.create(
+                title=f'Event {index}', date=date(2026, 6, index + 1), start_time=time(10, 0), end_time=time(12, 0),
+                organizer=owner, venue=venue,
+            )
+            Booking.objects.create(user=owner, event=event, venue=venue)
+
+            legacy_venue = LegacyVenue.objects.create(
+                name=f'Legacy {index}', address='B', capacity=50, price_per_hour=500, owner=register
+            )
+            legacy_event = LegacyEvent.objects.create(
+                title=f'Legacy {index}', date=date(2026, 6, index + 1), start_time=time(10, 0), end_time=time(12, 0),
+                organizer=register, venue=legacy_venue,
+            )
+            LegacyBooking.objects.create(
+                event=legacy_event, venue=legacy_venue, total_price=1000,
+                start_time=datetime(2026, 6, index + 1, 10, tzinfo=dt_timezone.utc),
+                end_time=datetime(2026, 6, index + 1, 12, tzinfo=dt_timezone.utc),
+            )
+
+    def test_every_viewset_read_action_is_within_budget(self):
+        for viewset, model in (
+            (VenueViewSet, Venue),
+            (EventViewSet, Event),
+            (BookingViewSet, Booking),
+            (LegacyVenueViewSet, LegacyVenue),
+            (LegacyEventViewSet, LegacyEvent),
+            (LegacyBookingViewSet, LegacyBooking),
+        ):
+            self.assertViewSetWithinQueryBudget(viewset, self.admin, pk=model.objects.first().pk)
+
+    def test_middleware_reports_and_enforces_budget(self):
+        self.client.force_authenticate(self.admin)
+        res = self.client.get('/api/bookings/')
+        self.assertWithinQueryBudget(res)
+        self.assertIn('X-Query-Time-Ms', res)
+
+        with mock.patch.object(BookingViewSet, 'query_budget', {'list': 0}):
+            with self.assertLogs('config.queries', 'WARNING'):
+                self.client.get('/api/bookings/')
+            with override_settings(QUERY_BUDGET_MODE='raise'), self.assertRaises(QueryBudgetExceeded):
+                self.client.get('/api/bookings/')
+
+
+class HotQueryIndexTests(APITestCase):
+    def test_hot_queries_use_indexes(self):
+        out = StringIO()
+        call_command('explain_hot_queries', stdout=out)
+        self.assertNotIn('[table scan]', out.getvalue())
+
+
+class ConditionalGetTests(APITestCase):
+    def setUp(self):
+        django_cache.clear()
+        self.user = User.objects.create_user(
+            email='org@test.local',
+            username='org',
+            password='StrongPass123!',
+            role='organizer',
+        )
+        self.client.force_authenticate(self.user)
+        self.venue = Venue.objects.create(name='Hall', address='A', capacity=100, price_per_hour=1000)
+
+    def test_list_answers_304_until_data_changes(self):
+        first = self.client.get('/api/venues/')
+        etag = first['ETag']
+        self.assertIn('Last-Modified', first)
+
+        with CaptureQueriesContext(connection) as ctx:
+            cached = self.client.get('/api/venues/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.status_code, 304)
+        # Answered from the catalog cache's stored validators.
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+        self.venue.name = 'Renamed'
+        self.venue.save()
+        changed = self.client.get('/api/venues/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], etag)
+
+    def test_related_changes_change_list_etag(self):
+        Event.objects.create(
+            title='Party', date=date(2031, 1, 1), start_time=time(10), end_time=time(12),
+            organizer=self.user, venue=self.venue,
+        )
+        etag = self.client.get('/api/events/')['ETag']
+        self.venue.price_per_hour = 1200
+        self.venue.save()
+        self.assertEqual(self.client.get('/api/events/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.venue.name = 'Renamed'
+        self.venue.save()
+        changed = self.client.get('/api/events/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual((changed.status_code, changed.data['results'][0]['venue_name']), (200, 'Renamed'))
+
+        etag = changed['ETag']
+        self.user.email = 'renamed@test.local'
+        self.user.save()
+        self.assertEqual(self.client.get('/api/events/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_deletions_change_list_validators(self):
+        def event(start):
+            return Event.objects.create(
+                title='Party', date=date(2031, 1, 1), start_time=time(start), end_time=time(start + 1),
+                organizer=self.user, venue=self.venue,
+            )
+
+        removed = event(10)
+        event(12)
+        Event.objects.update(updated_at=timezone.now() - timedelta(minutes=5))
+        last = Event.objects.aggregate(last=Max('updated_at'))['last']
+        with CaptureQueriesContext(connection) as ctx:
+            first = self.client.get('/api/events/')
+        # The validator's aggregate also gives the paginator its count.
+        self.assertEqual(sum('COUNT(' in query['sql'] for query in ctx.captured_queries), 1)
+
+        # Same count and max(updated_at) as before the delete.
+        removed.delete()
+        Event.objects.filter(pk=event(14).pk).update(updated_at=last)
+        self.assertEqual(self.client.get('/api/events/', HTTP_IF_NONE_MATCH=first['ETag']).status_code, 200)
+        self.assertEqual(
+            self.client.get('/api/events/', HTTP_IF_MODIFIED_SINCE=first['Last-Modified']).status_code, 200
+        )
+
+    def test_detail_and_query_params_get_distinct_etags(self):
+        detail = self.client.get(f'/api/venues/{self.venue.id}/')
+        self.assertEqual(
+            self.client.get(f'/api/venues/{self.venue.id}/', HTTP_IF_NONE_MATCH=detail['ETag']).status_code,
+            304,
+        )
+        filtered = self.client.get('/api/venues/', {'capacity': 100})
+        self.assertNotEqual(filtered['ETag'], self.client.get('/api/venues/')['ETag'])
+
+
+class CatalogCacheTests(APITestCase):
+    def setUp(self):
+        django_cache.clear()
+        self.admin = User.objects.create_user(
+            email='admin@test.local',
+            username='admin',
+            password='StrongPass123!',
+            role='admin',
+        )
+        self.client.force_authenticate(self.admin)
+        self.venue = Venue.objects.create(name='Hall', address='A', capacity=100, price_per_hour=1000)
+
+    def test_list_is_served_from_cache_until_a_venue_changes(self):
+        self.assertEqual(self.client.get('/api/venues/', {'ordering': 'capacity'})['X-Cache'], 'MISS')
+        with CaptureQueriesContext(connection) as ctx:
+            hit = self.client.get('/api/venues/', {'ordering': 'capacity'})
+        self.assertEqual(hit['X-Cache'], 'HIT')
+        self.assertEqual(len(ctx.captured_queries), 0)
+        self.assertEqual(hit.data['results'][0]['name'], 'Hall')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.venue.name = 'Renamed'
+            self.venue.save()
+        res = self.client.get('/api/venues/', {'ordering': 'capacity'})
+        self.assertEqual(res['X-Cache'], 'MISS')
+        self.assertEqual(res.data['results'][0]['name'], 'Renamed')
+
+    def test_detail_cache_and_stats(self):
+        other = Venue.objects.create(name='Other', address='B', capacity=50, price_per_hour=500)
+        self.client.get(f'/api/venues/{self.venue.id}/')
+        self.client.get(f'/api/venues/{self.venue.id}/')
+        other.delete()
+        # Another venue changing keeps this detail entry.
+        self.assertEqual(self.client.get(f'/api/venues/{self.venue.id}/')['X-Cache'], 'HIT')
+
+        res = self.client.get('/api/venues/cache-stats/')
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual((res.data['hits'], res.data['misses']), (2, 1))
+
+
+class VenueNearTests(APITestCase):
+    def setUp(self):
+        django_cache.clear()
+        self.client.force_authenticate(
+            User.objects.create_user(email='u@test.local', username='u', password='StrongPass123!', role='user')
+        )
+        call_command('seed_real_venues', stdout=StringIO())
+        Venue.objects.create(name='No coordinates', address='X', capacity=10, price_per_hour=100)
+        Venue.objects.create(
+            name='Almaty Hall', address='Almaty', capacity=10, price_per_hour=100, latitude=43.2389, longitude=76.8897
+        )
+
+    def test_near_filters_by_radius_and_sorts_by_distance(self):
+        res = self.client.get('/api/venues/', {'near': '42.8746,74.5886', 'radius_km': 5})
+        self.assertEqual(res.status_code, 200)
+        names = [row['name'] for row in res.data['results']]
+        self.assertEqual(names[0], 'Sheraton Bishkek')
+        self.assertEqual(len(names), 4)
+        distances = [row['distance_km'] for row in res.data['results']]
+        self.assertEqual(distances, sorted(distances))
+        self.assertAlmostEqual(distances[0], 0, places=3)
+
+        wide = self.client.get('/api/venues/', {'near': '42.8746,74.5886', 'radius_km': 300})
+        self.assertEqual(wide.data['count'], 6)
+        self.assertEqual(wide.data['results'][-1]['name'], 'Almaty Hall')
+        self.assertAlmostEqual(wide.data['results'][-1]['distance_km'], 191, delta=10)
+
+    def test_near_validation_and_plain_listing(self):
+        self.assertEqual(self.client.get('/api/venues/', {'near': 'abc'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/venues/', {'near': '95,10'}).status_code, 400)
+        res = self.client.get('/api/venues/')
+        self.assertEqual(res.data['count'], 7)
+        self.assertIsNone(res.data['results'][0]['distance_km'])
+
+    def test_geo_cell_follows_coordinates(self):
+        venue = Venue.objects.get(name='No coordinates')
+        self.assertIsNone(venue.geo_cell)
+        venue.latitude, venue.longitude = 42.87, 74.59
+        venue.save(update_fields=['latitude', 'longitude'])
+        venue.refresh_from_db()
+        self.assertEqual(venue.geo_cell, geo.cell_for(42.87, 74.59))
+
+
+class AsyncReadTests(APITestCase):
+    def setUp(self):
+        self.organizer = User.objects.create_user(email='org@test.local', username='org', password='StrongPass123!', role='organizer')
+        self.other = User.objects.create_user(email='other@test.local', username='other', password='StrongPass123!', role='organizer')
+        self.venue = Venue.objects.create(name='Hall', address='A', capacity=100, price_per_hour=1000)
+        Venue.objects.create(name='Garden', address='B', capacity=300, price_per_hour=2000)
+        for owner in (self.organizer, self.other):
+            Event.objects.create(
+                title='Toi', date=date(2031, 5, 1), start_time=time(10), end_time=time(12),
+                guest_count=50, venue=self.venue, organizer=owner,
+            )
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {RefreshToken.for_user(self.organizer).access_token}'}
+
+    def test_matches_sync_endpoints(self):
+        self.client.force_authenticate(self.organizer)
+        for path, params in (
+            ('venues/', {'ordering': 'capacity', 'page_size': 1}),
+            (f'venues/{self.venue.id}/', {}),
+            ('venues/available/', {'date': '2031-05-01', 'start': '11:00', 'end': '13:00', 'view': 'compact'}),
+            ('events/', {}),
+        ):
+            with self.subTest(path=path):
+                expected = self.client.get(f'/api/{path}', params).json()
+                res = self.client.get(f'/api/async/{path}', params, **self.auth)
+                self.assertEqual(res.status_code, 200)
+                data = res.json()
+                for link in ('next', 'previous'):
+                    if data.get(link):
+                        data[link] = data[link].replace('/api/async/', '/api/')
+                self.assertEqual(data, expected)
+        res = self.client.get('/api/async/venues/', {'page': 2, 'page_size': 1}, **self.auth)
+        self.assertEqual(res.json()['results'][0]['name'], 'Hall')
+        self.assertIsNotNone(res.json()['previous'])
+
+    def test_authentication_and_errors(self):
+        res = self.client.get('/api/async/venues/')
+        self.assertEqual(res.status_code, 401)
+        self.assertIn('Bearer', res['WWW-Authenticate'])
+        self.assertEqual(self.client.get('/api/async/profile/', HTTP_AUTHORIZATION='Bearer nope').status_code, 401)
+        self.assertEqual(self.client.get('/api/async/venues/999/', **self.auth).status_code, 404)
+        self.assertEqual(self.client.get('/api/async/venues/', {'near': 'abc'}, **self.auth).status_code, 400)
+        self.assertEqual(self.client.get('/api/async/events/', {'venue': 'x'}, **self.auth).status_code, 400)
+        self.assertEqual(self.client.post('/api/async/venues/', **self.auth).status_code, 405)
+
+        self.organizer.is_active = False
+        self.organizer.save(update_fields=['is_active'])
+        self.assertEqual(self.client.get('/api/async/profile/', **self.auth).status_code, 401)
+
+    async def test_async_client_profile_and_query_budget(self):
+        res = await self.async_client.get('/api/async/profile/', headers={'Authorization': self.auth['HTTP_AUTHORIZATION']})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json()['email'], 'org@test.local')
+        self.assertEqual(res['X-Query-Budget'], '1')
+        self.assertEqual(res['X-Query-Count'], '1')
+
+        res = await self.async_client.get('/api/async/events/', headers={'Authorization': self.auth['HTTP_AUTHORIZATION']})
+        self.assertEqual([row['organizer'] for row in res.json()['results']], [self.organizer.id])
+        self.assertLessEqual(int(res['X-Query-Count']), int(res['X-Query-Budget']))
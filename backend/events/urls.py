@@ -1,13 +1,28 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import BookingViewSet, EventViewSet, VenueViewSet
+from . import async_views
+from .views import (
+    ArchivedBookingViewSet,
+    ArchivedEventViewSet,
+    BookingViewSet,
+    EventViewSet,
+    OwnerSummaryView,
+    VenueViewSet,
+)
 
 router = DefaultRouter()
 router.register(r'venues', VenueViewSet, basename='venue')
 router.register(r'events', EventViewSet, basename='event')
 router.register(r'bookings', BookingViewSet, basename='booking')
+router.register(r'archive/events', ArchivedEventViewSet, basename='archived-event')
+router.register(r'archive/bookings', ArchivedBookingViewSet, basename='archived-booking')
 
 urlpatterns = [
+    path('owner/summary/', OwnerSummaryView.as_view(), name='owner-summary'),
+    path('async/venues/', async_views.venue_list, name='async-venue-list'),
+    path('async/venues/available/', async_views.venue_available, name='async-venue-available'),
+    path('async/venues/<int:pk>/', async_views.venue_detail, name='async-venue-detail'),
+    path('async/events/', async_views.event_list, name='async-event-list'),
     path('', include(router.urls)),
 ]
@@ -1,17 +1,58 @@
-from rest_framework import permissions, viewsets
+from datetime import timedelta
 
-from .models import Booking, Event, Venue
-from .permissions import BookingPermission, VenuePermission, OnlyOrganizerCanModifyEvent
-from .serializers import BookingSerializer, EventSerializer, VenueSerializer
+from django.db.models import Q
+from django.utils import timezone
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import permissions, serializers, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.filters import OrderingFilter
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
+from users.permissions import IsAdminUserRole
 
-class VenueViewSet(viewsets.ModelViewSet):
-    queryset = Venue.objects.filter(is_active=True)
+from . import cache, occupancy
+from .cache import CatalogCacheMixin
+from .filters import VenueNearFilter
+from .mixins import ConditionalGetMixin, SparseFieldsetMixin
+from .models import ArchivedBooking, ArchivedEvent, Booking, Event, Venue, VenueOccupancy
+from .pagination import KeysetPagination
+from .permissions import BookingPermission, OwnerOrAdminPermission, VenuePermission, OnlyOrganizerCanModifyEvent
+from .search import VenueSearchFilter
+from .serializers import (
+    ArchivedBookingSerializer,
+    ArchivedEventSerializer,
+    BookingBatchSerializer,
+    BookingSerializer,
+    EventCompactSerializer,
+    EventSerializer,
+    OwnerSummaryQuerySerializer,
+    VenueAvailabilityQuerySerializer,
+    VenueCalendarQuerySerializer,
+    VenueCompactSerializer,
+    VenueSerializer,
+)
+from .services import available_venues, bulk_create_events, owner_summary, reserve_slot, transition_bookings
+from .sync import DeltaSyncMixin
+
+
+class VenueViewSet(DeltaSyncMixin, CatalogCacheMixin, ConditionalGetMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
+    queryset = Venue.objects.select_related('owner').filter(is_active=True)
     serializer_class = VenueSerializer
+    compact_serializer_class = VenueCompactSerializer
+    compact_actions = ('list', 'available')
     permission_classes = [VenuePermission]
+    query_budget = {'list': 4, 'retrieve': 2}
+    pagination_class = KeysetPagination
+    filter_backends = (DjangoFilterBackend, VenueSearchFilter, VenueNearFilter, OrderingFilter)
     filterset_fields = ('capacity', 'is_active')
     search_fields = ('name', 'address', 'description')
     ordering_fields = ('created_at', 'price_per_hour', 'capacity')
+    sync_hidden = Q(is_active=False)
+
+    def get_sync_queryset(self):
+        # Deactivated venues are included so clients learn they are gone.
+        return Venue.objects.select_related('owner')
 
     def perform_create(self, serializer):
         # Owners create venues for themselves; admin can set owner explicitly via payload if needed.
@@ -21,14 +62,55 @@ class VenueViewSet(viewsets.ModelViewSet):
         else:
             serializer.save()
 
+    @action(detail=False, methods=['get'])
+    def available(self, request):
+        """Venues free on ?date= between ?start= and ?end= for ?guests= people."""
+        params = VenueAvailabilityQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        queryset = available_venues(
+            self.filter_queryset(self.get_queryset()),
+            params.validated_data['date'],
+            params.validated_data['start'],
+            params.validated_data['end'],
+            params.validated_data.get('guests'),
+        )
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=['get'], url_path='cache-stats', permission_classes=[IsAdminUserRole])
+    def cache_stats(self, request):
+        """Hit/miss counters of the shared catalog cache."""
+        return Response(cache.stats())
+
+    @action(detail=True, methods=['get'])
+    def calendar(self, request, pk=None):
+        """Busy and free intervals per day for ?start= and the following ?days= days."""
+        params = VenueCalendarQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        venue = self.get_object()
+        start = params.validated_data['start']
+        days = [start + timedelta(days=offset) for offset in range(params.validated_data['days'])]
+        rows = dict(
+            VenueOccupancy.objects.filter(venue=venue, date__range=(days[0], days[-1])).values_list('date', 'intervals')
+        )
+        return Response({
+            'venue': venue.id,
+            'days': [occupancy.day_calendar(day, rows.get(day, [])) for day in days],
+        })
 
-class EventViewSet(viewsets.ModelViewSet):
+
+class EventViewSet(DeltaSyncMixin, ConditionalGetMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     queryset = Event.objects.select_related('organizer', 'venue')
     serializer_class = EventSerializer
+    compact_serializer_class = EventCompactSerializer
     permission_classes = [OnlyOrganizerCanModifyEvent]
+    query_budget = {'list': 4, 'retrieve': 2}
+    pagination_class = KeysetPagination
     filterset_fields = ('date', 'status', 'venue')
     search_fields = ('title', 'description')
     ordering_fields = ('date', 'start_time', 'created_at')
+    bulk_limit = 100
 
     def get_queryset(self):
         user = self.request.user
@@ -37,13 +119,70 @@ class EventViewSet(viewsets.ModelViewSet):
         return self.queryset.filter(organizer=user)
 
     def perform_create(self, serializer):
-        serializer.save(organizer=self.request.user)
+        self._reserve(serializer, organizer=self.request.user)
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """Create a list of events at once; nothing is created if any item is invalid."""
+        items = request.data
+        if not isinstance(items, list) or not items:
+            raise serializers.ValidationError({'non_field_errors': ['Expected a non-empty list of events.']})
+        if len(items) > self.bulk_limit:
+            raise serializers.ValidationError({'non_field_errors': [f'At most {self.bulk_limit} events per request.']})
+
+        venue_ids = set()
+        for item in items:
+            try:
+                venue_ids.add(int(item.get('venue')))
+            except (AttributeError, TypeError, ValueError):
+                pass
+        context = {
+            **self.get_serializer_context(),
+            'venues': Venue.objects.in_bulk(venue_ids),
+            'check_overlap': False,
+        }
+        item_serializers = [EventSerializer(data=item, context=context) for item in items]
+        errors = [{} if serializer.is_valid() else serializer.errors for serializer in item_serializers]
+        if not any(errors):
+            events, conflicts = bulk_create_events(
+                [serializer.validated_data for serializer in item_serializers], organizer=request.user
+            )
+            if not conflicts:
+                data = EventSerializer(events, many=True, context=self.get_serializer_context()).data
+                return Response(data, status=status.HTTP_201_CREATED)
+            errors = [{'non_field_errors': [conflicts[index]]} if index in conflicts else {} for index in range(len(items))]
+        return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+
+    def perform_update(self, serializer):
+        self._reserve(serializer)
+
+    def _reserve(self, serializer, **kwargs):
+        # The serializer already checked for overlaps; reserve_slot repeats
+        # the check atomically so concurrent requests cannot both win.
+        data, instance = serializer.validated_data, serializer.instance
 
+        def current(name):
+            return data[name] if name in data else getattr(instance, name, None)
 
-class BookingViewSet(viewsets.ModelViewSet):
+        try:
+            reserve_slot(
+                current('venue'),
+                current('date'),
+                current('start_time'),
+                current('end_time'),
+                lambda: serializer.save(**kwargs),
+                exclude_event_id=getattr(instance, 'id', None),
+            )
+        except ValueError as exc:
+            raise serializers.ValidationError({'non_field_errors': [str(exc)]})
+
+
+class BookingViewSet(DeltaSyncMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Booking.objects.select_related('user', 'event', 'venue')
     serializer_class = BookingSerializer
     permission_classes = [BookingPermission]
+    query_budget = {'list': 4, 'retrieve': 2}
+    pagination_class = KeysetPagination
     filterset_fields = ('status', 'venue', 'event')
     ordering_fields = ('created_at',)
 
@@ -55,3 +194,69 @@ class BookingViewSet(viewsets.ModelViewSet):
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
+
+    @action(detail=False, methods=['post'], permission_classes=[OwnerOrAdminPermission])
+    def batch(self, request):
+        """Approve, reject or cancel a list of bookings: {"action": "approve", "ids": [...]}."""
+        params = BookingBatchSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        user = request.user
+        results = transition_bookings(
+            params.validated_data['ids'],
+            params.validated_data['action'],
+            owner=None if user.role == 'admin' else user,
+        )
+        return Response({'results': results})
+
+
+class ArchivedEventViewSet(viewsets.ReadOnlyModelViewSet):
+    """Events moved out by ``events.archive``; organizers see their own, admin all."""
+
+    queryset = ArchivedEvent.objects.select_related('organizer', 'venue')
+    serializer_class = ArchivedEventSerializer
+    query_budget = {'list': 3, 'retrieve': 2}
+    pagination_class = KeysetPagination
+    filterset_fields = ('date', 'status', 'venue')
+    search_fields = ('title', 'description')
+    ordering_fields = ('date', 'start_time', 'created_at')
+
+    def get_queryset(self):
+        user = self.request.user
+        if user.role == 'admin':
+            return self.queryset.all()
+        return self.queryset.filter(organizer=user)
+
+
+class ArchivedBookingViewSet(viewsets.ReadOnlyModelViewSet):
+    """Archived bookings; users see their own, admin all."""
+
+    queryset = ArchivedBooking.objects.select_related('user', 'event', 'venue')
+    serializer_class = ArchivedBookingSerializer
+    query_budget = {'list': 3, 'retrieve': 2}
+    pagination_class = KeysetPagination
+    filterset_fields = ('status', 'venue', 'event')
+    ordering_fields = ('created_at',)
+
+    def get_queryset(self):
+        user = self.request.user
+        if user.role == 'admin':
+            return self.queryset.all()
+        return self.queryset.filter(user=user)
+
+
+class OwnerSummaryView(APIView):
+    """GET /api/owner/summary/?start=&days= — dashboard figures per owned venue."""
+
+    permission_classes = [OwnerOrAdminPermission]
+
+    def get(self, request):
+        params = OwnerSummaryQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        today = timezone.localdate()
+        venues = Venue.objects.all()
+        if request.user.role != 'admin':
+            venues = venues.filter(owner=request.user)
+        start = params.validated_data.get('start') or today
+        days = params.validated_data['days']
+        rows = owner_summary(venues, start, days, today)
+        return Response({'start': start, 'days': days, 'venues': rows})
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.10 on 2026-10-18 13:25
+
+from django.db import migrations, models
+
+from config.migration_operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('toiapp', '0007_booking_event_venue_delete_super_user_register_role_and_more'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='booking',
+            index=models.Index(condition=models.Q(('status__in', ['pending', 'confirmed'])), fields=['venue', 'start_time', 'end_time'], name='toiapp_booking_active_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='phoneverification',
+            index=models.Index(fields=['phone', 'is_verified', '-created_at'], name='toiapp_phonever_lookup_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='venue',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-created_at'], name='toiapp_venue_active_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+from django.db import migrations
+
+# Активные бронирования одного помещения не могут пересекаться по времени.
+# В остальных СУБД это обеспечивает блокировка в BookingViewSet.perform_create.
+POSTGRES_FORWARD = [
+    'CREATE EXTENSION IF NOT EXISTS btree_gist',
+    """
+    ALTER TABLE toiapp_booking ADD CONSTRAINT toiapp_booking_no_overlap
+    EXCLUDE USING gist (
+        venue_id WITH =,
+        tstzrange(start_time, end_time, '[)') WITH &&
+    )
+    WHERE (status IN ('pending', 'confirmed') AND end_time > start_time)
+    """,
+]
+POSTGRES_REVERSE = [
+    'ALTER TABLE toiapp_booking DROP CONSTRAINT IF EXISTS toiapp_booking_no_overlap',
+]
+
+
+def _run(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('toiapp', '0008_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(_run(POSTGRES_FORWARD), _run(POSTGRES_REVERSE)),
+    ]
@@ -24,6 +24,11 @@ class PhoneVerification(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     is_verified = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['phone', 'is_verified', '-created_at'], name='toiapp_phonever_lookup_idx'),
+        ]
+
     def __str__(self):
         return f"{self.phone} - {self.code}"
 
@@ -44,6 +49,9 @@ class Venue(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at'], name='toiapp_venue_active_idx', condition=models.Q(is_active=True)),
+        ]
 
     def __str__(self):
         return self.name
@@ -78,6 +86,10 @@ class Event(models.Model):
         return self.title
 
 
+# EXCLUDE-ограничение Postgres на пересечение активных бронирований (миграция 0009)
+BOOKING_OVERLAP_CONSTRAINT = 'toiapp_booking_no_overlap'
+
+
 class Booking(models.Model):
     """Модель бронирования помещения"""
     STATUS_CHOICES = [
@@ -98,6 +110,13 @@ class Booking(models.Model):
 
     class Meta:
         ordering = ['-start_time']
+        indexes = [
+            models.Index(
+                fields=['venue', 'start_time', 'end_time'],
+                name='toiapp_booking_active_idx',
+                condition=models.Q(status__in=['pending', 'confirmed']),
+            ),
+        ]
 
     def __str__(self):
         return f"{self.event.title} - {self.venue.name}"
\ No newline at end of file
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from events.serializers import PhotoListField
 from .models import Register, Venue, Event, Booking
 
 
@@ -45,6 +46,7 @@ class VenueSerializer(serializers.ModelSerializer):
     """Сериализатор для модели Venue"""
     owner_name = serializers.CharField(source='owner.username', read_only=True)
     owner_email = serializers.CharField(source='owner.email', read_only=True)
+    photos = PhotoListField()
     
     class Meta:
         model = Venue
@@ -2,11 +2,11 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, viewsets, permissions
 from rest_framework.exceptions import PermissionDenied
-from django.utils import timezone
-from datetime import timedelta
+from django.db import IntegrityError, connection, transaction
 from django.contrib.auth.hashers import make_password
 from rest_framework_simplejwt.tokens import RefreshToken
 from .tokens import RegisterRefreshToken
+from .utils import send_sms
 from rest_framework.decorators import api_view
 from django.shortcuts import render
 from django.conf import settings
@@ -14,7 +14,12 @@ from django.http import HttpResponse
 from pathlib import Path
 import uuid
 
-from .models import Register, PhoneVerification, Venue, Event, Booking
+from events.cache import CatalogCacheMixin
+from events.mixins import ConditionalGetMixin
+from users import sms
+from users.otp import issue_code, verify_code
+
+from .models import Register, Venue, Event, Booking, BOOKING_OVERLAP_CONSTRAINT
 from .serializers import (
     VerifyCodeSerializer, RegisterSerializer,
     VenueSerializer, EventSerializer, BookingSerializer
@@ -47,9 +52,12 @@ class SendCodeView(APIView):
                 {"error": "Некорректный номер телефона"},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        import random
-        code = "".join(str(random.randint(0, 9)) for _ in range(6))
-        PhoneVerification.objects.create(phone=phone, code=code)
+        # Сначала проверяем очередь SMS, чтобы отказ не заменил прежний код
+        sms.check_available()
+        # Не больше OTP_MAX_SENDS кодов на номер, иначе 429 (см. users.otp)
+        code = issue_code("toiapp", phone)
+        # SMS уходит в фоне, ответ не ждёт провайдера
+        send_sms(phone, code)
         # В режиме разработки возвращаем код (для тестов). В продакшене убрать.
         if settings.DEBUG:
             return Response({"message": "Код отправлен", "code": code}, status=status.HTTP_200_OK)
@@ -73,21 +81,8 @@ class VerifyCodeView(APIView):
         phone = serializer.validated_data["phone"]
         code = serializer.validated_data["code"]
 
-        # Проверяем срок действия (10 минут)
-        time_threshold = timezone.now() - timedelta(minutes=10)
-
-        verification = (
-            PhoneVerification.objects.filter(
-                phone=phone,
-                code=code,
-                is_verified=False,
-                created_at__gte=time_threshold
-            )
-            .order_by("-created_at")
-            .first()
-        )
-
-        if not verification:
+        # Срок действия и число попыток проверяет хранилище кодов
+        if not verify_code("toiapp", phone, code):
             return Response(
                 {
                     "error": "Неверный код или код истёк",
@@ -96,10 +91,6 @@ class VerifyCodeView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Помечаем код как использованный
-        verification.is_verified = True
-        verification.save(update_fields=["is_verified"])
-
         # Проверяем есть ли пользователь
         user = Register.objects.filter(phone=phone).first()
         created = False
@@ -173,15 +164,23 @@ def index(request):
 
 
 
-class VenueViewSet(viewsets.ModelViewSet):
+class VenueViewSet(CatalogCacheMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """ViewSet для управления помещениями"""
-    queryset = Venue.objects.filter(is_active=True)
+    queryset = Venue.objects.select_related('owner').filter(is_active=True)
     serializer_class = VenueSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    query_budget = {'list': 4, 'retrieve': 2}
+
+    def get_cache_variant(self, request):
+        """Владельцы видят только свои помещения — кэшируем отдельно"""
+        user = getattr(request, 'user', None)
+        if user and getattr(user, 'role', None) == 'owner':
+            return f'owner:{user.pk}'
+        return ''
     
     def get_queryset(self):
         """Фильтрация помещений"""
-        queryset = Venue.objects.filter(is_active=True)
+        queryset = self.queryset.all()
         # Владельцы видят только свои помещения
         user = getattr(self.request, 'user', None)
         if user and hasattr(user, 'role') and user.role == 'owner':
@@ -200,22 +199,23 @@ class VenueViewSet(viewsets.ModelViewSet):
         serializer.save(owner=user)
 
 
-class EventViewSet(viewsets.ModelViewSet):
+class EventViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """ViewSet для управления мероприятиями"""
-    queryset = Event.objects.all()
+    queryset = Event.objects.select_related('organizer', 'venue')
     serializer_class = EventSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = {'list': 4, 'retrieve': 2}
     
     def get_queryset(self):
         """Организаторы видят только свои события"""
         user = getattr(self.request, 'user', None)
         if user and hasattr(user, 'role'):
             if user.role == 'organizer':
-                return Event.objects.filter(organizer=user)
+                return self.queryset.filter(organizer=user)
             # Владельцы видят события, связанные с их помещениями
             elif user.role == 'owner':
-                return Event.objects.filter(venue__owner=user)
-        return Event.objects.all()
+                return self.queryset.filter(venue__owner=user)
+        return self.queryset.all()
     
     def perform_create(self, serializer):
         """Автоматически связываем с текущим пользователем"""
@@ -227,11 +227,12 @@ class EventViewSet(viewsets.ModelViewSet):
         serializer.save(organizer=user)
 
 
-class BookingViewSet(viewsets.ModelViewSet):
+class BookingViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """ViewSet для управления бронированиями"""
-    queryset = Booking.objects.all()
+    queryset = Booking.objects.select_related('event__organizer', 'venue')
     serializer_class = BookingSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = {'list': 4, 'retrieve': 2}
     
     def get_queryset(self):
         """Фильтрация бронирований по роли"""
@@ -239,11 +240,11 @@ class BookingViewSet(viewsets.ModelViewSet):
         if user and hasattr(user, 'role'):
             if user.role == 'organizer':
                 # Организаторы видят бронирования своих событий
-                return Booking.objects.filter(event__organizer=user)
+                return self.queryset.filter(event__organizer=user)
             elif user.role == 'owner':
                 # Владельцы видят бронирования своих помещений
-                return Booking.objects.filter(venue__owner=user)
-        return Booking.objects.all()
+                return self.queryset.filter(venue__owner=user)
+        return self.queryset.all()
     
     def perform_create(self, serializer):
         """Создание бронирования с автоматическим расчетом цены и проверкой пересечений"""
@@ -262,21 +263,35 @@ class BookingViewSet(viewsets.ModelViewSet):
         if event.organizer != user:
             raise PermissionDenied("Вы можете бронировать только для своих событий")
         
-        # Проверяем пересечение с существующими бронированиями
-        overlapping_bookings = Booking.objects.filter(
-            venue=venue,
-            status__in=['pending', 'confirmed'],
-            start_time__lt=end_time,
-            end_time__gt=start_time
-        ).exclude(id=getattr(serializer.instance, 'id', None))
-        
-        if overlapping_bookings.exists():
-            raise PermissionDenied(
-                "Это помещение уже забронировано на указанное время"
-            )
-        
         # Рассчитываем цену
         duration_hours = (end_time - start_time).total_seconds() / 3600
         total_price = venue.price_per_hour * duration_hours
-        
-        serializer.save(total_price=total_price)
\ No newline at end of file
+
+        try:
+            with transaction.atomic():
+                if connection.vendor != 'postgresql':
+                    # Блокируем строку помещения: параллельные бронирования
+                    # этого помещения ждут, другие помещения не блокируются.
+                    # В SQLite блокировок строк нет: всех писателей по очереди
+                    # пропускает BEGIN IMMEDIATE (см. settings.DATABASES)
+                    Venue.objects.select_for_update().filter(pk=venue.pk).first()
+
+                # Проверяем пересечение с существующими бронированиями
+                overlapping_bookings = Booking.objects.filter(
+                    venue=venue,
+                    status__in=['pending', 'confirmed'],
+                    start_time__lt=end_time,
+                    end_time__gt=start_time
+                ).exclude(id=getattr(serializer.instance, 'id', None))
+
+                if overlapping_bookings.exists():
+                    raise PermissionDenied(
+                        "Это помещение уже забронировано на указанное время"
+                    )
+
+                serializer.save(total_price=total_price)
+        except IntegrityError as exc:
+            # В Postgres пересечения отсекает EXCLUDE-ограничение (миграция 0009)
+            if BOOKING_OVERLAP_CONSTRAINT not in str(exc):
+                raise
+            raise PermissionDenied("Это помещение уже забронировано на указанное время")
@@ -0,0 +1,15 @@
+from django.contrib.auth import get_user_model
+
+from config.async_api import async_api_view
+
+from .serializers import UserSerializer
+
+
+@async_api_view(query_budget=1)
+async def profile(request):
+    """Async ``GET /api/profile/``: the user already loaded by authentication."""
+    user = request.user
+    if getattr(user, 'from_claims', False):
+        # Claims-only authentication carries no email/phone; load the row.
+        user = await get_user_model().objects.aget(pk=user.pk)
+    return UserSerializer(user).data
@@ -0,0 +1,189 @@
+"""
+JWT authentication without a user query per request.
+
+``CachedJWTAuthentication`` resolves the token's user from ``UserCache``, a
+bounded LRU with a TTL kept by each worker process. Entries are keyed by
+user id and token version (the revoke claim when ``CHECK_REVOKE_TOKEN`` is
+on), and dropped on every save or delete of the user, which covers role
+and ``is_active`` changes made in this process; other processes see them
+within ``settings.JWT_USER_CACHE_TTL`` seconds.
+
+With ``settings.JWT_CLAIMS_ONLY_AUTH`` tokens carrying the ``role`` claim
+(``users.tokens.UserRefreshToken``, ``toiapp.tokens.RegisterRefreshToken``)
+skip the lookup entirely: the user is an unsaved instance built from the
+claims, flagged ``from_claims``. Role and ``is_active`` changes then apply
+once the access token is refreshed.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import router
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+class UserCache:
+    """Thread-safe LRU of ``(model label, pk) -> (expiry, version, user)``."""
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, label, pk, version=None):
+        # Tokens carry the id as a string.
+        pk = str(pk)
+        with self._lock:
+            entry = self._entries.get((label, pk))
+            if entry is None or entry[0] < time.monotonic() or entry[1] != version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end((label, pk))
+            self.hits += 1
+        # A copy, so a view changing request.user cannot leak into other requests.
+        return copy.copy(entry[2])
+
+    def set(self, label, pk, version, user):
+        if self.max_size <= 0:
+            return
+        pk = str(pk)
+        with self._lock:
+            self._entries[(label, pk)] = (time.monotonic() + self.ttl, version, copy.copy(user))
+            self._entries.move_to_end((label, pk))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, label, pk):
+        with self._lock:
+            self._entries.pop((label, str(pk)), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+
+_cache = None
+
+
+def get_user_cache():
+    global _cache
+    if _cache is None:
+        _cache = UserCache(
+            getattr(settings, 'JWT_USER_CACHE_SIZE', 10000),
+            getattr(settings, 'JWT_USER_CACHE_TTL', 60),
+        )
+    return _cache
+
+
+@receiver(setting_changed)
+def _reset_cache(setting, **kwargs):
+    global _cache
+    if setting in ('JWT_USER_CACHE_SIZE', 'JWT_USER_CACHE_TTL'):
+        _cache = None
+
+
+def invalidate_user(instance):
+    get_user_cache().invalidate(instance._meta.label, instance.pk)
+
+
+def claims_user(model, validated_token):
+    """
+    Unsaved ``model`` instance from the token's claims, or None when claims-only
+    authentication is off or the token lacks the ``role`` claim. It works
+    for ORM filters and foreign keys; fields without a claim are blank.
+    """
+    if not getattr(settings, 'JWT_CLAIMS_ONLY_AUTH', False) or 'role' not in validated_token:
+        return None
+    user = model(username=validated_token.get('username', ''), role=validated_token['role'])
+    # The claim is a string; ownership checks compare ids with ``==``.
+    user.pk = model._meta.pk.to_python(validated_token[api_settings.USER_ID_CLAIM])
+    user._state.adding = False
+    user._state.db = router.db_for_read(model)
+    user.from_claims = True
+    return user
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """``JWTAuthentication`` reading users through ``UserCache``; same checks and errors."""
+
+    def get_user(self, validated_token):
+        user = self._user_without_query(validated_token)
+        if user is not None:
+            return user
+        user_id = self._user_id(validated_token)
+        try:
+            user = self.user_model.objects.get(**{api_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist as exc:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found') from exc
+        return self._check(user, validated_token, store=True)
+
+    def _version(self, validated_token):
+        return validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) if api_settings.CHECK_REVOKE_TOKEN else None
+
+    def _user_id(self, validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as exc:
+            raise InvalidToken(_('Token contained no recognizable user identification')) from exc
+
+    def _user_without_query(self, validated_token):
+        user_id = self._user_id(validated_token)
+        user = claims_user(self.user_model, validated_token)
+        if user is not None:
+            return user
+        user = get_user_cache().get(self.user_model._meta.label, user_id, self._version(validated_token))
+        if user is not None:
+            return self._check(user, validated_token)
+        return None
+
+    def _check(self, user, validated_token, store=False):
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code='password_changed')
+
+        if store:
+            get_user_cache().set(user._meta.label, user.pk, self._version(validated_token), user)
+        return user
+
+
+class AsyncJWTAuthentication(CachedJWTAuthentication):
+    """
+    ``CachedJWTAuthentication`` for async views. Token parsing, signature
+    checks and the cache are pure computation; a cache miss loads the user
+    through the async ORM.
+    """
+
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        user = self._user_without_query(validated_token)
+        if user is not None:
+            return user
+        user_id = self._user_id(validated_token)
+        try:
+            user = await self.user_model.objects.aget(**{api_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist as exc:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found') from exc
+        return self._check(user, validated_token, store=True)
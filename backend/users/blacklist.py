@@ -0,0 +1,139 @@
+"""
+Refresh-token blacklist checks without a query per refresh.
+
+Rotation blacklists every refreshed token, and simplejwt checks the
+blacklist table on each refresh. ``TokenBlacklist`` answers most checks
+from memory:
+
+* a Bloom filter of the unexpired blacklisted jtis, rebuilt from the
+  database every ``settings.JWT_BLACKLIST_FILTER_TTL`` seconds. A miss
+  means the token was not blacklisted at the last rebuild; a hit (true,
+  or false at ``JWT_BLACKLIST_FILTER_ERROR_RATE``) is confirmed in the
+  database;
+* a key in the default cache for every token blacklisted since, kept
+  until the token expires. It covers the gap until the next rebuild.
+
+A miss is only trusted when the default cache is shared by all workers
+(Redis, Memcached, database, files), as with the Redis service of
+docker-compose.yml. With a per-process cache (LocMem, the settings
+default) another worker could not see a token blacklisted since its last
+rebuild, so every check reads the database, as simplejwt does.
+
+``prune`` removes expired outstanding and blacklisted tokens in short
+batches (``manage.py prune_tokens``).
+"""
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.dispatch import receiver
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+CACHE_PREFIX = 'jwt-blacklist:'
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate):
+        capacity = max(capacity, 1)
+        self.size = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hashes = max(round(self.size / capacity * math.log(2)), 1)
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], 'big'), int.from_bytes(digest[8:], 'big') | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, key):
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class TokenBlacklist:
+    def __init__(self, ttl, error_rate, shared):
+        self.ttl = ttl
+        self.error_rate = error_rate
+        self.shared = shared
+        self._filter = None
+        self._built = 0.0
+        self._lock = threading.Lock()
+
+    def rebuild(self):
+        blacklisted = BlacklistedToken.objects.filter(token__expires_at__gt=timezone.now())
+        # Headroom for the tokens blacklisted until the next rebuild.
+        bloom = BloomFilter(2 * blacklisted.count() + 1024, self.error_rate)
+        for jti in blacklisted.values_list('token__jti', flat=True).iterator(chunk_size=5000):
+            bloom.add(jti)
+        with self._lock:
+            self._filter, self._built = bloom, time.monotonic()
+        return bloom
+
+    def _current(self):
+        with self._lock:
+            if self._filter is not None and time.monotonic() - self._built < self.ttl:
+                return self._filter
+        return self.rebuild()
+
+    def contains(self, jti):
+        if not self.shared or jti in self._current():
+            return BlacklistedToken.objects.filter(token__jti=jti).exists()
+        return cache.get(CACHE_PREFIX + jti) is not None
+
+    def add(self, jti, expires_at):
+        timeout = max(int((expires_at - timezone.now()).total_seconds()), 0) + 1
+        cache.set(CACHE_PREFIX + jti, 1, timeout)
+        with self._lock:
+            if self._filter is not None:
+                self._filter.add(jti)
+
+
+_blacklist = None
+
+
+def get_blacklist():
+    global _blacklist
+    if _blacklist is None:
+        _blacklist = TokenBlacklist(
+            getattr(settings, 'JWT_BLACKLIST_FILTER_TTL', 300),
+            getattr(settings, 'JWT_BLACKLIST_FILTER_ERROR_RATE', 0.01),
+            shared=not isinstance(caches['default'], (LocMemCache, DummyCache)),
+        )
+    return _blacklist
+
+
+@receiver(setting_changed)
+def _reset_blacklist(setting, **kwargs):
+    global _blacklist
+    if setting in ('JWT_BLACKLIST_FILTER_TTL', 'JWT_BLACKLIST_FILTER_ERROR_RATE', 'CACHES'):
+        _blacklist = None
+
+
+def prune(batch_size=1000, now=None):
+    """
+    Delete outstanding tokens expired by ``now`` and their blacklist rows,
+    ``batch_size`` per transaction so no lock is held for long. Expired
+    tokens have the lowest ids, so the scan in id order stops early.
+    Yields the number of outstanding tokens deleted by each batch.
+    """
+    now = now or timezone.now()
+    while True:
+        with transaction.atomic():
+            ids = list(
+                OutstandingToken.objects.filter(expires_at__lte=now).order_by('pk').values_list('pk', flat=True)[:batch_size]
+            )
+            if not ids:
+                return
+            BlacklistedToken.objects.filter(token_id__in=ids).delete()
+            OutstandingToken.objects.filter(pk__in=ids).delete()
+        yield len(ids)
@@ -0,0 +1,96 @@
+import statistics
+import threading
+import time
+
+from django.contrib.auth import authenticate, get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+from users.views import CustomTokenObtainPairSerializer
+
+EMAIL = "login-benchmark@example.com"
+PASSWORD = "Benchmark-Pass-123"
+
+
+def legacy_login():
+    """The previous pipeline: authenticate(), then simplejwt authenticating again."""
+    if authenticate(email=EMAIL, password=PASSWORD) is None:
+        raise AssertionError("login failed")
+    TokenObtainPairSerializer(data={"email": EMAIL, "password": PASSWORD}).is_valid(raise_exception=True)
+
+
+def pooled_login():
+    CustomTokenObtainPairSerializer(data={"email": EMAIL, "password": PASSWORD}).is_valid(raise_exception=True)
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures login throughput of the previous double-hash pipeline and the single-hash pooled one, "
+        "with concurrent reads timed alongside to show how much CPU logins leave them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8, help="Concurrent login threads.")
+        parser.add_argument("--duration", type=float, default=5.0, help="Seconds per pipeline.")
+        parser.add_argument("--readers", type=int, default=2, help="Threads running a small read query meanwhile.")
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        user, _ = User.objects.get_or_create(email=EMAIL, defaults={"username": "login-benchmark", "role": "organizer"})
+        user.set_password(PASSWORD)
+        user.save(update_fields=["password"])
+
+        self.stdout.write(f"{options['threads']} login threads, {options['readers']} reader threads, {options['duration']:.0f}s each")
+        self.stdout.write(f"{'pipeline':<8} {'logins/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'read p95 ms':>12} {'errors':>7}")
+        try:
+            for name, login in (("legacy", legacy_login), ("pooled", pooled_login)):
+                result = self._run(login, options["threads"], options["readers"], options["duration"])
+                self.stdout.write(
+                    f"{name:<8} {result['rate']:>9.1f} {result['p50']:>8.1f} {result['p95']:>8.1f} "
+                    f"{result['read_p95']:>12.1f} {result['errors']:>7}"
+                )
+        finally:
+            OutstandingToken.objects.filter(user=user).delete()
+        self.stdout.write(self.style.SUCCESS("Done."))
+
+    def _run(self, login, threads, readers, duration):
+        logins, reads, errors = [], [], []
+        deadline = time.perf_counter() + duration
+
+        def timed(func, samples):
+            try:
+                while time.perf_counter() < deadline:
+                    started = time.perf_counter()
+                    try:
+                        func()
+                    except Exception:
+                        errors.append(1)
+                        continue
+                    samples.append((time.perf_counter() - started) * 1000)
+            finally:
+                connection.close()
+
+        def read():
+            get_user_model().objects.filter(email=EMAIL).exists()
+
+        workers = [threading.Thread(target=timed, args=(login, logins)) for _ in range(threads)]
+        workers += [threading.Thread(target=timed, args=(read, reads)) for _ in range(readers)]
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - started
+
+        def p(samples, n):
+            return statistics.quantiles(samples, n=100)[n - 1] if len(samples) > 1 else 0.0
+
+        return {
+            "rate": len(logins) / elapsed,
+            "p50": p(logins, 50),
+            "p95": p(logins, 95),
+            "read_p95": p(reads, 95),
+            "errors": len(errors),
+        }
@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from users import blacklist
+
+
+class Command(BaseCommand):
+    help = "Deletes expired outstanding and blacklisted refresh tokens in short batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Outstanding tokens per transaction.")
+        parser.add_argument("--pause", type=float, default=0.0, help="Seconds to sleep between batches.")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+        deleted = 0
+        for count in blacklist.prune(options["batch_size"]):
+            deleted += count
+            self.stdout.write(f"Deleted {deleted} expired tokens so far.")
+            if options["pause"]:
+                time.sleep(options["pause"])
+        self.stdout.write(self.style.SUCCESS(f"Pruned {deleted} expired tokens."))
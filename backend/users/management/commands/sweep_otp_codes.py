@@ -0,0 +1,22 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from toiapp.models import PhoneVerification as LegacyPhoneVerification
+from users.models import PhoneVerification
+from users.otp import get_otp_store
+
+
+class Command(BaseCommand):
+    help = "Deletes expired sign-in codes, and PhoneVerification rows left from before the OTP store."
+
+    def handle(self, *args, **options):
+        deleted = get_otp_store().sweep()
+        expired = timezone.now() - timedelta(seconds=settings.OTP_CODE_TTL_SECONDS)
+        legacy = sum(
+            model.objects.filter(created_at__lt=expired).delete()[0]
+            for model in (PhoneVerification, LegacyPhoneVerification)
+        )
+        self.stdout.write(self.style.SUCCESS(f"Swept {deleted} codes and {legacy} phone verifications."))
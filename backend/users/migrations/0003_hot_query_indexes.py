@@ -0,0 +1,26 @@
+# Generated by Django 5.2.10 on 2026-10-18 13:25
+
+from django.db import migrations, models
+
+from config.migration_operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0002_alter_user_role'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='phoneverification',
+            index=models.Index(fields=['phone', 'is_verified', '-created_at'], name='users_phonever_lookup_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='user',
+            index=models.Index(fields=['phone'], name='users_user_phone_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.10 on 2026-10-18 14:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OneTimeCode',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('namespace', models.CharField(max_length=20)),
+                ('phone', models.CharField(max_length=20)),
+                ('code_hash', models.CharField(max_length=64)),
+                ('expires_at', models.DateTimeField()),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('window_started_at', models.DateTimeField()),
+                ('sends', models.PositiveSmallIntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['expires_at'], name='users_otp_expires_idx')],
+                'constraints': [models.UniqueConstraint(fields=('namespace', 'phone'), name='users_otp_phone_uniq')],
+            },
+        ),
+    ]
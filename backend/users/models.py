@@ -22,6 +22,11 @@ class User(AbstractUser):
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username']
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(fields=['phone'], name='users_user_phone_idx'),
+        ]
+
     def __str__(self) -> str:
         return self.email
 
@@ -34,6 +39,36 @@ class PhoneVerification(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['phone', 'is_verified', '-created_at'], name='users_phonever_lookup_idx'),
+        ]
 
     def __str__(self) -> str:
         return f'{self.phone} - {self.code}'
+
+
+class OneTimeCode(models.Model):
+    """
+    The current sign-in code of a phone, one row per phone and namespace
+    (see users.otp.DatabaseOTPStore). Also counts the codes sent in the
+    current rate-limit window.
+    """
+
+    namespace = models.CharField(max_length=20)
+    phone = models.CharField(max_length=20)
+    code_hash = models.CharField(max_length=64)
+    expires_at = models.DateTimeField()
+    attempts = models.PositiveSmallIntegerField(default=0)
+    window_started_at = models.DateTimeField()
+    sends = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['namespace', 'phone'], name='users_otp_phone_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['expires_at'], name='users_otp_expires_idx'),
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.namespace}: {self.phone}'
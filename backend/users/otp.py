@@ -0,0 +1,155 @@
+"""
+One-time sign-in codes sent by SMS.
+
+``issue_code`` creates the code for a phone and ``verify_code`` checks it.
+``settings.OTP_STORE_BACKEND`` selects the store:
+
+* ``DatabaseOTPStore`` keeps one ``OneTimeCode`` row per phone. A new code
+  replaces the previous one, so the table holds one row per phone, not
+  one per request. ``manage.py sweep_otp_codes`` deletes stale rows.
+* ``CacheOTPStore`` keeps the same data in the default cache, where it
+  expires on its own. The cache must be shared by all workers.
+
+Either way a code expires after ``OTP_CODE_TTL_SECONDS`` and is burned
+after ``OTP_MAX_ATTEMPTS`` wrong guesses. A phone gets at most
+``OTP_MAX_SENDS`` codes per ``OTP_SEND_WINDOW_SECONDS``; further requests
+get 429. Only an HMAC of the code is stored. Namespaces keep the ``users``
+and ``toiapp`` sign-ins apart.
+"""
+import secrets
+from abc import ABC, abstractmethod
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.db.models import F
+from django.dispatch import receiver
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare, salted_hmac
+from django.utils.module_loading import import_string
+from rest_framework.exceptions import Throttled
+
+from .models import OneTimeCode
+
+
+class TooManyCodes(Throttled):
+    default_detail = 'Too many codes requested for this phone.'
+    default_code = 'too_many_codes'
+
+
+class OTPStore(ABC):
+    def __init__(self):
+        self.ttl = timedelta(seconds=getattr(settings, 'OTP_CODE_TTL_SECONDS', 600))
+        self.max_attempts = getattr(settings, 'OTP_MAX_ATTEMPTS', 5)
+        self.max_sends = getattr(settings, 'OTP_MAX_SENDS', 5)
+        self.window = timedelta(seconds=getattr(settings, 'OTP_SEND_WINDOW_SECONDS', 3600))
+
+    def hash(self, namespace, phone, code):
+        return salted_hmac('users.otp', f'{namespace}:{phone}:{code}', algorithm='sha256').hexdigest()
+
+    @abstractmethod
+    def issue(self, namespace, phone, code):
+        """Store ``code`` as the phone's current one; raises ``TooManyCodes``."""
+
+    @abstractmethod
+    def verify(self, namespace, phone, code):
+        """Consume the phone's code if it matches; True on success."""
+
+    def sweep(self):
+        """Delete stale codes; returns how many."""
+        return 0
+
+
+class DatabaseOTPStore(OTPStore):
+    def issue(self, namespace, phone, code):
+        now = timezone.now()
+        with transaction.atomic():
+            row, _ = OneTimeCode.objects.select_for_update().get_or_create(
+                namespace=namespace, phone=phone, defaults={'expires_at': now, 'window_started_at': now},
+            )
+            if row.window_started_at <= now - self.window:
+                row.window_started_at, row.sends = now, 0
+            if row.sends >= self.max_sends:
+                raise TooManyCodes(wait=(row.window_started_at + self.window - now).total_seconds())
+            row.code_hash = self.hash(namespace, phone, code)
+            row.expires_at = now + self.ttl
+            row.attempts = 0
+            row.sends += 1
+            row.save()
+
+    def verify(self, namespace, phone, code):
+        with transaction.atomic():
+            row = OneTimeCode.objects.select_for_update().filter(namespace=namespace, phone=phone).first()
+            if row is None or not row.code_hash or row.expires_at <= timezone.now() or row.attempts >= self.max_attempts:
+                return False
+            if not constant_time_compare(row.code_hash, self.hash(namespace, phone, code)):
+                OneTimeCode.objects.filter(pk=row.pk).update(attempts=F('attempts') + 1)
+                return False
+            row.code_hash = ''
+            row.save(update_fields=['code_hash'])
+        return True
+
+    def sweep(self):
+        now = timezone.now()
+        deleted, _ = OneTimeCode.objects.filter(expires_at__lt=now, window_started_at__lt=now - self.window).delete()
+        return deleted
+
+
+class CacheOTPStore(OTPStore):
+    prefix = 'otp:'
+
+    def _keys(self, namespace, phone):
+        key = f'{self.prefix}{namespace}:{phone}'
+        return key, key + ':attempts', key + ':sends'
+
+    def issue(self, namespace, phone, code):
+        key, attempts_key, sends_key = self._keys(namespace, phone)
+        cache.add(sends_key, 0, self.window.total_seconds())
+        if cache.incr(sends_key) > self.max_sends:
+            raise TooManyCodes()
+        timeout = self.ttl.total_seconds()
+        cache.set_many({key: self.hash(namespace, phone, code), attempts_key: 0}, timeout)
+
+    def verify(self, namespace, phone, code):
+        key, attempts_key, _ = self._keys(namespace, phone)
+        stored = cache.get_many([key, attempts_key])
+        if key not in stored or stored.get(attempts_key, 0) >= self.max_attempts:
+            return False
+        if not constant_time_compare(stored[key], self.hash(namespace, phone, code)):
+            try:
+                cache.incr(attempts_key)
+            except ValueError:
+                pass  # Expired meanwhile.
+            return False
+        # Only one of concurrent verifications removes the key.
+        return cache.delete(key)
+
+
+_store = None
+
+
+def get_otp_store():
+    global _store
+    if _store is None:
+        _store = import_string(getattr(settings, 'OTP_STORE_BACKEND', 'users.otp.DatabaseOTPStore'))()
+    return _store
+
+
+@receiver(setting_changed)
+def _reset_store(setting, **kwargs):
+    global _store
+    if setting.startswith('OTP_'):
+        _store = None
+
+
+def issue_code(namespace, phone):
+    """Create and store a new six-digit code for ``phone``; returns it."""
+    code = f'{secrets.randbelow(10 ** 6):06d}'
+    get_otp_store().issue(namespace, phone, code)
+    return code
+
+
+def verify_code(namespace, phone, code):
+    return get_otp_store().verify(namespace, phone, code)
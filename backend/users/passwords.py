@@ -0,0 +1,81 @@
+"""
+Password checks in a bounded worker pool.
+
+PBKDF2 takes tens of milliseconds of CPU per run. Login bursts would
+otherwise occupy every request thread. Hashing runs on at most
+``settings.PASSWORD_HASHING_WORKERS`` threads; hashlib releases the GIL
+meanwhile, so reads keep being served. At most
+``settings.PASSWORD_HASHING_QUEUE`` more checks wait for a worker. Beyond
+that, or after ``settings.PASSWORD_HASHING_TIMEOUT`` seconds of waiting,
+the login is throttled (429).
+
+Only the hashing runs in the pool. Database writes stay on the request
+thread and its connection.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from rest_framework.exceptions import Throttled
+
+
+class HashingPool:
+    def __init__(self, workers, queue, timeout):
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hashing')
+        self._slots = threading.BoundedSemaphore(workers + queue)
+
+    def run(self, func, *args):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise Throttled(wait=1, detail='Too many logins at once, try again shortly.')
+        try:
+            return self._executor.submit(func, *args).result()
+        finally:
+            self._slots.release()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = HashingPool(
+                getattr(settings, 'PASSWORD_HASHING_WORKERS', None) or os.cpu_count() or 1,
+                getattr(settings, 'PASSWORD_HASHING_QUEUE', 64),
+                getattr(settings, 'PASSWORD_HASHING_TIMEOUT', 5),
+            )
+        return _pool
+
+
+@receiver(setting_changed)
+def _reset_pool(setting, **kwargs):
+    global _pool
+    if setting in ('PASSWORD_HASHING_WORKERS', 'PASSWORD_HASHING_QUEUE', 'PASSWORD_HASHING_TIMEOUT'):
+        with _pool_lock:
+            if _pool is not None:
+                _pool.shutdown()
+            _pool = None
+
+
+def verify_password(user, raw_password):
+    """
+    ``user.check_password`` with one hash run. A hash stored with outdated
+    hasher settings is upgraded on success (one more run, in the pool too).
+    """
+    outdated = []
+    if not get_pool().run(check_password, raw_password, user.password, outdated.append):
+        return False
+    if outdated:
+        user.password = get_pool().run(make_password, raw_password)
+        user.save(update_fields=['password'])
+    return True
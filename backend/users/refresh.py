@@ -0,0 +1,53 @@
+"""
+Coalescing of duplicate refreshes.
+
+When an access token expires, a client firing several requests at once
+refreshes the same rotating token several times. Only the first refresh
+could succeed; the others found the token blacklisted and logged the user
+out. ``coalesce`` lets the first request issue the new pair and hands the
+same pair to every refresh of that token within
+``settings.JWT_REFRESH_GRACE_SECONDS``. The pair is kept in the default
+cache under a hash of the refresh token, so only a holder of that token can
+read it. Concurrent duplicates wait for the first one to finish. The cache
+must be shared by all workers, like the catalog cache.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+CACHE_PREFIX = 'jwt-refresh:'
+# Longest a duplicate waits for the request issuing the pair.
+LOCK_TIMEOUT = 5
+POLL_INTERVAL = 0.02
+
+
+def coalesce(raw_token, issue):
+    """Return the pair issued for ``raw_token`` in the grace window, or ``issue()``."""
+    grace = getattr(settings, 'JWT_REFRESH_GRACE_SECONDS', 10)
+    if grace <= 0:
+        return issue()
+    key = CACHE_PREFIX + hashlib.sha256(raw_token.encode()).hexdigest()
+    lock = key + ':lock'
+
+    result = cache.get(key)
+    if result is not None:
+        return result
+    if not cache.add(lock, 1, LOCK_TIMEOUT):
+        deadline = time.monotonic() + LOCK_TIMEOUT
+        while time.monotonic() < deadline:
+            time.sleep(POLL_INTERVAL)
+            result = cache.get(key)
+            if result is not None:
+                return result
+            if cache.get(lock) is None:
+                break
+        # The first request failed or is stuck; this one gets its own answer.
+        return issue()
+    try:
+        result = issue()
+        cache.set(key, result, grace)
+        return result
+    finally:
+        cache.delete(lock)
@@ -5,6 +5,12 @@ from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError as DjangoValidationError
 from django.db import IntegrityError
 from rest_framework import serializers
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+
+from .refresh import coalesce
+from .tokens import UserRefreshToken, set_user_claims
 
 User = get_user_model()
 
@@ -80,6 +86,43 @@ class UserSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'date_joined', 'is_active')
 
 
+class UserTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    ``TokenRefreshSerializer`` that re-stamps the ``username``/``role``
+    claims from the current user row, so claims-only authentication sees a
+    role change after the next refresh at the latest. Duplicate refreshes
+    of one token share the first pair issued (see ``users.refresh``).
+    """
+
+    token_class = UserRefreshToken
+
+    def validate(self, attrs):
+        return coalesce(attrs['refresh'], lambda: self.rotate(attrs['refresh']))
+
+    def rotate(self, raw_token):
+        refresh = self.token_class(raw_token)
+
+        user_id = refresh.payload.get(api_settings.USER_ID_CLAIM, None)
+        if user_id:
+            user = User.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).first()
+            if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+                raise AuthenticationFailed(self.error_messages['no_active_account'], 'no_active_account')
+            set_user_claims(refresh, user)
+
+        data = {'access': str(refresh.access_token)}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                refresh.blacklist()
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            refresh.outstand()
+            data['refresh'] = str(refresh)
+
+        return data
+
+
 class PhoneRequestSerializer(serializers.Serializer):
     phone = serializers.CharField(max_length=20)
 
@@ -0,0 +1,15 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from toiapp.models import Register
+
+from .authentication import invalidate_user
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+@receiver(post_save, sender=Register)
+@receiver(post_delete, sender=Register)
+def drop_cached_user(sender, instance, **kwargs):
+    invalidate_user(instance)
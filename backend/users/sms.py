@@ -0,0 +1,237 @@
+"""
+Outbound SMS, sent off the request thread.
+
+``send`` puts a message on the process's ``SMSQueue`` and returns. A
+background thread takes up to ``settings.SMS_BATCH_SIZE`` queued messages
+at a time and hands them to the provider named by ``settings.SMS_PROVIDER``.
+The provider is built once, so its HTTP client and connections are reused.
+A failed send is retried ``SMS_MAX_RETRIES`` times with backoff. Each
+attempt is bounded by ``SMS_SEND_TIMEOUT`` seconds.
+
+After ``SMS_BREAKER_THRESHOLD`` consecutive failed messages the circuit
+opens for ``SMS_BREAKER_COOLDOWN`` seconds. While it is open, queued
+messages are dropped and ``send`` raises ``SMSUnavailable`` (503) instead
+of queueing work nobody will deliver. The first message after the cooldown
+decides whether it closes again. A full queue also answers 503. Only
+transport errors, timeouts and provider-side (5xx) errors count toward the
+breaker: a message the provider rejects (``SMSRejected``, e.g. an invalid
+number) is dropped without retries and says nothing about its health.
+"""
+import atexit
+import logging
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+logger = logging.getLogger(__name__)
+
+
+class SMSUnavailable(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'SMS delivery is unavailable, try again later.'
+    default_code = 'sms_unavailable'
+
+
+class SMSRejected(Exception):
+    """The provider refused this message; sending it again will not help."""
+
+
+class TwilioProvider:
+    """Twilio with one client, and its pooled connections, per process."""
+
+    def __init__(self, timeout):
+        self.from_number = getattr(settings, 'TWILIO_PHONE_NUMBER', None)
+        account_sid = getattr(settings, 'TWILIO_ACCOUNT_SID', None)
+        auth_token = getattr(settings, 'TWILIO_AUTH_TOKEN', None)
+        self.client = None
+        if not all([account_sid, auth_token, self.from_number]):
+            logger.warning("Twilio settings not configured. SMS will not be sent.")
+            return
+        from twilio.http.http_client import TwilioHttpClient
+        from twilio.rest import Client
+
+        self.client = Client(account_sid, auth_token, http_client=TwilioHttpClient(timeout=timeout))
+
+    def send(self, to, body):
+        from twilio.base.exceptions import TwilioRestException
+
+        if self.client is None:
+            return None
+        try:
+            return self.client.messages.create(body=body, from_=self.from_number, to=to).sid
+        except TwilioRestException as exc:
+            # 429 is throttling, worth retrying; other 4xx reject the message itself.
+            if 400 <= exc.status < 500 and exc.status != 429:
+                raise SMSRejected(exc.msg) from exc
+            raise
+
+
+class FakeProvider:
+    """
+    Keeps messages in ``outbox``; ``fail`` makes the next sends raise a
+    transport error, ``reject`` an ``SMSRejected``.
+    """
+
+    outbox = []
+    fail = 0
+    reject = 0
+
+    def __init__(self, timeout):
+        pass
+
+    def send(self, to, body):
+        if FakeProvider.reject:
+            FakeProvider.reject -= 1
+            raise SMSRejected('fake provider rejection')
+        if FakeProvider.fail:
+            FakeProvider.fail -= 1
+            raise ConnectionError('fake provider failure')
+        FakeProvider.outbox.append((to, body))
+        return f'fake-{len(FakeProvider.outbox)}'
+
+
+class CircuitBreaker:
+    def __init__(self, threshold, cooldown):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+
+    @property
+    def is_open(self):
+        return self.opened_at is not None and time.monotonic() - self.opened_at < self.cooldown
+
+    def record(self, ok):
+        if ok:
+            self.failures, self.opened_at = 0, None
+            return
+        self.failures += 1
+        if self.failures >= self.threshold:
+            self.opened_at = time.monotonic()
+
+
+class SMSQueue:
+    def __init__(self):
+        self.provider_class = import_string(getattr(settings, 'SMS_PROVIDER', 'users.sms.TwilioProvider'))
+        self.timeout = getattr(settings, 'SMS_SEND_TIMEOUT', 5)
+        self.batch_size = getattr(settings, 'SMS_BATCH_SIZE', 20)
+        self.max_retries = getattr(settings, 'SMS_MAX_RETRIES', 3)
+        self.retry_delay = getattr(settings, 'SMS_RETRY_DELAY', 0.5)
+        self.breaker = CircuitBreaker(
+            getattr(settings, 'SMS_BREAKER_THRESHOLD', 5), getattr(settings, 'SMS_BREAKER_COOLDOWN', 30),
+        )
+        self._queue = queue.Queue(getattr(settings, 'SMS_QUEUE_SIZE', 1000))
+        self._provider = None
+        self._worker = None
+        self._lock = threading.Lock()
+
+    def check(self):
+        """Raise ``SMSUnavailable`` if a message put now would be refused."""
+        if self.breaker.is_open or self._queue.full():
+            raise SMSUnavailable()
+
+    def put(self, to, body):
+        self.check()
+        try:
+            self._queue.put_nowait((to, body))
+        except queue.Full:
+            raise SMSUnavailable()
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name='sms-sender', daemon=True)
+                self._worker.start()
+
+    def flush(self, timeout=None):
+        """Wait until the queued messages are handled; False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                for to, body in batch:
+                    self._deliver(to, body)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _deliver(self, to, body):
+        if self.breaker.is_open:
+            logger.error("SMS to %s dropped: provider circuit open.", to)
+            return
+        for attempt in range(self.max_retries + 1):
+            try:
+                if self._provider is None:
+                    self._provider = self.provider_class(self.timeout)
+                sid = self._provider.send(to, body)
+            except SMSRejected as exc:
+                logger.error("SMS to %s rejected by the provider: %s", to, exc)
+                return
+            except Exception as exc:
+                logger.warning("SMS to %s failed (attempt %d): %s", to, attempt + 1, exc)
+                if attempt < self.max_retries:
+                    time.sleep(self.retry_delay * 2 ** attempt)
+                continue
+            logger.info("SMS sent to %s. SID: %s", to, sid)
+            self.breaker.record(True)
+            return
+        logger.error("SMS to %s dropped after %d attempts.", to, self.max_retries + 1)
+        self.breaker.record(False)
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_sms_queue():
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = SMSQueue()
+        return _queue
+
+
+@receiver(setting_changed)
+def _reset_queue(setting, **kwargs):
+    global _queue
+    if setting.startswith('SMS_') or setting.startswith('TWILIO_'):
+        with _queue_lock:
+            _queue = None
+
+
+@atexit.register
+def _drain():
+    if _queue is not None:
+        _queue.flush(timeout=getattr(settings, 'SMS_SEND_TIMEOUT', 5))
+
+
+def check_available():
+    """
+    Raise ``SMSUnavailable`` now rather than after work that only makes
+    sense if the message goes out, such as issuing a sign-in code.
+    """
+    get_sms_queue().check()
+
+
+def send(to, body):
+    """Queue an SMS; raises ``SMSUnavailable`` when it cannot be delivered."""
+    get_sms_queue().put(to, body)
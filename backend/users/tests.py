@@ -1,3 +1,398 @@
-from django.test import TestCase
+import hashlib
+import shutil
+import tempfile
+import threading
+from datetime import date, time, timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, check_password
+from django.core.cache import cache as django_cache
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, APITestCase
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from twilio.base.exceptions import TwilioRestException
+
+from events.models import Event, Venue
+from toiapp.views import SendCodeView as LegacySendCodeView
+from toiapp.views import VerifyCodeView as LegacyVerifyCodeView
+
+from . import blacklist, refresh, sms
+from .authentication import get_user_cache
+from .blacklist import get_blacklist
+from .models import OneTimeCode
+from .passwords import get_pool as get_password_pool
+from .sms import FakeProvider, get_sms_queue
+from .tokens import UserRefreshToken
+
+User = get_user_model()
+
+
+class CachedAuthenticationTests(APITestCase):
+    def setUp(self):
+        get_user_cache().clear()
+        self.user = User.objects.create_user(email='org@test.local', username='org', password='StrongPass123!', role='organizer')
+        self.refresh = UserRefreshToken.for_user(self.user)
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {self.refresh.access_token}'}
+
+    def _user_queries(self, path):
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(path, **self.auth)
+        return res, [q for q in ctx.captured_queries if 'users_user' in q['sql']]
+
+    def test_cache_hit_skips_user_query(self):
+        res, queries = self._user_queries('/api/events/')
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(len(queries), 1)
+        res, queries = self._user_queries('/api/events/')
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(queries, [])
+
+    def test_saving_the_user_invalidates(self):
+        self.client.get('/api/events/', **self.auth)
+        self.user.role = 'admin'
+        self.user.save(update_fields=['role'])
+        self.assertEqual(self.client.get('/api/profile/', **self.auth).json()['role'], 'admin')
+
+        self.user.is_active = False
+        self.user.save(update_fields=['is_active'])
+        self.assertEqual(self.client.get('/api/events/', **self.auth).status_code, 401)
+
+    @override_settings(JWT_USER_CACHE_TTL=0)
+    def test_expired_entry_is_reloaded(self):
+        self.client.get('/api/events/', **self.auth)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertEqual(self.client.get('/api/events/', **self.auth).status_code, 401)
+
+    @override_settings(JWT_CLAIMS_ONLY_AUTH=True)
+    def test_claims_only_mode(self):
+        res, queries = self._user_queries('/api/events/')
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(queries, [])
+        self.assertEqual(self.client.get('/api/profile/', **self.auth).json()['email'], 'org@test.local')
+
+        # Role changes reach the claims on the next refresh.
+        self.user.role = 'owner'
+        self.user.save(update_fields=['role'])
+        res = self.client.post('/api/token/refresh/', {'refresh': str(self.refresh)})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(AccessToken(res.json()['access'])['role'], 'owner')
+
+        self.user.is_active = False
+        self.user.save(update_fields=['is_active'])
+        res = self.client.post('/api/token/refresh/', {'refresh': res.json()['refresh']})
+        self.assertEqual(res.status_code, 401)
+
+    @override_settings(JWT_CLAIMS_ONLY_AUTH=True)
+    def test_claims_only_object_permissions(self):
+        owner = User.objects.create_user(email='owner@test.local', username='owner', password='StrongPass123!', role='owner')
+        venue = Venue.objects.create(name='Hall', address='A', capacity=100, price_per_hour=1000, owner=owner)
+        event = Event.objects.create(
+            title='Toi', date=date(2031, 5, 1), start_time=time(10), end_time=time(12),
+            guest_count=50, venue=venue, organizer=self.user,
+        )
+        owner_auth = {'HTTP_AUTHORIZATION': f'Bearer {UserRefreshToken.for_user(owner).access_token}'}
+
+        res = self.client.patch(f'/api/venues/{venue.id}/', {'name': 'Grand Hall'}, format='json', **owner_auth)
+        self.assertEqual(res.status_code, 200, res.data)
+        res = self.client.patch(f'/api/events/{event.id}/', {'title': 'Wedding'}, format='json', **self.auth)
+        self.assertEqual(res.status_code, 200, res.data)
+        # Someone else's venue is still refused.
+        res = self.client.patch(f'/api/venues/{venue.id}/', {'name': 'Mine'}, format='json', **self.auth)
+        self.assertEqual(res.status_code, 403)
+
+
+@override_settings(JWT_REFRESH_GRACE_SECONDS=0)
+class TokenBlacklistTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='org@test.local', username='org', password='StrongPass123!', role='organizer')
+        self.refresh = str(UserRefreshToken.for_user(self.user))
+
+    def _blacklist_queries(self, refresh):
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.post('/api/token/refresh/', {'refresh': refresh})
+        # The blacklist check joins the outstanding token by jti.
+        return res, [q for q in ctx.captured_queries if 'FROM "token_blacklist_blacklistedtoken" INNER JOIN' in q['sql']]
+
+    def test_rotated_token_is_rejected_without_filter_rebuild(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        shared = {'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': cache_dir}}
+        with override_settings(CACHES=shared):
+            get_blacklist().rebuild()
+            res, queries = self._blacklist_queries(self.refresh)
+            self.assertEqual(res.status_code, 200)
+            self.assertEqual(queries, [])
+
+            # Known from the shared cache until the next rebuild, then from the filter.
+            self.assertEqual(self._blacklist_queries(self.refresh)[0].status_code, 401)
+            caches['default'].clear()
+            get_blacklist().rebuild()
+            res, queries = self._blacklist_queries(self.refresh)
+            self.assertEqual(res.status_code, 401)
+            self.assertEqual(len(queries), 1)
+
+    def test_per_process_cache_checks_the_database(self):
+        res, queries = self._blacklist_queries(self.refresh)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(len(queries), 1)
+
+        # Another worker: its filter predates the rotation and its cache is its own.
+        get_blacklist()._filter = blacklist.BloomFilter(1024, 0.01)
+        django_cache.clear()
+        res, queries = self._blacklist_queries(self.refresh)
+        self.assertEqual(res.status_code, 401)
+        self.assertEqual(len(queries), 1)
+
+    def test_shared_backends_enable_the_filter(self):
+        self.assertFalse(get_blacklist().shared)
+        redis = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://localhost'}}
+        with override_settings(CACHES=redis):
+            self.assertTrue(get_blacklist().shared)
+
+    def test_bloom_filter(self):
+        bloom = blacklist.BloomFilter(1000, 0.01)
+        for i in range(1000):
+            bloom.add(f'jti-{i}')
+        self.assertTrue(all(f'jti-{i}' in bloom for i in range(1000)))
+        false_positives = sum(f'other-{i}' in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+
+    def test_prune_command(self):
+        self.client.post('/api/token/refresh/', {'refresh': self.refresh})
+        OutstandingToken.objects.filter(jti=RefreshToken(self.refresh, verify=False)['jti']).update(
+            expires_at=timezone.now() - timedelta(minutes=1),
+        )
+        out = StringIO()
+        call_command('prune_tokens', '--batch-size', '1', stdout=out)
+        self.assertIn('Pruned 1 expired tokens.', out.getvalue())
+        self.assertEqual(BlacklistedToken.objects.count(), 0)
+        self.assertEqual(OutstandingToken.objects.count(), 1)
+
+
+class RefreshCoalescingTests(APITestCase):
+    def setUp(self):
+        django_cache.clear()
+        self.user = User.objects.create_user(email='org@test.local', username='org', password='StrongPass123!', role='organizer')
+        self.refresh = str(UserRefreshToken.for_user(self.user))
+
+    def test_duplicate_refreshes_share_the_pair(self):
+        first = self.client.post('/api/token/refresh/', {'refresh': self.refresh})
+        self.assertEqual(first.status_code, 200)
+        with CaptureQueriesContext(connection) as ctx:
+            second = self.client.post('/api/token/refresh/', {'refresh': self.refresh})
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(len(ctx.captured_queries), 0)
+        self.assertEqual(BlacklistedToken.objects.count(), 1)
+        self.assertEqual(OutstandingToken.objects.count(), 2)
+
+        # The new refresh token rotates normally.
+        third = self.client.post('/api/token/refresh/', {'refresh': first.json()['refresh']})
+        self.assertEqual(third.status_code, 200)
+        self.assertNotEqual(third.json()['refresh'], first.json()['refresh'])
+
+    def test_reuse_after_the_grace_window_is_rejected(self):
+        self.client.post('/api/token/refresh/', {'refresh': self.refresh})
+        django_cache.delete(refresh.CACHE_PREFIX + hashlib.sha256(self.refresh.encode()).hexdigest())
+        self.assertEqual(self.client.post('/api/token/refresh/', {'refresh': self.refresh}).status_code, 401)
+
+    def test_concurrent_duplicate_waits_for_the_first(self):
+        lock = refresh.CACHE_PREFIX + hashlib.sha256(b'token').hexdigest() + ':lock'
+        django_cache.add(lock, 1)
+
+        def finish():
+            django_cache.set(lock[:-len(':lock')], {'access': 'a', 'refresh': 'r'})
+            django_cache.delete(lock)
+
+        timer = threading.Timer(0.1, finish)
+        timer.start()
+        issue = mock.Mock(return_value={'access': 'other'})
+        self.assertEqual(refresh.coalesce('token', issue), {'access': 'a', 'refresh': 'r'})
+        timer.join()
+        issue.assert_not_called()
+
+        # A failed first request lets the duplicate run on its own.
+        django_cache.clear()
+        django_cache.add(lock, 1)
+        threading.Timer(0.1, django_cache.delete, [lock]).start()
+        self.assertEqual(refresh.coalesce('token', issue), {'access': 'other'})
+
+
+class LoginTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='org@test.local', username='org', password='StrongPass123!', role='organizer')
+
+    def _login(self, password='StrongPass123!', **extra):
+        return self.client.post(reverse('token_obtain_pair'), {'email': 'org@test.local', 'password': password, **extra}, format='json')
+
+    def test_password_is_hashed_once(self):
+        with mock.patch('users.passwords.check_password', wraps=check_password) as checked:
+            res = self._login()
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(checked.call_count, 1)
+        self.assertEqual(AccessToken(res.data['access'])['role'], 'organizer')
+
+    def test_outdated_hash_is_upgraded(self):
+        hasher = PBKDF2PasswordHasher()
+        self.user.password = hasher.encode('StrongPass123!', hasher.salt(), iterations=1000)
+        self.user.save(update_fields=['password'])
+        self.assertEqual(self._login().status_code, 200)
+        self.user.refresh_from_db()
+        self.assertEqual(hasher.decode(self.user.password)['iterations'], hasher.iterations)
+
+    def test_wrong_password_does_not_change_role(self):
+        res = self._login('wrong', role='owner')
+        self.assertEqual(res.status_code, 400)
+        self.assertIn('password', res.data)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.role, 'organizer')
+        self.assertEqual(self._login(role='owner').status_code, 200)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.role, 'owner')
+
+    @override_settings(PASSWORD_HASHING_WORKERS=1, PASSWORD_HASHING_QUEUE=0, PASSWORD_HASHING_TIMEOUT=0)
+    def test_saturated_pool_throttles(self):
+        pool = get_password_pool()
+        release = threading.Event()
+        busy = threading.Thread(target=pool.run, args=(release.wait,))
+        busy.start()
+        try:
+            res = self._login()
+        finally:
+            release.set()
+            busy.join()
+        self.assertEqual(res.status_code, 429)
+        self.assertIn('Retry-After', res)
+        self.assertEqual(self._login().status_code, 200)
+
+
+@override_settings(OTP_MAX_ATTEMPTS=2, OTP_MAX_SENDS=2, SMS_PROVIDER='users.sms.FakeProvider')
+class OTPTests(APITestCase):
+    BACKENDS = ('users.otp.DatabaseOTPStore', 'users.otp.CacheOTPStore')
+
+    def setUp(self):
+        django_cache.clear()
+
+    def _send(self, view=None):
+        with mock.patch('users.otp.secrets.randbelow', return_value=123456):
+            if view:
+                return view.as_view()(APIRequestFactory().post('/', {'phone': '+996555000111'}))
+            return self.client.post('/api/send-code/', {'phone': '+996555000111'})
+
+    def _verify(self, code, view=None):
+        if view:
+            return view.as_view()(APIRequestFactory().post('/', {'phone': '+996555000111', 'code': code}))
+        return self.client.post('/api/verify-code/', {'phone': '+996555000111', 'code': code})
+
+    def test_verify_once(self):
+        for backend in self.BACKENDS:
+            with self.subTest(backend=backend), override_settings(OTP_STORE_BACKEND=backend):
+                self.assertEqual(self._send().status_code, 200)
+                self.assertEqual(self._verify('123456').status_code, 200)
+                self.assertEqual(self._verify('123456').status_code, 400)
+        self.assertEqual(OneTimeCode.objects.count(), 1)
+
+    def test_attempts_and_send_limits(self):
+        for backend in self.BACKENDS:
+            with self.subTest(backend=backend), override_settings(OTP_STORE_BACKEND=backend):
+                self._send()
+                self.assertEqual(self._verify('000000').status_code, 400)
+                self.assertEqual(self._verify('000001').status_code, 400)
+                # Burned after two wrong guesses.
+                self.assertEqual(self._verify('123456').status_code, 400)
+
+                self.assertEqual(self._send().status_code, 200)
+                self.assertEqual(self._verify('123456').status_code, 200)
+                res = self._send()
+                self.assertEqual(res.status_code, 429)
+                # The legacy endpoint keeps its own allowance.
+                self.assertEqual(self._send(LegacySendCodeView).status_code, 200)
+                self.assertEqual(self._verify('123456', LegacyVerifyCodeView).status_code, 200)
+
+    @override_settings(OTP_CODE_TTL_SECONDS=0, OTP_SEND_WINDOW_SECONDS=0)
+    def test_expiry_and_sweep(self):
+        self._send()
+        self.assertEqual(self._verify('123456').status_code, 400)
+        out = StringIO()
+        call_command('sweep_otp_codes', stdout=out)
+        self.assertIn('Swept 1 codes', out.getvalue())
+        self.assertFalse(OneTimeCode.objects.exists())
+
+
+@override_settings(SMS_PROVIDER='users.sms.FakeProvider', SMS_RETRY_DELAY=0, SMS_MAX_RETRIES=2)
+class SMSQueueTests(APITestCase):
+    def setUp(self):
+        django_cache.clear()
+        FakeProvider.outbox.clear()
+        FakeProvider.fail = FakeProvider.reject = 0
+
+    def test_send_code_queues_the_sms(self):
+        with mock.patch('users.otp.secrets.randbelow', return_value=123456):
+            res = self.client.post('/api/send-code/', {'phone': '+996555000111'})
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(get_sms_queue().flush(timeout=5))
+        self.assertEqual(FakeProvider.outbox, [('+996555000111', 'Ваш код подтверждения: 123456')])
+
+    def test_retries_reuse_the_provider(self):
+        FakeProvider.fail = 2
+        with mock.patch.object(FakeProvider, '__init__', return_value=None) as created, self.assertLogs('users.sms', 'WARNING'):
+            for index in range(3):
+                sms.send(f'+99655500011{index}', 'hi')
+            self.assertTrue(get_sms_queue().flush(timeout=5))
+        self.assertEqual(len(FakeProvider.outbox), 3)
+        self.assertEqual(created.call_count, 1)
+
+    @override_settings(SMS_MAX_RETRIES=0, SMS_BREAKER_THRESHOLD=2)
+    def test_circuit_breaker(self):
+        FakeProvider.fail = 2
+        with self.assertLogs('users.sms', 'WARNING') as logs:
+            sms.send('+996555000111', 'one')
+            sms.send('+996555000112', 'two')
+            self.assertTrue(get_sms_queue().flush(timeout=5))
+        self.assertIn('dropped after 1 attempts', logs.output[-1])
+        self.assertTrue(get_sms_queue().breaker.is_open)
+        res = self.client.post('/api/send-code/', {'phone': '+996555000113'})
+        self.assertEqual(res.status_code, 503)
+        # No code was issued, so none of the phone's sends was used up.
+        self.assertFalse(OneTimeCode.objects.filter(phone='+996555000113').exists())
+        res = LegacySendCodeView.as_view()(APIRequestFactory().post('/', {'phone': '+996555000113'}))
+        self.assertEqual(res.status_code, 503)
+        self.assertFalse(OneTimeCode.objects.exists())
+
+        get_sms_queue().breaker.opened_at -= get_sms_queue().breaker.cooldown
+        sms.send('+996555000114', 'three')
+        self.assertTrue(get_sms_queue().flush(timeout=5))
+        self.assertEqual(FakeProvider.outbox, [('+996555000114', 'three')])
+        self.assertFalse(get_sms_queue().breaker.is_open)
+
+    @override_settings(SMS_BREAKER_THRESHOLD=2)
+    def test_rejections_are_not_retried_and_keep_the_circuit_closed(self):
+        FakeProvider.reject = 3
+        with self.assertLogs('users.sms', 'WARNING') as logs:
+            for index in range(3):
+                sms.send(f'+99655500011{index}', 'hi')
+            self.assertTrue(get_sms_queue().flush(timeout=5))
+        # One error per message and no retry warnings.
+        self.assertEqual([record.levelname for record in logs.records], ['ERROR'] * 3)
+        self.assertFalse(get_sms_queue().breaker.is_open)
+        sms.send('+996555000119', 'hi')
+        self.assertTrue(get_sms_queue().flush(timeout=5))
+        self.assertEqual(FakeProvider.outbox, [('+996555000119', 'hi')])
+
+    def test_twilio_errors_are_classified(self):
+        provider = sms.TwilioProvider.__new__(sms.TwilioProvider)
+        provider.from_number = '+1000'
+        provider.client = mock.Mock()
+        for status_code, expected in ((400, sms.SMSRejected), (429, TwilioRestException), (503, TwilioRestException)):
+            with self.subTest(status=status_code):
+                provider.client.messages.create.side_effect = TwilioRestException(status_code, '/Messages', 'error')
+                with self.assertRaises(expected):
+                    provider.send('+996555000111', 'hi')
@@ -0,0 +1,37 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from .blacklist import get_blacklist
+
+
+def set_user_claims(token, user):
+    token['username'] = user.username
+    token['role'] = user.role
+
+
+class UserRefreshToken(RefreshToken):
+    """
+    Refresh token with the ``username`` and ``role`` claims, as
+    ``toiapp.tokens.RegisterRefreshToken`` has; access tokens made from it
+    inherit them. Claims-only authentication reads them instead of the
+    user row (see ``users.authentication``). Blacklist checks go through
+    ``users.blacklist``.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        set_user_claims(token, user)
+        return token
+
+    def check_blacklist(self):
+        if get_blacklist().contains(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_('Token is blacklisted'))
+
+    def blacklist(self):
+        result = super().blacklist()
+        get_blacklist().add(self.payload[api_settings.JTI_CLAIM], datetime_from_epoch(self.payload['exp']))
+        return result
@@ -1,4 +1,6 @@
 from django.urls import path
+
+from . import async_views
 from .views import GoogleOAuthAPIView, ProfileAPIView, RegisterAPIView, SendCodeAPIView, VerifyCodeAPIView
 
 urlpatterns = [
@@ -7,4 +9,5 @@ urlpatterns = [
     path('profile/', ProfileAPIView.as_view(), name='profile'),
     path('send-code/', SendCodeAPIView.as_view(), name='send_code'),
     path('verify-code/', VerifyCodeAPIView.as_view(), name='verify_code'),
+    path('async/profile/', async_views.profile, name='async-profile'),
 ]
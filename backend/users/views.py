@@ -1,27 +1,28 @@
-import random
 import uuid
-from datetime import timedelta
 
 from django.contrib.auth import get_user_model
-from django.contrib.auth import authenticate
+from django.contrib.auth.models import update_last_login
 from django.conf import settings
-from django.utils import timezone
 from rest_framework import permissions, status
 from rest_framework.response import Response
 from rest_framework import serializers
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
-from rest_framework_simplejwt.views import TokenObtainPairView
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.settings import api_settings
 
-from .models import PhoneVerification
+from . import sms
+from .otp import issue_code, verify_code
+from .passwords import verify_password
 from .serializers import (
     PhoneRequestSerializer,
     RegisterSerializer,
     UserSerializer,
+    UserTokenRefreshSerializer,
     VerifyCodeSerializer,
     _username_for_email,
 )
+from .tokens import UserRefreshToken
 
 User = get_user_model()
 
@@ -31,6 +32,8 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     Возвращает более понятные ошибки и явно ожидает email + password.
     """
 
+    token_class = UserRefreshToken
+
     role = serializers.ChoiceField(
         choices=[User.ROLE_ORGANIZER, User.ROLE_OWNER],
         required=False,
@@ -52,20 +55,23 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         if not user.is_active:
             raise serializers.ValidationError({'email': ['Аккаунт отключён']})
 
-        if role:
-            if role not in {User.ROLE_ORGANIZER, User.ROLE_OWNER}:
-                raise serializers.ValidationError({'role': ['Неправильный тип пользователя']})
-            if user.role != role:
-                user.role = role
-                user.save(update_fields=['role'])
+        if role and role not in {User.ROLE_ORGANIZER, User.ROLE_OWNER}:
+            raise serializers.ValidationError({'role': ['Неправильный тип пользователя']})
 
-        # Use Django authentication to validate password.
-        authed = authenticate(**{User.USERNAME_FIELD: email, 'password': password})
-        if not authed:
+        # One hash run, in the hashing pool (authenticate() plus
+        # super().validate() used to run it twice).
+        if not verify_password(user, password):
             raise serializers.ValidationError({'password': ['Неверный пароль']})
 
-        # Delegate token creation to SimpleJWT.
-        return super().validate({'email': email, 'password': password})
+        if role and user.role != role:
+            user.role = role
+            user.save(update_fields=['role'])
+
+        self.user = user
+        refresh = self.get_token(user)
+        if api_settings.UPDATE_LAST_LOGIN:
+            update_last_login(None, user)
+        return {'refresh': str(refresh), 'access': str(refresh.access_token)}
 
 
 class CustomTokenObtainPairView(TokenObtainPairView):
@@ -91,6 +97,10 @@ class CustomTokenObtainPairView(TokenObtainPairView):
         )
 
 
+class UserTokenRefreshView(TokenRefreshView):
+    serializer_class = UserTokenRefreshSerializer
+
+
 class GoogleOAuthSerializer(serializers.Serializer):
     email = serializers.EmailField()
     name = serializers.CharField(max_length=150, required=False, allow_blank=True)
@@ -127,7 +137,7 @@ class GoogleOAuthAPIView(APIView):
             user.role = role
             user.save(update_fields=['role'])
 
-        refresh = RefreshToken.for_user(user)
+        refresh = UserRefreshToken.for_user(user)
         return Response(
             {
                 'user': UserSerializer(user).data,
@@ -145,7 +155,7 @@ class RegisterAPIView(APIView):
         serializer = RegisterSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         user = serializer.save()
-        refresh = RefreshToken.for_user(user)
+        refresh = UserRefreshToken.for_user(user)
         return Response(
             {
                 'user': UserSerializer(user).data,
@@ -160,7 +170,11 @@ class ProfileAPIView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        return Response(UserSerializer(request.user).data, status=status.HTTP_200_OK)
+        user = request.user
+        if getattr(user, 'from_claims', False):
+            # Claims-only authentication carries no email/phone; load the row.
+            user = User.objects.get(pk=user.pk)
+        return Response(UserSerializer(user).data, status=status.HTTP_200_OK)
 
 
 class SendCodeAPIView(APIView):
@@ -170,8 +184,10 @@ class SendCodeAPIView(APIView):
         serializer = PhoneRequestSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         phone = serializer.validated_data['phone']
-        code = ''.join(str(random.randint(0, 9)) for _ in range(6))
-        PhoneVerification.objects.create(phone=phone, code=code)
+        # Before issuing: a refused SMS must not replace the last code or use up a send.
+        sms.check_available()
+        code = issue_code('users', phone)
+        sms.send(phone, f'Ваш код подтверждения: {code}')
         payload = {'message': 'Code sent'}
         if settings.DEBUG:
             payload['code'] = code
@@ -188,26 +204,12 @@ class VerifyCodeAPIView(APIView):
         code = serializer.validated_data['code']
         desired_role = serializer.validated_data.get('role') or 'organizer'
 
-        time_threshold = timezone.now() - timedelta(minutes=10)
-        verification = (
-            PhoneVerification.objects.filter(
-                phone=phone,
-                code=code,
-                is_verified=False,
-                created_at__gte=time_threshold,
-            )
-            .order_by('-created_at')
-            .first()
-        )
-        if not verification:
+        if not verify_code('users', phone, code):
             return Response(
                 {'error': 'Invalid or expired code'},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        verification.is_verified = True
-        verification.save(update_fields=['is_verified'])
-
         user = User.objects.filter(phone=phone).first()
         is_new_user = False
         if not user:
@@ -224,7 +226,7 @@ class VerifyCodeAPIView(APIView):
             # If user exists but role differs, keep current role (don't silently change).
             pass
 
-        refresh = RefreshToken.for_user(user)
+        refresh = UserRefreshToken.for_user(user)
         return Response(
             {
                 'message': 'Login successful',